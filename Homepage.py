@@ -1,258 +1,351 @@
 import streamlit as st
 import pandas as pd
 from utils import get_parquet_files
+from upload_store import get_upload_store
+from instrumentation import get_profiler, render_profiler_panel, stage
+from local_folder import DATA_ROOT, local_file_key, resolve_data_folder
+from prefetch import get_prefetcher, render_prefetch_panel
+from cache_manager import render_cache_panel
+from catalog import get_catalog, render_catalog_status
 import os
 
 st.title("DK258 Dashboard")
 
+profiler = get_profiler("Homepage")
+
 # Initialize session state
 if 'selected_batches' not in st.session_state:
     st.session_state.selected_batches = []
+# Uploaded files map filename -> content hash in the shared upload store
 if 'uploaded_files_data' not in st.session_state:
     st.session_state.uploaded_files_data = {}
+# Content hash per uploader file id, so files are only hashed once
+if 'uploaded_file_digests' not in st.session_state:
+    st.session_state.uploaded_file_digests = {}
+
+upload_store = get_upload_store()
+prefetcher = get_prefetcher()
+catalog = get_catalog()
+
+# Drop files that are no longer in the store (e.g. temp dir cleaned up)
+st.session_state.uploaded_files_data = {
+    name: digest for name, digest in st.session_state.uploaded_files_data.items()
+    if upload_store.contains(digest)
+}
+
+# Local folder mode reads parquet files in place through memory maps. It is
+# only offered when DK258_DATA_DIR is set, and only for folders inside it
+DATA_METHODS = ["File Upload", "File Path"] if DATA_ROOT else ["File Upload"]
+if 'folder_path' not in st.session_state:
+    st.session_state.folder_path = DATA_ROOT or ""
+if st.session_state.get('data_source_method') not in DATA_METHODS:
+    st.session_state.data_source_method = "File Upload"
+# Parquet files of the current folder map filename -> path
+if 'local_files_data' not in st.session_state:
+    st.session_state.local_files_data = {}
+
+data_method = st.sidebar.radio(
+    "Data source:",
+    options=DATA_METHODS,
+    index=DATA_METHODS.index(st.session_state.data_source_method),
+    help="File Upload keeps a copy of every uploaded file on the server. File Path reads a local folder in place."
+)
+if data_method != st.session_state.data_source_method:
+    st.session_state.data_source_method = data_method
+    # Selections refer to files of the other source
+    st.session_state.selected_batches = []
 
-# COMMENTED OUT FILE PATH FUNCTIONALITY - UNCOMMENT FOR LOCAL USE
-# ================================================================
-# if 'folder_path' not in st.session_state:
-#     st.session_state.folder_path = "C:/path/to/parquet/folder"
-# if 'data_source_method' not in st.session_state:
-#     st.session_state.data_source_method = "File Path"
-# 
-# @st.cache_data
-# def get_parquet_files_cached(folder_path):
-#     """Cached wrapper for the utils function"""
-#     return get_parquet_files(folder_path)
+if data_method == "File Upload":
+    st.sidebar.success("☁️ **Cloud Environment**")
+    st.sidebar.info("Optimized for file uploads. Perfect for sharing with colleagues!")
+else:
+    st.sidebar.success("💻 **Local Environment**")
+    st.sidebar.info("Files are read in place through memory maps, nothing is copied.")
 
-# Cloud-optimized version - always use File Upload
-st.sidebar.success("☁️ **Cloud Environment**")
-st.sidebar.info("Optimized for file uploads. Perfect for sharing with colleagues!")
 
 # Show cached files info in sidebar
+st.sidebar.markdown("---")
 if st.session_state.uploaded_files_data:
-    st.sidebar.markdown("---")
     st.sidebar.markdown("**📦 Cached Uploaded Files:**")
     total_cached_size = 0
-    for filename, file_data in st.session_state.uploaded_files_data.items():
-        file_size = len(file_data) / 1024 / 1024
+    for filename, digest in st.session_state.uploaded_files_data.items():
+        file_size = upload_store.size(digest) / 1024 / 1024
         total_cached_size += file_size
         st.sidebar.write(f"📄 {filename} ({file_size:.1f} MB)")
     st.sidebar.caption(f"Total cached: {total_cached_size:.1f} MB")
     
-    # Clear cache button
-    if st.sidebar.button("🗑️ Clear Cached Files"):
+    # Only this session's list is cleared, identical uploads of other sessions
+    # share the stored copy, which the store removes once unused or over budget
+    if st.sidebar.button("🗑️ Clear Uploaded Files", help="Remove the uploaded files from your list"):
         st.session_state.uploaded_files_data = {}
+        st.session_state.uploaded_file_digests = {}
         st.session_state.selected_batches = []
         st.rerun()
+# Memory budget of the decoded data shared by all sessions
+render_cache_panel(upload_store)
 
-# Always use File Upload method
-st.markdown("### 📤 File Upload")
-st.info("📤 **File Upload Mode** - Upload your parquet files directly to analyze them.")
-st.markdown("*Optimized for easy sharing and collaboration.*")
-
-data_method = "File Upload"
+st.markdown("---")
 
-with st.expander("💡 Want to use File Path method locally?", expanded=False):
-    st.write("""
-    **To enable File Path method for local use:**
-    1. Download this app's source code
-    2. Uncomment the File Path sections in `Homepage.py` (look for the commented blocks)
-    3. Run locally with: `streamlit run Homepage.py`
+if data_method == "File Path":
+    st.markdown("### 📁 Folder Path Method")
+    
+    # Show if we have cached uploads available
+    if st.session_state.uploaded_files_data:
+        st.success(f"💾 You have {len(st.session_state.uploaded_files_data)} cached uploaded files available if you switch back to File Upload method.")
     
-    **Benefits of local File Path method:**
-    - 🗂️ Direct access to your file system
-    - 🚀 Faster processing of large files
-    - 🔒 Complete data privacy (no uploads needed)
-    - 💾 No file size limitations
-    """)
+    folder_path = st.text_input(
+        "Enter or paste the path to your data folder containing parquet files:",
+        value=st.session_state.folder_path,
+        key="folder_path_input",
+        placeholder=f"e.g., {DATA_ROOT} or a subfolder of it"
+    )
 
-st.markdown("---")
+    # Update session state when folder path changes
+    if folder_path != st.session_state.folder_path:
+        st.session_state.folder_path = folder_path
+        # Clear selected batches when folder changes
+        st.session_state.selected_batches = []
 
-# COMMENTED OUT FILE PATH METHOD - UNCOMMENT FOR LOCAL USE
-# ========================================================
-# if data_method == "File Path":
-#     st.markdown("### 📁 Folder Path Method")
-#     
-#     # Show if we have cached uploads available
-#     if st.session_state.uploaded_files_data:
-#         st.success(f"💾 You have {len(st.session_state.uploaded_files_data)} cached uploaded files available if you switch back to File Upload method.")
-#     
-#     folder_path = st.text_input(
-#         "Enter or paste the path to your data folder containing parquet files:",
-#         value=st.session_state.folder_path,
-#         key="folder_path_input",
-#         placeholder="e.g., C:/Data/ParquetFiles or /Users/username/data"
-#     )
-# 
-#     # Update session state when folder path changes
-#     if folder_path != st.session_state.folder_path:
-#         st.session_state.folder_path = folder_path
-#         # Clear selected batches when folder changes
-#         if folder_path != "C:/path/to/parquet/folder":
-#             st.session_state.selected_batches = []
-# 
-#     # Get parquet files from the folder
-#     parquet_files = get_parquet_files_cached(folder_path) if folder_path else []
-# 
-#     if parquet_files:
-#         st.success(f'✅ Found {len(parquet_files)} parquet files!')
-#         
-#         with st.expander("View all files", expanded=False):
-#             for f in parquet_files:
-#                 st.write(f"📄 {f}")
-#         
-#         # Filter selected batches to only include files that still exist
-#         valid_selected_batches = [f for f in st.session_state.selected_batches if f in parquet_files]
-#         if valid_selected_batches != st.session_state.selected_batches:
-#             st.session_state.selected_batches = valid_selected_batches
-#         
-#         selected_batches = st.multiselect(
-#             "Select files to analyze:",
-#             options=parquet_files,
-#             default=st.session_state.selected_batches,
-#             key="batch_selector_path"
-#         )
-#         
-#         # Update session state with current selections
-#         st.session_state.selected_batches = selected_batches
-# 
-#         if selected_batches:
-#             st.write("**You selected:**")
-#             for f in selected_batches:
-#                 st.write(f"✅ {f}")
-#             
-#             st.info("📊 Go to the **Viewer** page to see your data in tabs!")
-#         else:
-#             st.info("Please select files to analyze")
-#             
-#     elif folder_path and folder_path != "C:/path/to/parquet/folder":
-#         if os.path.exists(folder_path):
-#             st.warning("⚠️ No parquet files found in this folder.")
-#             st.info(f"Looking for files with .parquet extension in: `{folder_path}`")
-#         else:
-#             st.error("❌ The specified folder does not exist.")
-#             st.info("Please check the path and make sure the folder exists.")
-#     else:
-#         st.info("👆 Please enter the path to your data folder above.")
-#         
-#         with st.expander("💡 Path Examples", expanded=False):
-#             st.write("""
-#             **Windows examples:**
-#             - `C:\\Users\\YourName\\Documents\\Data`
-#             - `D:\\Projects\\ParquetFiles`
-#             
-#             **Mac/Linux examples:**
-#             - `/Users/yourname/Documents/data`
-#             - `/home/username/projects/data`
-#             
-#             **Tips:**
-#             - Use forward slashes (/) or double backslashes (\\\\)
-#             - Make sure the folder contains .parquet files
-#             - The path should be absolute (full path from root)
-#             """)
+    # Server folders outside the data folder are refused
+    data_folder = resolve_data_folder(folder_path) if folder_path else None
+    if folder_path and data_folder is None:
+        st.error(f"❌ Only folders inside `{DATA_ROOT}` can be opened.")
 
-# FILE UPLOAD METHOD - ACTIVE
-st.markdown("### 📤 File Upload Method")
+    # Listing an unchanged folder costs one stat, however many files it holds
+    with stage("folder listing"):
+        parquet_files = get_parquet_files(data_folder) if data_folder else []
+    st.session_state.local_files_data = {f: os.path.join(data_folder, f) for f in parquet_files}
 
-# Show cached files info if we have them
-if st.session_state.uploaded_files_data:
-    cached_count = len(st.session_state.uploaded_files_data)
-    total_cached_size = sum(len(data) for data in st.session_state.uploaded_files_data.values()) / 1024 / 1024
-    st.success(f"💾 You have {cached_count} files cached in memory ({total_cached_size:.1f} MB total)")
+    if parquet_files:
+        st.success(f'✅ Found {len(parquet_files):,} parquet files!')
+        
+        # The catalog holds the footer metadata of every file. It is brought
+        # up to date on a background thread, only when the listing changed
+        with stage("catalog update"):
+            catalog_update = catalog.refresh(data_folder, parquet_files)
+        render_catalog_status(catalog_update)
+        
+        # Filter selected batches to only include files that still exist
+        valid_selected_batches = [f for f in st.session_state.selected_batches if f in st.session_state.local_files_data]
+        if valid_selected_batches != st.session_state.selected_batches:
+            st.session_state.selected_batches = valid_selected_batches
+        
+        # Narrow down the options in large folders by name, channel or time
+        filter_col1, filter_col2 = st.columns(2)
+        with filter_col1:
+            name_filter = st.text_input("Filter file names:", key="folder_file_filter", placeholder="e.g., 2024-03")
+        with filter_col2:
+            channel_filter = st.text_input("Has a channel named:", key="folder_channel_filter", placeholder="e.g., Temp")
+        time_col1, time_col2 = st.columns(2)
+        with time_col1:
+            covers_from = st.text_input("Covers time from:", key="folder_time_from", placeholder="e.g., 2024-03-01 08:00")
+        with time_col2:
+            covers_to = st.text_input("Covers time until:", key="folder_time_to", placeholder="e.g., 2024-03-01 17:00")
+        time_bounds = []
+        for value in (covers_from, covers_to):
+            try:
+                time_bounds.append(pd.Timestamp(value) if value.strip() else None)
+            except ValueError:
+                st.warning(f"⚠️ Could not read the time `{value}`, it is ignored.")
+                time_bounds.append(None)
+        
+        with stage("catalog search"):
+            matches = catalog.search(
+                data_folder, name=name_filter, channel=channel_filter, start=time_bounds[0], end=time_bounds[1]
+            )
+        matches = matches[matches["File"].isin(st.session_state.local_files_data)]
+        filtering = bool(name_filter or channel_filter) or any(bound is not None for bound in time_bounds)
+        
+        with st.expander(f"Batch catalog ({len(matches):,} of {len(parquet_files):,} files)", expanded=False):
+            st.dataframe(
+                matches.drop(columns=["Hash"]),
+                hide_index=True,
+                use_container_width=True,
+                column_config={"Size (MB)": st.column_config.NumberColumn(format="%.1f")}
+            )
+            # Files rewritten in place keep the folder listing, rescan them on request
+            if st.button("🔄 Rescan files", key="catalog_rescan", disabled=not catalog_update.finished):
+                catalog.refresh(data_folder, parquet_files, force=True)
+                st.rerun()
+        
+        # Without filters every file can be chosen, also those the catalog hasn't read yet
+        listed = matches["File"].tolist() if filtering else parquet_files
+        options = list(dict.fromkeys(st.session_state.selected_batches + listed))
+        
+        selected_batches = st.multiselect(
+            "Select files to analyze:",
+            options=options,
+            default=st.session_state.selected_batches,
+            key="batch_selector_path"
+        )
+        
+        # Update session state with current selections
+        st.session_state.selected_batches = selected_batches
 
-# File uploader
-uploaded_files = st.file_uploader(
-    "Choose parquet files to analyze:",
-    type=['parquet'],
-    accept_multiple_files=True,
-    help="Select one or more .parquet files from your computer. Previously uploaded files are cached and will remain available."
-)
+        if selected_batches:
+            st.write("**You selected:**")
+            for f in selected_batches:
+                file_size = os.path.getsize(st.session_state.local_files_data[f]) / 1024 / 1024  # MB
+                st.write(f"✅ {f} ({file_size:.1f} MB)")
+            
+            st.info("📊 Go to the **Viewer** page to see your data in tabs!")
+        else:
+            st.info("Please select files to analyze")
+            
+    elif data_folder:
+        if os.path.exists(data_folder):
+            st.warning("⚠️ No parquet files found in this folder.")
+            st.info(f"Looking for files with .parquet extension in: `{data_folder}`")
+        else:
+            st.error("❌ The specified folder does not exist.")
+            st.info("Please check the path and make sure the folder exists.")
+    elif not folder_path:
+        st.info("👆 Please enter the path to your data folder above.")
+        
+        with st.expander("💡 Path Examples", expanded=False):
+            st.write("""
+            **Windows examples:**
+            - `C:\\Users\\YourName\\Documents\\Data`
+            - `D:\\Projects\\ParquetFiles`
+            
+            **Mac/Linux examples:**
+            - `/Users/yourname/Documents/data`
+            - `/home/username/projects/data`
+            
+            **Tips:**
+            - Use forward slashes (/) or double backslashes (\\\\)
+            - Make sure the folder contains .parquet files
+            - Relative paths start at the data folder of this server, folders outside it can't be opened
+            """)
+
+# FILE UPLOAD METHOD
+else:
+    st.markdown("### 📤 File Upload Method")
+
+    # Show cached files info if we have them
+    if st.session_state.uploaded_files_data:
+        cached_count = len(st.session_state.uploaded_files_data)
+        total_cached_size = sum(upload_store.size(digest) for digest in st.session_state.uploaded_files_data.values()) / 1024 / 1024
+        st.success(f"💾 You have {cached_count} files cached on disk ({total_cached_size:.1f} MB total)")
+
+    # File uploader
+    uploaded_files = st.file_uploader(
+        "Choose parquet files to analyze:",
+        type=['parquet'],
+        accept_multiple_files=True,
+        help="Select one or more .parquet files from your computer. Previously uploaded files are cached and will remain available."
+    )
 
-# Handle newly uploaded files
-if uploaded_files:
-    st.success(f'✅ {len(uploaded_files)} file(s) uploaded successfully!')
+    # Handle newly uploaded files
+    if uploaded_files:
+        st.success(f'✅ {len(uploaded_files)} file(s) uploaded successfully!')
     
-    # Merge new files with existing cached files
-    new_files = {}
-    file_names = []
+        # Merge new files with existing cached files
+        new_files = {}
+        file_names = []
     
-    for uploaded_file in uploaded_files:
-        file_names.append(uploaded_file.name)
-        new_files[uploaded_file.name] = uploaded_file.getvalue()
+        for uploaded_file in uploaded_files:
+            file_names.append(uploaded_file.name)
+            # Write each upload to the store once, identical files are deduplicated
+            digest = st.session_state.uploaded_file_digests.get(uploaded_file.file_id)
+            if digest is None or not upload_store.contains(digest):
+                with stage("upload store", nbytes=uploaded_file.size):
+                    digest = upload_store.put(uploaded_file)
+                st.session_state.uploaded_file_digests[uploaded_file.file_id] = digest
+            new_files[uploaded_file.name] = digest
+        # A disk budget smaller than the upload may already have evicted earlier files
+        new_files = {name: digest for name, digest in new_files.items() if upload_store.contains(digest)}
+        file_names = list(new_files)
     
-    # Update session state - merge with existing files
-    st.session_state.uploaded_files_data.update(new_files)
+        # Update session state - merge with existing files
+        st.session_state.uploaded_files_data.update(new_files)
     
-    # Show what was just uploaded
-    st.write("**Just uploaded:**")
-    for name in file_names:
-        file_size = len(new_files[name]) / 1024 / 1024  # MB
-        st.write(f"📄 {name} ({file_size:.1f} MB)")
+        # Show what was just uploaded
+        st.write("**Just uploaded:**")
+        for name in file_names:
+            file_size = upload_store.size(new_files[name]) / 1024 / 1024  # MB
+            st.write(f"📄 {name} ({file_size:.1f} MB)")
     
-    # Clear previous selections since we have new files
-    st.session_state.selected_batches = []
+        # Clear previous selections since we have new files
+        st.session_state.selected_batches = []
 
-# Show file selection interface if we have files (either newly uploaded or cached)
-if st.session_state.uploaded_files_data:
-    current_file_names = list(st.session_state.uploaded_files_data.keys())
+    # Show file selection interface if we have files (either newly uploaded or cached)
+    if st.session_state.uploaded_files_data:
+        current_file_names = list(st.session_state.uploaded_files_data.keys())
     
-    # If no files were just uploaded, show info about cached files
-    if not uploaded_files:
-        st.info("📋 Showing your cached uploaded files. Upload new files above to add more.")
-        st.write("**Available files:**")
-        for name in current_file_names:
-            file_size = len(st.session_state.uploaded_files_data[name]) / 1024 / 1024  # MB
-            st.write(f"📄 {name} ({file_size:.1f} MB)")
+        # If no files were just uploaded, show info about cached files
+        if not uploaded_files:
+            st.info("📋 Showing your cached uploaded files. Upload new files above to add more.")
+            st.write("**Available files:**")
+            for name in current_file_names:
+                file_size = upload_store.size(st.session_state.uploaded_files_data[name]) / 1024 / 1024  # MB
+                st.write(f"📄 {name} ({file_size:.1f} MB)")
     
-    # Filter selected batches to only include files that are currently available
-    valid_selected_batches = [f for f in st.session_state.selected_batches if f in current_file_names]
-    if valid_selected_batches != st.session_state.selected_batches:
-        st.session_state.selected_batches = valid_selected_batches
+        # Filter selected batches to only include files that are currently available
+        valid_selected_batches = [f for f in st.session_state.selected_batches if f in current_file_names]
+        if valid_selected_batches != st.session_state.selected_batches:
+            st.session_state.selected_batches = valid_selected_batches
     
-    # File selection
-    st.markdown("---")
-    selected_batches = st.multiselect(
-        "Select files to analyze:",
-        options=current_file_names,
-        default=st.session_state.selected_batches,
-        key="batch_selector_upload"
-    )
+        # File selection
+        st.markdown("---")
+        selected_batches = st.multiselect(
+            "Select files to analyze:",
+            options=current_file_names,
+            default=st.session_state.selected_batches,
+            key="batch_selector_upload"
+        )
     
-    # Update session state with current selections
-    st.session_state.selected_batches = selected_batches
+        # Update session state with current selections
+        st.session_state.selected_batches = selected_batches
 
-    if selected_batches:
-        st.write("**You selected:**")
-        for f in selected_batches:
-            file_size = len(st.session_state.uploaded_files_data[f]) / 1024 / 1024  # MB
-            st.write(f"✅ {f} ({file_size:.1f} MB)")
+        if selected_batches:
+            st.write("**You selected:**")
+            for f in selected_batches:
+                file_size = upload_store.size(st.session_state.uploaded_files_data[f]) / 1024 / 1024  # MB
+                st.write(f"✅ {f} ({file_size:.1f} MB)")
         
-        st.info("📊 Go to the **Viewer** page to see your data in tabs!")
-    else:
-        st.info("Please select files to analyze from your available files.")
+            st.info("📊 Go to the **Viewer** page to see your data in tabs!")
+        else:
+            st.info("Please select files to analyze from your available files.")
 
-else:
-    st.info("👆 Please upload your parquet files above to get started.")
+    else:
+        st.info("👆 Please upload your parquet files above to get started.")
     
-    with st.expander("ℹ️ What files can I upload?", expanded=False):
-        st.write("""
-        **Supported file format:**
-        - `.parquet` files only
+        with st.expander("ℹ️ What files can I upload?", expanded=False):
+            st.write("""
+            **Supported file format:**
+            - `.parquet` files only
         
-        **File requirements:**
-        - Files should contain tabular data
-        - Preferably with datetime index or datetime columns for time series visualization
-        - Numeric columns for plotting line graphs
+            **File requirements:**
+            - Files should contain tabular data
+            - Preferably with datetime index or datetime columns for time series visualization
+            - Numeric columns for plotting line graphs
         
-        **File size limits:**
-        - Maximum file size depends on your platform
-        - For large files, consider downloading and running this app locally
+            **File size limits:**
+            - Maximum file size depends on your platform
+            - For large files, consider downloading and running this app locally
         
-        **Tips:**
-        - You can upload multiple files at once by holding Ctrl/Cmd while selecting
-        - Each file will appear as a separate tab in the Viewer
-        - File names will be used as tab names (without .parquet extension)
-        - Files are cached in memory during your session
-        """)
+            **Tips:**
+            - You can upload multiple files at once by holding Ctrl/Cmd while selecting
+            - Each file will appear as a separate tab in the Viewer
+            - File names will be used as tab names (without .parquet extension)
+            - Files are cached on the server's disk and identical files are stored only once
+            - Uploads are deleted from the server after a period without use, *Clear Uploaded Files* removes them from your list
+            """)
+
+# Start decoding the selected files in the background, so the Viewer opens warm
+if data_method == "File Path":
+    prefetch_files = [
+        (f, local_file_key(st.session_state.local_files_data[f]))
+        for f in st.session_state.selected_batches if f in st.session_state.local_files_data
+    ]
+else:
+    prefetch_files = [
+        (f, st.session_state.uploaded_files_data[f])
+        for f in st.session_state.selected_batches if f in st.session_state.uploaded_files_data
+    ]
+for name, key in prefetch_files:
+    prefetcher.submit(name, key)
 
 # Show current status
 st.markdown("---")
@@ -260,22 +353,29 @@ st.markdown("### 📋 Current Status")
 
 col1, col2, col3 = st.columns(3)
 with col1:
-    st.metric("Environment", "☁️ Cloud")
+    st.metric("Environment", "💻 Local" if data_method == "File Path" else "☁️ Cloud")
     
 with col2:
     file_count = len(st.session_state.selected_batches)
     st.metric("Selected Files", file_count)
 
 with col3:
-    cached_count = len(st.session_state.uploaded_files_data)
-    st.metric("Cached Files", cached_count)
+    if data_method == "File Path":
+        st.metric("Folder Files", len(st.session_state.local_files_data))
+    else:
+        cached_count = len(st.session_state.uploaded_files_data)
+        st.metric("Cached Files", cached_count)
 
 if st.session_state.selected_batches:
     with st.expander("📁 View Selected Files", expanded=False):
         total_size = 0
         for f in st.session_state.selected_batches:
-            if f in st.session_state.uploaded_files_data:
-                file_size = len(st.session_state.uploaded_files_data[f]) / 1024 / 1024
+            if data_method == "File Path" and f in st.session_state.local_files_data:
+                file_size = os.path.getsize(st.session_state.local_files_data[f]) / 1024 / 1024
+                total_size += file_size
+                st.write(f"✅ {f} ({file_size:.1f} MB)")
+            elif f in st.session_state.uploaded_files_data:
+                file_size = upload_store.size(st.session_state.uploaded_files_data[f]) / 1024 / 1024
                 total_size += file_size
                 st.write(f"✅ {f} ({file_size:.1f} MB)")
         
@@ -285,10 +385,17 @@ if st.session_state.selected_batches:
 # Footer with sharing info
 st.markdown("---")
 st.markdown("### 🚀 Share This App")
-st.info("""
+if upload_store.ttl_hours is not None:
+    retention = f"deleted after {upload_store.ttl_hours:g} hours without use"
+else:
+    retention = "kept until they are deleted or the store is full"
+st.info(f"""
 **This app is perfect for sharing!** 
 - Send the URL to colleagues to analyze their parquet files
 - No Python installation required
 - Works on any device with a web browser
-- Data is processed securely and not stored permanently
+- Uploaded files are stored on the server's disk and {retention}
 """)
+
+render_prefetch_panel(prefetcher, prefetch_files)
+render_profiler_panel(profiler)
@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+from decimation import decimate
+from file_cache import (
+    load_column_stats_from_store,
+    load_null_counts_from_store,
+    load_null_index_from_store,
+    load_parquet_from_store,
+    load_parquet_rows_from_store,
+    load_parquet_schema_from_store,
+    load_pyramid_from_store,
+    load_resampled_from_store,
+    load_time_index_from_store,
+    rolling_window_from_store,
+)
+from instrumentation import stage
+from plot_arrays import plot_x, plot_y, scatter_class
+from pyramid import choose_level, level_trace
+from resample import resampled_window
+from rolling import ROLLING_WINDOW_DEFAULT
+
+
+# Figure and tables of one file, shared by the Viewer and the headless report
+
+
+def build_line_figure(file_digest, filename, y_columns, x_column, time_range, decimation_method, max_points,
+                      resample_interval="Raw", aggregation="mean", overlays=(), rolling_window=ROLLING_WINDOW_DEFAULT):
+    """Line graph of one file for the given columns and time window"""
+    schema_info = load_parquet_schema_from_store(file_digest, filename)
+    time_index = load_time_index_from_store(file_digest)
+    has_datetime_index = time_index is not None and len(time_index) > 0
+    total_rows = schema_info['num_rows']
+    if has_datetime_index:
+        window_start, window_end = time_range if time_range is not None else (time_index.start, time_index.end)
+
+    # Resampled columns are computed once per file, column, interval and
+    # aggregation, and only sliced to the window here
+    resampled = x_column == "index" and has_datetime_index and resample_interval != "Raw"
+    if resampled:
+        with stage("resample"):
+            resampled_series = {
+                y_col: resampled_window(
+                    load_resampled_from_store(file_digest, y_col, resample_interval, aggregation),
+                    resample_interval, window_start, window_end
+                )
+                for y_col in y_columns
+            }
+
+    # Use the precomputed aggregate pyramid when the window
+    # holds far more rows than the point budget
+    pyramid_level = None
+    if not resampled and x_column == "index" and has_datetime_index and decimation_method != "None":
+        with stage("pyramid lookup"):
+            pyramid_level = choose_level(
+                load_pyramid_from_store(file_digest), window_start, window_end, max_points,
+                time_index.count(window_start, window_end)
+            )
+
+    if resampled or pyramid_level is not None:
+        window_rows = time_index.count(window_start, window_end)
+    else:
+        plot_columns = list(y_columns)
+        if x_column != "index" and x_column not in plot_columns:
+            plot_columns.append(x_column)
+
+        # Load only the plotted columns of the time window. For time-sorted
+        # files the window is a contiguous row range found by binary search
+        with stage("parquet decode") as decode_stage:
+            if time_range is not None and time_index.is_sorted:
+                window_start_row, window_stop_row = time_index.window_positions(*time_range)
+                df = load_parquet_rows_from_store(
+                    file_digest, filename, window_start_row, window_stop_row, columns=tuple(plot_columns)
+                )
+            else:
+                df = load_parquet_from_store(file_digest, filename, columns=tuple(plot_columns), time_range=time_range)
+            if df is None:
+                raise ValueError(f"could not load {filename}")
+            decode_stage.add_bytes(df.memory_usage(index=True).sum())
+        window_rows = len(df)
+        if x_column == "index" and not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind='stable')
+
+        # Handle x-axis data
+        if x_column == "index":
+            x_data = df.index
+        else:
+            x_data = df[x_column]
+    x_title = "Index" if x_column == "index" else x_column
+
+    # Downsample each selected y column to the point budget for the current window
+    traces = []
+    for y_col in y_columns:
+        if resampled:
+            series = resampled_series[y_col]
+            keep = decimate(series.index, series, max_points, method=decimation_method)
+            trace_x, trace_y = series.index[keep], series.iloc[keep]
+        elif pyramid_level is not None:
+            level_x, level_y = level_trace(pyramid_level[1], y_col, decimation_method)
+            keep = decimate(level_x, level_y, max_points, method=decimation_method)
+            trace_x, trace_y = level_x[keep], level_y[keep]
+        else:
+            keep = decimate(x_data, df[y_col], max_points, method=decimation_method)
+            trace_x = x_data[keep] if x_column == "index" else x_data.iloc[keep]
+            trace_y = df[y_col].iloc[keep]
+        traces.append((y_col, trace_x, trace_y))
+    plotted_points = max((len(trace_y) for _, _, trace_y in traces), default=0)
+
+    # Create the plot. Traces get contiguous numeric arrays, which plotly
+    # sends as binary typed arrays, and dense figures are drawn with WebGL
+    fig = go.Figure()
+    scatter = scatter_class(sum(len(trace_y) for _, _, trace_y in traces))
+    x_is_datetime = False
+    for y_col, trace_x, trace_y in traces:
+        trace_x, is_datetime = plot_x(trace_x)
+        x_is_datetime = x_is_datetime or is_datetime
+        fig.add_trace(scatter(
+            x=trace_x,
+            y=plot_y(trace_y),
+            mode='lines',
+            name=y_col,
+            line=dict(width=2)
+        ))
+
+    # Rolling overlays over the raw rows of the window, sampled to the point budget
+    if overlays and x_column == "index" and has_datetime_index:
+        lo, hi = time_index.window_positions(window_start, window_end)
+        positions = np.unique(np.linspace(lo, hi - 1, min(max_points, hi - lo)).astype(np.int64)) if hi > lo else np.array([], dtype=np.int64)
+        overlay_x, _ = plot_x(time_index.timestamps(positions))
+        overlay_scatter = scatter_class(len(positions) * len(y_columns) * len(overlays))
+        for i, y_col in enumerate(y_columns):
+            with stage("rolling overlays"):
+                rolling = rolling_window_from_store(file_digest, y_col, rolling_window, lo, hi)
+            color = qualitative.Plotly[i % len(qualitative.Plotly)]
+            picked = {name: values[positions - lo] for name, values in rolling.items()}
+            if "±σ band" in overlays:
+                fig.add_trace(overlay_scatter(
+                    x=overlay_x, y=plot_y(picked['mean'] - picked['std']), mode='lines',
+                    line=dict(width=0, color=color), legendgroup=f"{y_col} band", showlegend=False, hoverinfo='skip'
+                ))
+                fig.add_trace(overlay_scatter(
+                    x=overlay_x, y=plot_y(picked['mean'] + picked['std']), mode='lines', fill='tonexty',
+                    line=dict(width=0, color=color), opacity=0.2, legendgroup=f"{y_col} band",
+                    name=f"{y_col} ±σ ({rolling_window:,} rows)", hoverinfo='skip'
+                ))
+            if "Moving average" in overlays:
+                fig.add_trace(overlay_scatter(
+                    x=overlay_x, y=plot_y(picked['mean']), mode='lines',
+                    line=dict(width=2, color=color, dash='dash'), name=f"{y_col} mean ({rolling_window:,} rows)"
+                ))
+            if "Rolling min/max" in overlays:
+                for statistic in ('min', 'max'):
+                    fig.add_trace(overlay_scatter(
+                        x=overlay_x, y=plot_y(picked[statistic]), mode='lines',
+                        line=dict(width=1, color=color, dash='dot'), name=f"{y_col} {statistic} ({rolling_window:,} rows)"
+                    ))
+    if x_is_datetime:
+        fig.update_xaxes(type='date')
+
+    # Update layout with dynamic title
+    filter_status = f" - Filtered ({window_rows:,} points)" if window_rows != total_rows else f" ({window_rows:,} points)"
+    if resampled:
+        filter_status += f" - {resample_interval} {aggregation}, {plotted_points:,} per trace"
+    elif pyramid_level is not None:
+        filter_status += f" - {pyramid_level[0]} aggregates, {plotted_points:,} per trace"
+    elif plotted_points < window_rows:
+        filter_status += f" - {decimation_method} to {plotted_points:,} per trace"
+
+    fig.update_layout(
+        title=f"Line Graph for {filename}{filter_status}",
+        xaxis_title=x_title,
+        yaxis_title="Values",
+        hovermode='x unified',
+        showlegend=True,
+        height=500
+    )
+    return fig
+
+
+def plot_statistics(file_digest, columns, window_lo, window_hi, quantiles=False):
+    """describe() of the given columns for the rows [window_lo, window_hi) in time order"""
+    return pd.DataFrame({
+        column: load_column_stats_from_store(file_digest, column).describe(window_lo, window_hi, quantiles=quantiles)
+        for column in columns
+    })
+
+
+def column_info(file_digest, schema_info, time_range, window_lo, window_hi):
+    """Type, non-null and null count of every column.
+
+    The full file is covered by the parquet footer statistics, a time window
+    by the precomputed null index.
+    """
+    all_columns = schema_info['columns']
+    if time_range is None:
+        window_rows, null_counts = load_null_counts_from_store(file_digest)
+    else:
+        window_rows = window_hi - window_lo
+        null_counts = load_null_index_from_store(file_digest).null_counts(window_lo, window_hi)
+    return pd.DataFrame({
+        'Column': all_columns,
+        'Type': [schema_info['dtypes'][c] for c in all_columns],
+        'Non-null Count': [window_rows - null_counts[c] if null_counts[c] is not None else None for c in all_columns],
+        'Null Count': [null_counts[c] for c in all_columns]
+    }, index=all_columns)
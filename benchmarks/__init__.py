@@ -0,0 +1,5 @@
+"""Headless benchmarks of the dashboard code paths on synthetic DK258-shaped data.
+
+Run from the repository root:
+    python -m benchmarks.run [--sizes xs s] [--repeat 3]
+"""
@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from utils import PARQUET_ROW_GROUP_SIZE
+
+
+# Named dataset sizes as (rows, data columns)
+SIZES = {
+    "xs": (10_000, 5),
+    "s": (100_000, 20),
+    "m": (1_000_000, 50),
+    "l": (10_000_000, 100),
+    "xl": (50_000_000, 500),
+}
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+START_TIME = pd.Timestamp("2024-01-01 00:00:00")
+SAMPLE_INTERVAL = pd.Timedelta(milliseconds=100)
+# Share of sensor values left empty, like logger dropouts
+NULL_FRACTION = 0.01
+
+
+def column_names(n_columns):
+    return [f"Sensor_{i:03d}" for i in range(n_columns)]
+
+
+def _chunks(n_rows, n_columns, seed, chunk_rows):
+    """Yield (times, values) chunks of a reproducible multi-channel random walk"""
+    rng = np.random.default_rng(seed)
+    level = rng.normal(0.0, 10.0, size=n_columns)
+    for start in range(0, n_rows, chunk_rows):
+        rows = min(chunk_rows, n_rows - start)
+        times = START_TIME + SAMPLE_INTERVAL * np.arange(start, start + rows)
+        values = level + np.cumsum(rng.normal(0.0, 0.1, size=(rows, n_columns)), axis=0)
+        level = values[-1].copy()
+        values[rng.random(size=values.shape) < NULL_FRACTION] = np.nan
+        yield pd.DatetimeIndex(times, name="Time").as_unit("ns"), values
+
+
+def _schema(names):
+    empty = pd.DataFrame({name: pd.Series(dtype="float64") for name in names},
+                         index=pd.DatetimeIndex([], dtype="datetime64[ns]", name="Time"))
+    return pa.Schema.from_pandas(empty, preserve_index=True)
+
+
+def write_parquet_dataset(path, n_rows, n_columns, seed=0, row_group_size=PARQUET_ROW_GROUP_SIZE):
+    """Time-indexed float64 parquet shaped like the output of convert_csv_to_parquet"""
+    tmp_path = f"{path}.tmp"
+    names = column_names(n_columns)
+    with pq.ParquetWriter(tmp_path, _schema(names)) as writer:
+        for times, values in _chunks(n_rows, n_columns, seed, row_group_size):
+            chunk = pd.DataFrame(values, index=times, columns=names)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=True))
+    os.replace(tmp_path, path)
+
+
+def write_csv_dataset(path, n_rows, n_columns, seed=0, chunk_rows=PARQUET_ROW_GROUP_SIZE):
+    """Raw logger style CSV with a text Time column and empty cells for missing values"""
+    tmp_path = f"{path}.tmp"
+    names = column_names(n_columns)
+    schema = pa.schema([("Time", pa.timestamp("ms"))] + [(name, pa.float64()) for name in names])
+    with pacsv.CSVWriter(tmp_path, schema) as writer:
+        for times, values in _chunks(n_rows, n_columns, seed, chunk_rows):
+            arrays = [pa.array(times.as_unit("ms"))]
+            arrays += [pa.array(values[:, j], from_pandas=True) for j in range(n_columns)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    os.replace(tmp_path, path)
+
+
+def dataset_paths(size, seed=0, data_dir=DATA_DIR):
+    base = os.path.join(data_dir, f"dk258_{size}_seed{seed}")
+    return f"{base}.parquet", f"{base}.csv"
+
+
+def ensure_dataset(size, seed=0, data_dir=DATA_DIR, csv=True):
+    """Generate the parquet (and CSV) of a named size unless it already exists"""
+    n_rows, n_columns = SIZES[size]
+    os.makedirs(data_dir, exist_ok=True)
+    parquet_path, csv_path = dataset_paths(size, seed, data_dir)
+    if not os.path.isfile(parquet_path):
+        print(f"generating {os.path.basename(parquet_path)} ({n_rows:,} rows x {n_columns} columns)")
+        write_parquet_dataset(parquet_path, n_rows, n_columns, seed)
+    if csv and not os.path.isfile(csv_path):
+        print(f"generating {os.path.basename(csv_path)}")
+        write_csv_dataset(csv_path, n_rows, n_columns, seed)
+    return parquet_path, csv_path if csv else None
@@ -0,0 +1,295 @@
+"""Time the dashboard code paths on synthetic datasets and keep a JSON history.
+
+Usage:
+    python -m benchmarks.run [--sizes xs s m] [--only NAME ...] [--repeat N]
+                             [--history PATH] [--no-save]
+
+Every run is appended to the history file together with the git commit, so
+the medians can be compared between commits. Each result is compared with
+the previous run of the same benchmark on the same machine.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from batch_views import build_line_figure
+from benchmarks.datasets import SIZES, column_names, ensure_dataset
+from local_folder import local_file_key
+from pyramid import build_pyramid
+from range_stats import ColumnRangeStats, null_index_from_parquet
+from time_index import TimeIndex
+from utils import clean_date, convert_csv_to_parquet, load_csv_file, load_parquet_file, read_parquet_rows
+
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.json")
+# Benchmarks that hold the whole file in memory are skipped above this size
+MAX_FULL_LOAD_BYTES = 2 * 1024 ** 3
+PLOT_COLUMNS = 3
+MAX_POINTS = 5000
+# A median this much slower than the previous run is reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+
+class Context:
+    """Dataset paths and the derived inputs shared by the benchmarks of one size"""
+
+    def __init__(self, size, parquet_path, csv_path):
+        self.size = size
+        self.rows, self.columns = SIZES[size]
+        self.parquet_path = parquet_path
+        self.csv_path = csv_path
+        self.plot_columns = column_names(self.columns)[:PLOT_COLUMNS]
+        self._time_index = None
+
+    @property
+    def full_bytes(self):
+        return self.rows * (self.columns + 1) * 8
+
+    @property
+    def time_index(self):
+        if self._time_index is None:
+            self._time_index = TimeIndex.from_parquet(self.parquet_path)
+        return self._time_index
+
+    @property
+    def window(self):
+        """The middle 10% of the time range, a typical zoomed-in view"""
+        start, end = self.time_index.start, self.time_index.end
+        return start + (end - start) * 0.45, start + (end - start) * 0.55
+
+
+# Every benchmark does its setup and returns the function to time
+def bench_load_parquet(ctx):
+    return lambda: load_parquet_file(ctx.parquet_path)
+
+
+def bench_load_parquet_columns(ctx):
+    return lambda: load_parquet_file(ctx.parquet_path, columns=ctx.plot_columns)
+
+
+def bench_load_parquet_window(ctx):
+    window = ctx.window
+    return lambda: load_parquet_file(ctx.parquet_path, columns=ctx.plot_columns, time_range=window)
+
+
+def bench_csv_clean(ctx):
+    return lambda: clean_date(load_csv_file(ctx.csv_path))
+
+
+def bench_csv_convert(ctx):
+    output = os.path.join(tempfile.mkdtemp(prefix="dk258_bench_"), "converted.parquet")
+    return lambda: convert_csv_to_parquet(ctx.csv_path, output)
+
+
+def bench_time_index(ctx):
+    return lambda: TimeIndex.from_parquet(ctx.parquet_path)
+
+
+def _window_frame(ctx, lo, hi):
+    return read_parquet_rows(ctx.parquet_path, lo, hi, columns=ctx.plot_columns).to_pandas()
+
+
+def bench_time_window_filter(ctx):
+    time_index, window = ctx.time_index, ctx.window
+    return lambda: _window_frame(ctx, *time_index.window_positions(*window))
+
+
+def _line_figure(ctx, method):
+    """The Viewer line graph of the window, its data is cached by the first (untimed) call"""
+    key = local_file_key(ctx.parquet_path)
+    filename = os.path.basename(ctx.parquet_path)
+
+    def run():
+        return build_line_figure(key, filename, tuple(ctx.plot_columns), "index", ctx.window, method, MAX_POINTS)
+    run()
+    return run
+
+
+def bench_figure_lttb(ctx):
+    return _line_figure(ctx, "LTTB")
+
+
+def bench_figure_minmax(ctx):
+    return _line_figure(ctx, "Min/Max")
+
+
+def bench_figure_serialize(ctx):
+    fig = _line_figure(ctx, "LTTB")()
+    return lambda: fig.to_json()
+
+
+def bench_pyramid_build(ctx):
+    return lambda: build_pyramid(ctx.parquet_path, columns=ctx.plot_columns)
+
+
+def bench_stats_build(ctx):
+    column = ctx.plot_columns[0]
+    values = pq.read_table(ctx.parquet_path, columns=[column]).column(column).to_numpy()
+    return lambda: ColumnRangeStats(values)
+
+
+def bench_stats_window(ctx):
+    column = ctx.plot_columns[0]
+    values = pq.read_table(ctx.parquet_path, columns=[column]).column(column).to_numpy()
+    stats = ColumnRangeStats(values)
+    lo, hi = ctx.time_index.window_positions(*ctx.window)
+
+    def run():
+        # Fresh window every call so the quantile cache doesn't hide the cost
+        stats._quantiles.clear()
+        return stats.describe(lo, hi, quantiles=True)
+    return run
+
+
+def bench_null_index(ctx):
+    return lambda: null_index_from_parquet(ctx.parquet_path, column_names(ctx.columns))
+
+
+# name -> (function, needs the CSV, holds the whole file in memory)
+BENCHMARKS = {
+    "load_parquet": (bench_load_parquet, False, True),
+    "load_parquet_columns": (bench_load_parquet_columns, False, False),
+    "load_parquet_window": (bench_load_parquet_window, False, False),
+    "csv_clean": (bench_csv_clean, True, True),
+    "csv_convert": (bench_csv_convert, True, False),
+    "time_index": (bench_time_index, False, False),
+    "time_window_filter": (bench_time_window_filter, False, False),
+    "figure_lttb": (bench_figure_lttb, False, False),
+    "figure_minmax": (bench_figure_minmax, False, False),
+    "figure_serialize": (bench_figure_serialize, False, False),
+    "pyramid_build": (bench_pyramid_build, False, False),
+    "stats_build": (bench_stats_build, False, False),
+    "stats_window": (bench_stats_window, False, False),
+    "null_index": (bench_null_index, False, False),
+}
+
+
+def time_call(func, repeat):
+    """Wall-clock seconds of repeat calls of func"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run_benchmarks(sizes, names, repeat=3, seed=0):
+    """Run the selected benchmarks for every size and return the result records"""
+    needs_csv = any(BENCHMARKS[name][1] for name in names)
+    results = []
+    for size in sizes:
+        parquet_path, csv_path = ensure_dataset(size, seed=seed, csv=needs_csv)
+        ctx = Context(size, parquet_path, csv_path)
+        for name in names:
+            func, _, full_load = BENCHMARKS[name]
+            if full_load and ctx.full_bytes > MAX_FULL_LOAD_BYTES:
+                print(f"{size:>3} {name:<22} skipped (needs ~{ctx.full_bytes / 1024 ** 3:.1f} GB in memory)")
+                continue
+            timings = time_call(func(ctx), repeat)
+            result = {
+                "size": size,
+                "rows": ctx.rows,
+                "columns": ctx.columns,
+                "benchmark": name,
+                "repeat": repeat,
+                "min_s": round(min(timings), 6),
+                "median_s": round(statistics.median(timings), 6),
+            }
+            results.append(result)
+            print(f"{size:>3} {name:<22} median {result['median_s'] * 1000:10.1f} ms   "
+                  f"min {result['min_s'] * 1000:10.1f} ms")
+    return results
+
+
+def git_commit():
+    """Short commit hash of the working tree, marked dirty if there are local changes"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if status else commit
+
+
+def load_history(path):
+    if not os.path.isfile(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    """Write the history atomically so an interrupted run never corrupts it"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def compare(previous_run, results):
+    """Print the change of every median against the previous run, returns the regressions"""
+    before = {(r["size"], r["benchmark"]): r["median_s"] for r in previous_run["results"]}
+    regressions = []
+    print(f"\nCompared with {previous_run['commit']} ({previous_run['timestamp']}):")
+    for result in results:
+        old = before.get((result["size"], result["benchmark"]))
+        if not old:
+            continue
+        ratio = result["median_s"] / old
+        flag = ""
+        if ratio > 1 + REGRESSION_THRESHOLD:
+            flag = "  REGRESSION"
+            regressions.append(result)
+        print(f"{result['size']:>3} {result['benchmark']:<22} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DK258 dashboard code paths.")
+    parser.add_argument("--sizes", nargs="+", default=["xs", "s"], choices=list(SIZES),
+                        help="Dataset sizes to run (default: xs s)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="Run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed calls per benchmark (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON history file")
+    parser.add_argument("--no-save", action="store_true", help="Don't append this run to the history")
+    args = parser.parse_args(argv)
+
+    run = {
+        "commit": git_commit(),
+        "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__, "pyarrow": pa.__version__},
+        "seed": args.seed,
+        "results": run_benchmarks(args.sizes, args.only, repeat=args.repeat, seed=args.seed),
+    }
+
+    history = load_history(args.history)
+    previous = [r for r in history if r["machine"] == run["machine"] and r["seed"] == run["seed"]]
+    if previous:
+        compare(previous[-1], run["results"])
+    if not args.no_save:
+        history.append(run)
+        save_history(args.history, history)
+        print(f"\nSaved run to {args.history}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
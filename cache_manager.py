@@ -0,0 +1,229 @@
+import functools
+import inspect
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+
+def _default_budget():
+    """A quarter of the physical memory, or 2 GB where that can't be read"""
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 4
+    except (ValueError, OSError, AttributeError):
+        return 2 * 1024 ** 3
+
+
+DEFAULT_BUDGET = (
+    int(float(os.environ["DK258_CACHE_BUDGET_MB"]) * 1024 * 1024)
+    if os.environ.get("DK258_CACHE_BUDGET_MB") else _default_budget()
+)
+
+
+def estimate_size(value, _seen=None):
+    """In-memory size of a cached value in bytes.
+
+    Counts the buffers of DataFrames, arrays and Arrow data (including the
+    parents of zero-copy slices), and walks containers and plain objects
+    such as TimeIndex or ColumnRangeStats. Shared objects count once.
+    """
+    seen = set() if _seen is None else _seen
+    if value is None or id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (pa.Table, pa.RecordBatch, pa.Array, pa.ChunkedArray)):
+        return int(value.get_total_buffer_size())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v, seen) for v in value)
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        return sys.getsizeof(value) + estimate_size(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    """Hashable version of a cache key argument (lists become tuples)"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+class CacheManager:
+    """Process-wide LRU cache of decoded data with a byte budget.
+
+    Every entry is stored with its estimated size. When the total exceeds
+    the budget the least recently used entries are dropped, and a dropped
+    entry is simply loaded again the next time it is needed. Values larger
+    than the whole budget are returned without being cached. Cached values
+    are shared between sessions and must not be modified.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """True if key is cached, without counting as a use"""
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value, nbytes=None):
+        nbytes = estimate_size(value) if nbytes is None else nbytes
+        if nbytes > self.budget_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.used_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.used_bytes += nbytes
+            self._evict()
+
+    def resize(self, key):
+        """Measure an entry again after it grew or shrank in place"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return
+        nbytes = estimate_size(entry[0])
+        with self._lock:
+            if self._entries.get(key) is entry:
+                self._entries[key] = (entry[0], nbytes)
+                self.used_bytes += nbytes - entry[1]
+                self._evict()
+
+    def _evict(self):
+        while self.used_bytes > self.budget_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.used_bytes -= nbytes
+            self.evictions += 1
+
+    def get_or_load(self, key, load):
+        """Cached value of key, calling load() on a miss (once, even with concurrent callers)"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            value = self.get(key, missing)
+            with self._lock:
+                if value is not missing:
+                    self.hits += 1
+                    return value
+                self.misses += 1
+            try:
+                value = load()
+                # Failed loads return None and are retried next time
+                if value is not None:
+                    self.put(key, value)
+            finally:
+                with self._lock:
+                    self._load_locks.pop(key, None)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used_bytes = 0
+
+    def usage_by_function(self):
+        """Bytes and entry count per cached function, largest first"""
+        with self._lock:
+            usage = {}
+            for key, (_, nbytes) in self._entries.items():
+                name = key[0] if isinstance(key, tuple) else str(key)
+                total, count = usage.get(name, (0, 0))
+                usage[name] = (total + nbytes, count + 1)
+        return sorted(usage.items(), key=lambda item: -item[1][0])
+
+    def cached(self, func):
+        """Decorator caching func by its (bound) arguments in this manager"""
+        signature = inspect.signature(func)
+
+        def cache_key(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (func.__qualname__,) + tuple(_freeze(v) for v in bound.arguments.values())
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.get_or_load(cache_key(*args, **kwargs), lambda: func(*args, **kwargs))
+
+        wrapper.cache_key = cache_key
+        wrapper.cache_manager = self
+        return wrapper
+
+
+_manager = None
+
+
+def get_cache_manager():
+    """Process-wide cache manager shared by all sessions"""
+    global _manager
+    if _manager is None:
+        _manager = CacheManager()
+    return _manager
+
+
+def render_cache_panel(upload_store=None):
+    """Budget usage of the decoded data cache (and the upload store on disk) for the sidebar"""
+    manager = get_cache_manager()
+    used_mb = manager.used_bytes / 1024 / 1024
+    budget_mb = manager.budget_bytes / 1024 / 1024
+    st.sidebar.markdown("**🧠 Decoded Data in Memory:**")
+    st.sidebar.progress(
+        min(manager.used_bytes / manager.budget_bytes, 1.0) if manager.budget_bytes else 0.0,
+        text=f"{used_mb:,.1f} of {budget_mb:,.0f} MB ({len(manager)} entries)"
+    )
+    st.sidebar.caption(
+        f"{manager.hits:,} hits, {manager.misses:,} loads, "
+        f"{manager.evictions:,} least recently used entries evicted (decoded again from their file when viewed)"
+    )
+    if manager.used_bytes and st.sidebar.button("🧹 Free Decoded Data", help="Drop all decoded data, files are decoded again when viewed"):
+        manager.clear()
+        st.rerun()
+    if upload_store is not None:
+        store_bytes, store_files = upload_store.usage()
+        budget = f" of {upload_store.budget_bytes / 1024 / 1024:,.0f} MB" if upload_store.budget_bytes else ""
+        st.sidebar.caption(
+            f"Upload store on disk: {store_bytes / 1024 / 1024:,.1f} MB{budget} ({store_files} files), "
+            "uploads removed from it have to be uploaded again"
+        )
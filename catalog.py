@@ -0,0 +1,411 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from convert import file_hash
+from utils import get_parquet_files, open_parquet_file, read_parquet_schema
+
+
+DEFAULT_CATALOG_PATH = os.environ.get(
+    "DK258_CATALOG_PATH", os.path.join(tempfile.gettempdir(), "dk258_catalog.sqlite")
+)
+CATALOG_WORKERS = 8
+# Files indexed (or hashed) per transaction, searches see every finished chunk
+CATALOG_CHUNK = 256
+NANOSECONDS = {"s": 1_000_000_000, "ms": 1_000_000, "us": 1_000, "ns": 1}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT,
+    num_rows INTEGER,
+    num_row_groups INTEGER,
+    num_columns INTEGER,
+    time_column TEXT,
+    time_zone TEXT,
+    start_ns INTEGER,
+    end_ns INTEGER,
+    schema_json TEXT,
+    error TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS batches_folder ON batches (folder, name);
+CREATE INDEX IF NOT EXISTS batches_time ON batches (folder, start_ns, end_ns);
+CREATE TABLE IF NOT EXISTS channels (
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    null_count INTEGER,
+    min REAL,
+    max REAL,
+    PRIMARY KEY (path, name)
+);
+CREATE INDEX IF NOT EXISTS channels_name ON channels (name);
+CREATE TABLE IF NOT EXISTS row_groups (
+    path TEXT NOT NULL,
+    row_group INTEGER NOT NULL,
+    num_rows INTEGER NOT NULL,
+    total_bytes INTEGER NOT NULL,
+    start_ns INTEGER,
+    end_ns INTEGER,
+    PRIMARY KEY (path, row_group)
+);
+"""
+
+
+def _wall_clock_ns(raw, field_type):
+    """Raw int64 statistic of a timestamp column as nanoseconds of wall-clock time.
+
+    Time zone aware columns are stored in UTC, so they are converted to the
+    local time of their zone first, as shown by the Viewer.
+    """
+    value = int(raw) * NANOSECONDS[field_type.unit]
+    if field_type.tz is None:
+        return value
+    return pd.Timestamp(value, tz="UTC").tz_convert(field_type.tz).tz_localize(None).value
+
+
+def read_footer(path):
+    """Catalog entry of one parquet file, from its footer only (no data is decoded)"""
+    parquet_file = open_parquet_file(path)
+    schema_info = read_parquet_schema(parquet_file)
+    schema = parquet_file.schema_arrow
+    metadata = parquet_file.metadata
+    time_column = schema_info['time_column']
+    time_index = schema.get_field_index(time_column) if time_column is not None else None
+    time_type = schema.field(time_column).type if time_column is not None else None
+
+    row_groups = []
+    for rg in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg)
+        start = end = None
+        if time_index is not None:
+            stats = row_group.column(time_index).statistics
+            if stats is not None and stats.has_min_max:
+                start, end = _wall_clock_ns(stats.min_raw, time_type), _wall_clock_ns(stats.max_raw, time_type)
+        row_groups.append((rg, row_group.num_rows, row_group.total_byte_size, start, end))
+
+    channels = []
+    for name in schema_info['columns']:
+        column_index = schema.get_field_index(name)
+        numeric = name in schema_info['numeric_columns']
+        null_count, low, high = 0, None, None
+        for rg in range(metadata.num_row_groups):
+            stats = metadata.row_group(rg).column(column_index).statistics
+            if stats is None or not stats.has_null_count:
+                null_count = None
+            elif null_count is not None:
+                null_count += stats.null_count
+            if numeric and stats is not None and stats.has_min_max:
+                low = stats.min if low is None else min(low, stats.min)
+                high = stats.max if high is None else max(high, stats.max)
+        channels.append((name, schema_info['dtypes'][name], null_count, low, high))
+
+    starts = [start for _, _, _, start, _ in row_groups if start is not None]
+    ends = [end for _, _, _, _, end in row_groups if end is not None]
+    return {
+        "num_rows": schema_info['num_rows'],
+        "num_row_groups": schema_info['num_row_groups'],
+        "num_columns": len(schema_info['columns']),
+        "time_column": time_column,
+        "time_zone": time_type.tz if time_type is not None else None,
+        "start_ns": min(starts) if starts else None,
+        "end_ns": max(ends) if ends else None,
+        "schema_json": json.dumps(schema_info['dtypes']),
+        "channels": channels,
+        "row_groups": row_groups,
+    }
+
+
+def _index_file(path, stat):
+    """read_footer of one file, or the error when it can't be read"""
+    entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "content_hash": None, "error": None}
+    try:
+        entry.update(read_footer(path))
+    except (OSError, pa.ArrowException) as e:
+        entry["error"] = str(e) or type(e).__name__
+    return entry
+
+
+def _hash_file(path, mtime_ns, size):
+    """Content hash of a file, or None when it changed since it was indexed (or is gone)"""
+    try:
+        stat = os.stat(path)
+        if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+            return None
+        return file_hash(path)
+    except OSError:
+        return None
+
+
+def _like(text):
+    """LIKE pattern matching text anywhere, with its wildcards escaped"""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class CatalogUpdate:
+    """Progress of bringing the catalog entries of one folder up to date"""
+
+    def __init__(self, folder, names):
+        self.folder = folder
+        self.names = names
+        self.step = "queued"
+        self.done = 0
+        self.total = None
+        self.error = None
+        self.finished = False
+
+    @property
+    def fraction(self):
+        if self.finished:
+            return 1.0
+        return self.done / self.total if self.total else 0.0
+
+
+class Catalog:
+    """SQLite catalog of parquet batches, filled from their footers.
+
+    Every file is stored with its schema, row count, time range, row group
+    and channel statistics and content hash. A folder update only reads the
+    files whose mtime or size changed, footers first and content hashes
+    (which read every byte) last, and refresh runs it on a background
+    thread only when the folder listing changed.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+        self._updates = {}
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def refresh(self, folder, names, force=False):
+        """Update a folder on a background thread if its listing changed since the last update.
+
+        names is the cached listing of the folder (see get_parquet_files), so
+        an unchanged folder costs no stat per file. force checks every file
+        again, e.g. for files rewritten in place. Returns the running or last
+        CatalogUpdate of the folder.
+        """
+        folder = os.path.abspath(folder)
+        names = tuple(names)
+        with self._lock:
+            update = self._updates.get(folder)
+            if update is not None and (not update.finished or (update.names == names and not force)):
+                return update
+            update = CatalogUpdate(folder, names)
+            self._updates[folder] = update
+        threading.Thread(target=self._run_update, args=(update,), name="dk258-catalog", daemon=True).start()
+        return update
+
+    def _run_update(self, update):
+        try:
+            self.update_folder(update.folder, list(update.names), progress=update)
+        except (OSError, sqlite3.Error) as e:
+            update.error = str(e)
+        finally:
+            update.finished = True
+
+    def update_folder(self, folder, names=None, progress=None):
+        """Bring the entries of a folder up to date, returns the number of (re)indexed, removed and hashed files.
+
+        The footers of new or changed files are read and committed in chunks,
+        so searches already see the files read so far. Their content hashes
+        are filled in afterwards. progress (a CatalogUpdate) follows along.
+        """
+        folder = os.path.abspath(folder)
+        names = get_parquet_files(folder) if names is None else names
+        progress = CatalogUpdate(folder, names) if progress is None else progress
+        progress.step = "checking files"
+        with closing(self._connect()) as conn:
+            known = {
+                name: (mtime_ns, size)
+                for name, mtime_ns, size in conn.execute(
+                    "SELECT name, mtime_ns, size FROM batches WHERE folder = ?", (folder,)
+                )
+            }
+
+        stats = {}
+        for name in names:
+            try:
+                stats[name] = os.stat(os.path.join(folder, name))
+            except OSError:
+                continue
+        changed = [
+            name for name, stat in stats.items()
+            if known.get(name) != (stat.st_mtime_ns, stat.st_size)
+        ]
+        removed = [name for name in known if name not in stats]
+
+        with closing(self._connect()) as conn, conn:
+            for name in removed:
+                self._delete(conn, os.path.join(folder, name))
+
+        # Footer reads and hashing are I/O bound, so threads overlap them
+        with ThreadPoolExecutor(max_workers=CATALOG_WORKERS) as pool:
+            progress.step = "reading footers"
+            progress.total = len(changed)
+            progress.done = 0
+            for offset in range(0, len(changed), CATALOG_CHUNK):
+                chunk = changed[offset:offset + CATALOG_CHUNK]
+                entries = list(pool.map(
+                    lambda name: _index_file(os.path.join(folder, name), stats[name]), chunk
+                ))
+                self._write_entries(folder, chunk, entries)
+                progress.done += len(chunk)
+            hashed = self._hash_missing(folder, pool, progress)
+        return {"indexed": len(changed), "removed": len(removed), "hashed": hashed}
+
+    def _delete(self, conn, path):
+        for table in ("batches", "channels", "row_groups"):
+            conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+
+    def _write_entries(self, folder, names, entries):
+        with closing(self._connect()) as conn, conn:
+            now = time.time()
+            for name, entry in zip(names, entries):
+                path = os.path.join(folder, name)
+                self._delete(conn, path)
+                conn.execute(
+                    "INSERT INTO batches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        path, folder, name, entry["mtime_ns"], entry["size"], entry["content_hash"],
+                        entry.get("num_rows"), entry.get("num_row_groups"), entry.get("num_columns"),
+                        entry.get("time_column"), entry.get("time_zone"), entry.get("start_ns"), entry.get("end_ns"),
+                        entry.get("schema_json"), entry["error"], now,
+                    )
+                )
+                conn.executemany(
+                    "INSERT INTO channels VALUES (?, ?, ?, ?, ?, ?)",
+                    [(path, *channel) for channel in entry.get("channels", [])]
+                )
+                conn.executemany(
+                    "INSERT INTO row_groups VALUES (?, ?, ?, ?, ?, ?)",
+                    [(path, *row_group) for row_group in entry.get("row_groups", [])]
+                )
+
+    def _hash_missing(self, folder, pool, progress):
+        """Fill in the content hash of the readable batches of a folder that have none yet"""
+        with closing(self._connect()) as conn:
+            missing = conn.execute(
+                "SELECT path, mtime_ns, size FROM batches WHERE folder = ? AND content_hash IS NULL AND error IS NULL",
+                (folder,)
+            ).fetchall()
+        progress.step = "hashing contents"
+        progress.total = len(missing)
+        progress.done = 0
+        hashed = 0
+        for offset in range(0, len(missing), CATALOG_CHUNK):
+            chunk = missing[offset:offset + CATALOG_CHUNK]
+            hashes = list(pool.map(lambda row: _hash_file(*row), chunk))
+            # Only rows still describing the hashed version of the file are updated
+            updates = [(digest, *row) for digest, row in zip(hashes, chunk) if digest is not None]
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "UPDATE batches SET content_hash = ? WHERE path = ? AND mtime_ns = ? AND size = ?", updates
+                )
+            hashed += len(updates)
+            progress.done += len(chunk)
+        return hashed
+
+    def search(self, folder, name=None, channel=None, start=None, end=None):
+        """Batches of a folder matching all given filters, as a DataFrame.
+
+        name and channel match anywhere in the file or a column name
+        (case-insensitive), start and end keep the batches whose time range
+        overlaps [start, end] (wall-clock time). Unreadable files only match
+        filters on their name.
+        """
+        query = [
+            "SELECT name, num_rows, start_ns, end_ns, num_columns, size, content_hash, error",
+            "FROM batches WHERE folder = ?",
+        ]
+        params = [os.path.abspath(folder)]
+        if name:
+            query.append("AND name LIKE ? ESCAPE '\\'")
+            params.append(_like(name))
+        if channel:
+            query.append(
+                "AND EXISTS (SELECT 1 FROM channels WHERE channels.path = batches.path AND channels.name LIKE ? ESCAPE '\\')"
+            )
+            params.append(_like(channel))
+        if start is not None:
+            query.append("AND end_ns >= ?")
+            params.append(pd.Timestamp(start).tz_localize(None).value)
+        if end is not None:
+            query.append("AND start_ns <= ?")
+            params.append(pd.Timestamp(end).tz_localize(None).value)
+        query.append("ORDER BY name")
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(" ".join(query), params).fetchall()
+        results = pd.DataFrame(rows, columns=["File", "Rows", "Start", "End", "Columns", "Size", "Hash", "Error"])
+        results["Start"] = pd.to_datetime(results["Start"].astype("Int64"), unit="ns")
+        results["End"] = pd.to_datetime(results["End"].astype("Int64"), unit="ns")
+        results["Size (MB)"] = results.pop("Size") / 1024 / 1024
+        return results
+
+    def channels(self, path):
+        """Type, null count and min/max per column of one batch"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT name, type, null_count, min, max FROM channels WHERE path = ? ORDER BY rowid",
+                (os.path.abspath(path),)
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["Column", "Type", "Null Count", "Min", "Max"])
+
+
+_catalog = None
+
+
+def get_catalog():
+    """Process-wide catalog shared by all sessions"""
+    global _catalog
+    if _catalog is None:
+        _catalog = Catalog()
+    return _catalog
+
+
+def render_catalog_status(update):
+    """Progress of a background catalog update.
+
+    While the update runs the status refreshes itself every second, without
+    rerunning the rest of the page, and reruns the page once it is done.
+    """
+    if update.finished and update.error is None:
+        return
+
+    @st.fragment(run_every=1 if not update.finished else None)
+    def status():
+        if update.error is not None:
+            st.warning(f"⚠️ Could not update the batch catalog: {update.error}")
+        elif not update.finished:
+            st.progress(
+                update.fraction,
+                text=f"🔄 Catalog: {update.step} ({update.done:,} of {update.total or 0:,} files), "
+                     "the catalog shows the files read so far"
+            )
+        else:
+            st.rerun()
+
+    status()
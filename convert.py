@@ -0,0 +1,166 @@
+"""Convert a folder of raw logger CSV files to parquet in parallel.
+
+Usage:
+    python convert.py <csv_folder> <parquet_folder> [--workers N] [--force]
+
+A manifest in the output folder remembers the mtime, size and content hash
+of every converted source, so reruns only convert new or changed files.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from local_folder import local_file_key, local_key_version
+from pyramid import build_pyramid, sidecar_path, write_pyramid
+from utils import convert_csv_to_parquet, get_csv_files
+
+
+MANIFEST_NAME = ".dk258_manifest.json"
+
+
+def file_hash(path, chunk_size=8 * 1024 * 1024):
+    """Content hash of a file, read in chunks"""
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def load_manifest(output_folder):
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(output_folder, manifest):
+    """Write the manifest atomically so an interrupted run never corrupts it"""
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def output_name(csv_name):
+    return os.path.splitext(csv_name)[0] + ".parquet"
+
+
+def plan_conversions(input_folder, output_folder, manifest, force=False):
+    """Split the CSV files into (to_convert, up_to_date) based on the manifest.
+
+    Files with unchanged mtime and size are skipped without reading them.
+    If only the mtime changed, the content hash decides.
+    """
+    to_convert, up_to_date = [], []
+    for name in sorted(get_csv_files(input_folder)):
+        source = os.path.join(input_folder, name)
+        stat = os.stat(source)
+        entry = manifest.get(name)
+        target = os.path.join(output_folder, output_name(name))
+
+        if force or entry is None or not os.path.isfile(target):
+            to_convert.append(name)
+        elif entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            up_to_date.append(name)
+        elif entry["size"] == stat.st_size and entry["hash"] == file_hash(source):
+            entry["mtime"] = stat.st_mtime
+            up_to_date.append(name)
+        else:
+            to_convert.append(name)
+    return to_convert, up_to_date
+
+
+def convert_one(input_folder, output_folder, name):
+    """Worker: convert a single CSV (plus its aggregate pyramid) and return its manifest entry and timings"""
+    source = os.path.join(input_folder, name)
+    target = os.path.join(output_folder, output_name(name))
+    stat = os.stat(source)
+    started = time.perf_counter()
+    result = convert_csv_to_parquet(source, target)
+    levels = build_pyramid(target)
+    if levels:
+        write_pyramid(levels, sidecar_path(target), result["rows"], source_version=local_key_version(local_file_key(target)))
+    elapsed = time.perf_counter() - started
+    return {
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "hash": file_hash(source),
+        "output": output_name(name),
+        "rows": result["rows"],
+        "dropped_rows": result["dropped_rows"],
+        "seconds": round(elapsed, 3),
+    }
+
+
+def convert_folder(input_folder, output_folder, workers=None, force=False):
+    """Convert every new or changed CSV in input_folder, returns a summary dict"""
+    os.makedirs(output_folder, exist_ok=True)
+    manifest = load_manifest(output_folder)
+    to_convert, up_to_date = plan_conversions(input_folder, output_folder, manifest, force=force)
+    print(f"{len(to_convert)} file(s) to convert, {len(up_to_date)} up to date")
+
+    failed = []
+    total_rows = 0
+    total_bytes = 0
+    started = time.perf_counter()
+
+    if to_convert:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = {
+                pool.submit(convert_one, input_folder, output_folder, name): name
+                for name in to_convert
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    failed.append(name)
+                    print(f"FAILED {name}: {e}")
+                    continue
+                manifest[name] = entry
+                total_rows += entry["rows"]
+                total_bytes += entry["size"]
+                print(f"converted {name}: {entry['rows']:,} rows in {entry['seconds']:.2f}s")
+                if entry["dropped_rows"]:
+                    print(f"  dropped {entry['dropped_rows']:,} rows of {name} without a readable time")
+                # Save after every file so an interrupted run keeps its progress
+                save_manifest(output_folder, manifest)
+
+    save_manifest(output_folder, manifest)
+    elapsed = time.perf_counter() - started
+    if total_rows:
+        print(
+            f"Converted {total_rows:,} rows ({total_bytes / 1024 / 1024:.1f} MB) in {elapsed:.1f}s: "
+            f"{total_rows / elapsed:,.0f} rows/s, {total_bytes / 1024 / 1024 / elapsed:.1f} MB/s"
+        )
+    return {
+        "converted": len(to_convert) - len(failed),
+        "skipped": len(up_to_date),
+        "failed": failed,
+        "rows": total_rows,
+        "bytes": total_bytes,
+        "seconds": elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a folder of DK258 CSV logs to parquet.")
+    parser.add_argument("input_folder", help="Folder containing the raw .csv files")
+    parser.add_argument("output_folder", help="Folder to write the .parquet files to")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="Convert every file, even if it is up to date")
+    args = parser.parse_args(argv)
+
+    summary = convert_folder(args.input_folder, args.output_folder, workers=args.workers, force=args.force)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
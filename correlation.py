@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from export import window_batches
+from utils import _to_float_array
+
+
+# Values (rows x channels) converted to float64 at a time, bounds the memory of a scan
+CHUNK_VALUES = 4_000_000
+TOP_K = 10
+
+
+class CorrelationAccumulator:
+    """Pairwise covariance and correlation of many channels, accumulated chunk by chunk.
+
+    Per pair of channels only the rows where both are valid count, as in
+    DataFrame.corr(). For that the pairwise row counts, sums, sums of
+    squares and cross products are kept as k x k matrices, each updated with
+    one matrix product per chunk, so memory depends on the number of
+    channels and not on the number of rows. Values are taken around a
+    per-channel shift to keep the sums numerically stable.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift = None
+        self.rows = 0
+        self.count = np.zeros((k, k))
+        self.sums = np.zeros((k, k))
+        self.squares = np.zeros((k, k))
+        self.products = np.zeros((k, k))
+
+    def update(self, values):
+        """Add a chunk of rows, a 2D float array with one column per channel (NaN is missing)"""
+        valid = ~np.isnan(values)
+        if self.shift is None:
+            # Mean of the first chunk
+            self.shift = np.where(valid, values, 0.0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+        centered = np.where(valid, values - self.shift, 0.0)
+        self.rows += len(values)
+        if valid.all():
+            # Without missing values every pair sees every row
+            self.count += len(values)
+            self.sums += centered.sum(axis=0)[:, None]
+            self.squares += (centered * centered).sum(axis=0)[:, None]
+        else:
+            # Entry (i, j) only sums rows where channel j is valid as well
+            present = valid.astype(np.float64)
+            self.count += present.T @ present
+            self.sums += centered.T @ present
+            self.squares += (centered * centered).T @ present
+        self.products += centered.T @ centered
+
+    def covariance(self):
+        """Sample covariance (ddof=1) of every pair of channels"""
+        n = self.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (self.products - self.sums * self.sums.T / n) / (n - 1)
+        cov[n < 2] = np.nan
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Pearson correlation of every pair of channels"""
+        n = self.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var_i = self.squares - self.sums * self.sums / n
+            var_j = var_i.T
+            corr = (self.products - self.sums * self.sums.T / n) / np.sqrt(var_i * var_j)
+        corr[n < 2] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def window_correlation(source, columns, rows=None, time_range=None):
+    """Accumulate the correlation of the given channels over one time window.
+
+    The window is streamed from the parquet file in chunks of at most
+    CHUNK_VALUES values (see export.window_batches for rows and time_range),
+    so only one chunk is decoded at a time.
+    """
+    columns = list(columns)
+    accumulator = CorrelationAccumulator(columns)
+    batch_size = max(1024, CHUNK_VALUES // max(len(columns), 1))
+    for batch in window_batches(source, columns, rows=rows, time_range=time_range, batch_size=batch_size):
+        accumulator.update(np.column_stack([_to_float_array(batch.column(c)) for c in columns]))
+    return accumulator
+
+
+def top_correlated(correlation, column, k=TOP_K):
+    """The k channels most correlated with column (by absolute correlation)"""
+    values = correlation[column].drop(column).dropna()
+    order = values.abs().sort_values(ascending=False).index[:k]
+    return pd.DataFrame({'Channel': order, 'Correlation': values[order].to_numpy()})
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+
+DECIMATION_METHODS = ["LTTB", "Min/Max", "None"]
+
+
+def _as_float_array(values):
+    """Convert x/y data (Series, Index or array) to a float64 numpy array"""
+    if isinstance(values, (pd.Series, pd.Index)):
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            # Time zone aware data would become Timestamp objects, take the UTC integers
+            values = pd.DatetimeIndex(values).asi8
+        else:
+            values = values.to_numpy()
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype('int64')
+    return values.astype('float64', copy=False)
+
+
+def _bucket_edges(n, n_buckets, start=0):
+    """Split the positions [start, n) into n_buckets nearly equal buckets"""
+    return np.linspace(start, n, n_buckets + 1).astype(np.int64)
+
+
+def minmax_indices(y, n_out):
+    """Indices of the min and max point in each bucket, in original order.
+
+    Keeps every spike in the data since the extremes of each bucket always
+    survive. Returns at most n_out indices.
+    """
+    y = _as_float_array(y)
+    n = len(y)
+    n_buckets = max(n_out // 2, 1)
+    if n <= n_out or n_buckets >= n:
+        return np.arange(n)
+
+    # Pad to a rectangular (buckets x bucket_size) block so argmin/argmax
+    # run as a single vectorized reduction over the rows
+    bucket_size = -(-n // n_buckets)
+    n_buckets = -(-n // bucket_size)
+    padded = np.full(n_buckets * bucket_size, np.nan)
+    padded[:n] = y
+    block = padded.reshape(n_buckets, bucket_size)
+
+    nan_mask = np.isnan(block)
+    argmin = np.where(nan_mask, np.inf, block).argmin(axis=1)
+    argmax = np.where(nan_mask, -np.inf, block).argmax(axis=1)
+
+    offsets = np.arange(n_buckets) * bucket_size
+    indices = np.concatenate([offsets + argmin, offsets + argmax])
+    indices = np.unique(indices)
+    return indices[indices < n]
+
+
+def lttb_indices(x, y, n_out):
+    """Indices selected by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last point are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    selected point and the mean of the next bucket. NaN values are never
+    chosen over valid ones, a bucket holding only NaN keeps one of them so
+    the gap stays a break in the line. Fewer than 3 points keep the first
+    and last point only.
+    """
+    x = _as_float_array(x)
+    y = _as_float_array(y)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)], dtype=np.int64)
+
+    # Shift x to start at zero so int64 timestamps keep their precision
+    x = x - x[0]
+    valid = ~np.isnan(y)
+    all_valid = bool(valid.all())
+
+    edges = _bucket_edges(n - 1, n_out - 2, start=1)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Mean of the valid points of every bucket at once, used as the third triangle vertex
+    cum_x = np.concatenate([[0.0], np.cumsum(x if all_valid else np.where(valid, x, 0.0))])
+    cum_y = np.concatenate([[0.0], np.cumsum(y if all_valid else np.where(valid, y, 0.0))])
+    counts = ends - starts
+    if not all_valid:
+        cum_valid = np.concatenate([[0], np.cumsum(valid)])
+        counts = cum_valid[ends] - cum_valid[starts]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = (cum_x[ends] - cum_x[starts]) / counts
+        mean_y = (cum_y[ends] - cum_y[starts]) / counts
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+    # Buckets without valid points look ahead to the next bucket that has them
+    missing = np.isnan(next_y)
+    if missing.any():
+        filled = pd.DataFrame({'x': np.where(missing, np.nan, next_x), 'y': next_y}).bfill().ffill()
+        next_x, next_y = filled['x'].to_numpy(), filled['y'].to_numpy()
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    has_nan = (counts < ends - starts).tolist()
+    empty = (counts == 0).tolist()
+    a = int(valid.argmax())
+    for b, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        if empty[b]:
+            indices[b + 1] = start
+            continue
+        bx = x[start:end]
+        by = y[start:end]
+        area = np.abs((x[a] - next_x[b]) * (by - y[a]) - (x[a] - bx) * (next_y[b] - y[a]))
+        if has_nan[b]:
+            area[~valid[start:end]] = -np.inf
+        a = start + int(area.argmax())
+        indices[b + 1] = a
+    return indices
+
+
+def decimate(x, y, n_out, method="LTTB"):
+    """Return the positions of the points to keep for a trace of x/y data"""
+    n = len(y)
+    if method == "None" or n <= n_out:
+        return np.arange(n)
+    if method == "Min/Max":
+        return minmax_indices(y, n_out)
+    if method == "LTTB":
+        return lttb_indices(x, y, n_out)
+    raise ValueError(f"Unknown decimation method: {method}")
@@ -0,0 +1,111 @@
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from utils import _row_group_offsets, get_row_groups_in_range, open_parquet_file, read_parquet_schema
+
+
+EXPORT_FORMATS = ["Parquet", "CSV"]
+PARQUET_COMPRESSIONS = ["zstd", "snappy", "gzip", "none"]
+# Rows decoded and written at a time, bounds the memory of an export
+EXPORT_BATCH_ROWS = 64 * 1024
+
+
+def window_batches(source, columns, rows=None, time_range=None, batch_size=EXPORT_BATCH_ROWS):
+    """Record batches of the time column and the given columns for one window, in file order.
+
+    rows=(start, stop) selects a contiguous range of row positions (the
+    window of a time-sorted file): only the row groups holding it are
+    decoded and the edge batches are zero-copy slices. Otherwise time_range
+    keeps the rows inside the inclusive window, skipping row groups by their
+    statistics. Only one batch is in memory at a time.
+    """
+    parquet_file = open_parquet_file(source)
+    time_column = read_parquet_schema(parquet_file)['time_column']
+    projection = ([time_column] if time_column is not None else []) + [c for c in columns if c != time_column]
+
+    if rows is not None:
+        start, stop = rows
+        offsets = _row_group_offsets(parquet_file)
+        row_groups = [rg for rg in range(len(offsets) - 1) if offsets[rg] < stop and offsets[rg + 1] > start]
+        position = offsets[row_groups[0]] if row_groups else 0
+        for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=projection):
+            batch = batch.select(projection)
+            lo, hi = max(start - position, 0), min(stop - position, batch.num_rows)
+            position += batch.num_rows
+            if hi > lo:
+                yield batch.slice(lo, hi - lo)
+        return
+
+    row_groups = get_row_groups_in_range(parquet_file, time_column, time_range)
+    if time_range is not None and time_column is not None:
+        field_type = parquet_file.schema_arrow.field(time_column).type
+        bounds = [pa.scalar(_as_time_type(value, field_type), type=field_type) for value in time_range]
+    for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=projection):
+        batch = batch.select(projection)
+        if time_range is not None and time_column is not None:
+            times = batch.column(time_column)
+            batch = batch.filter(pc.and_(pc.greater_equal(times, bounds[0]), pc.less_equal(times, bounds[1])))
+        if batch.num_rows:
+            yield batch
+
+
+def _as_time_type(value, field_type):
+    """Timestamp with or without time zone, matching the time column"""
+    timestamp = pd.Timestamp(value)
+    if field_type.tz is not None and timestamp.tzinfo is None:
+        return timestamp.tz_localize(field_type.tz, ambiguous=True, nonexistent="shift_forward")
+    if field_type.tz is None and timestamp.tzinfo is not None:
+        return timestamp.tz_localize(None)
+    return timestamp
+
+
+def write_batches(batches, schema, sink, file_format="Parquet", compression="zstd"):
+    """Stream record batches to sink as parquet or CSV, returns the number of rows written.
+
+    The pandas metadata of schema is kept, so a parquet export reads back
+    with the time column as its index like the source.
+    """
+    if file_format == "Parquet":
+        writer = pq.ParquetWriter(sink, schema, compression=None if compression == "none" else compression)
+    elif file_format == "CSV":
+        writer = pacsv.CSVWriter(sink, schema)
+    else:
+        raise ValueError(f"Unknown export format: {file_format}")
+    rows = 0
+    try:
+        for batch in batches:
+            writer.write_batch(batch.replace_schema_metadata())
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+def export_window(source, columns, rows=None, time_range=None, file_format="Parquet", compression="zstd"):
+    """Write one window of a parquet file to a temporary file on disk, returned open at the start.
+
+    Batches go straight from the parquet decoder to the writer, without a
+    pandas DataFrame in between, so only one batch is in memory while the
+    export is encoded. The file is deleted when it is closed.
+    """
+    parquet_file = open_parquet_file(source)
+    time_column = read_parquet_schema(parquet_file)['time_column']
+    projection = ([time_column] if time_column is not None else []) + [c for c in columns if c != time_column]
+    source_schema = parquet_file.schema_arrow
+    schema = pa.schema([source_schema.field(name) for name in projection], metadata=source_schema.metadata)
+    output = tempfile.TemporaryFile(prefix="dk258_export_")
+    try:
+        write_batches(
+            window_batches(parquet_file, columns, rows=rows, time_range=time_range),
+            schema, output, file_format=file_format, compression=compression
+        )
+    except BaseException:
+        output.close()
+        raise
+    output.seek(0)
+    return output
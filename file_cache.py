@@ -0,0 +1,218 @@
+import hashlib
+import os
+
+import pyarrow as pa
+import streamlit as st
+
+from cache_manager import get_cache_manager
+from correlation import window_correlation
+from fleet_query import fleet_info, query_batches
+from local_folder import is_local_key, local_key_path, local_key_version
+from pyramid import load_or_build_pyramid, sidecar_path
+from range_stats import column_stats_from_parquet, null_index_from_parquet
+from resample import resample_column
+from rolling import RollingStatistics
+from time_index import TimeIndex
+from upload_store import get_upload_store
+from utils import (
+    load_parquet_columns,
+    load_parquet_rows,
+    plan_compaction,
+    read_parquet_null_counts,
+    read_parquet_rows,
+    read_parquet_schema,
+    read_parquet_take,
+)
+
+
+# Cached loaders shared by all pages (and the prefetcher), so a file
+# decoded once is warm everywhere. All of them share one memory budget.
+upload_store = get_upload_store()
+cache = get_cache_manager()
+# Folder for the pyramid sidecars of local files, instead of next to the data
+SIDECAR_DIR = os.environ.get("DK258_SIDECAR_DIR")
+
+
+def open_file(digest):
+    """Read-only memory map of an upload (content hash) or a local file (local file key)"""
+    if is_local_key(digest):
+        return pa.memory_map(local_key_path(digest), "r")
+    return upload_store.open(digest)
+
+
+def file_location(digest):
+    """Path on disk of an upload (content hash) or a local file (local file key)"""
+    return local_key_path(digest) if is_local_key(digest) else upload_store.path(digest)
+
+
+def pyramid_path(digest):
+    """Sidecar location of a file's aggregate pyramid.
+
+    Local files keep it next to the file, as written by convert.py, unless
+    SIDECAR_DIR is set or their folder is read-only. Then it goes to a
+    sidecar folder, under a hash of the file's path.
+    """
+    if not is_local_key(digest):
+        return sidecar_path(upload_store.path(digest))
+    path = sidecar_path(local_key_path(digest))
+    if SIDECAR_DIR is None and (os.path.isfile(path) or os.access(os.path.dirname(path), os.W_OK)):
+        return path
+    folder = SIDECAR_DIR or os.path.join(upload_store.root, "sidecars")
+    name = hashlib.blake2b(os.path.abspath(local_key_path(digest)).encode(), digest_size=20).hexdigest()
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, sidecar_path(name))
+
+
+def source_version(digest):
+    """Exact version of a stored file: the content hash of an upload, mtime and size of a local file"""
+    return local_key_version(digest) if is_local_key(digest) else digest
+
+
+# Cached loaders are keyed by the content hash, never by the file contents
+@cache.cached
+def load_parquet_schema_from_store(digest, filename):
+    """Read only the parquet footer (schema and row counts) of a stored upload"""
+    try:
+        return read_parquet_schema(open_file(digest))
+    except Exception as e:
+        st.error(f"Error loading {filename}: {e}")
+        return None
+
+
+@cache.cached
+def load_compaction_plan_from_store(digest):
+    """Narrowest safe dtype per column of a stored upload, and the memory report of every column"""
+    return plan_compaction(open_file(digest))
+
+
+@cache.cached
+def load_column_plan_from_store(digest, column):
+    """Narrowest safe dtype and memory report row of one column of a stored upload"""
+    return plan_compaction(open_file(digest), columns=[column])
+
+
+def compaction_dtypes(digest, columns=None):
+    """dtype plan of the given columns (default all), each column planned once and cached.
+
+    Only the loaded columns are decoded for their plan, so a projected load
+    stays as cheap as the columns it reads.
+    """
+    if columns is None:
+        columns = read_parquet_schema(open_file(digest))['columns']
+    dtypes = {}
+    for column in columns:
+        column_dtypes, _ = load_column_plan_from_store(digest, column)
+        dtypes.update(column_dtypes)
+    return dtypes
+
+
+@cache.cached
+def load_parquet_from_store(digest, filename, columns=None, time_range=None):
+    """Load the given columns of a stored upload, skipping row groups outside time_range"""
+    try:
+        dtypes = compaction_dtypes(digest, columns)
+        return load_parquet_columns(open_file(digest), columns=columns, time_range=time_range, dtypes=dtypes)
+    except Exception as e:
+        st.error(f"Error loading {filename}: {e}")
+        return None
+
+
+@cache.cached
+def load_parquet_rows_from_store(digest, filename, start, stop, columns=None):
+    """Load rows [start, stop) of the given columns of a stored upload"""
+    try:
+        dtypes = compaction_dtypes(digest, columns)
+        return load_parquet_rows(open_file(digest), start, stop, columns=columns, dtypes=dtypes)
+    except Exception as e:
+        st.error(f"Error loading {filename}: {e}")
+        return None
+
+
+@cache.cached
+def load_time_index_from_store(digest):
+    """Sorted int64 timestamps of a stored upload, read from the time column only"""
+    return TimeIndex.from_parquet(open_file(digest))
+
+
+@cache.cached
+def load_preview_page_from_store(digest, start, stop):
+    """Arrow table with rows [start, stop) in time order, cached per page"""
+    time_index = load_time_index_from_store(digest)
+    if time_index is not None and time_index.order is not None:
+        return read_parquet_take(open_file(digest), time_index.order[start:stop])
+    return read_parquet_rows(open_file(digest), start, stop)
+
+
+@cache.cached
+def load_pyramid_from_store(digest):
+    """Aggregate pyramid of a stored upload, built and saved as a sidecar on first use"""
+    return load_or_build_pyramid(open_file(digest), pyramid_path(digest), source_version=source_version(digest))
+
+
+@cache.cached
+def load_null_counts_from_store(digest, time_range=None):
+    """Row and null counts per column from the parquet footer statistics"""
+    return read_parquet_null_counts(open_file(digest), time_range=time_range)
+
+
+@cache.cached
+def load_column_stats_from_store(digest, column):
+    """Range statistics of one column in time order, built once per file and column"""
+    time_index = load_time_index_from_store(digest)
+    order = time_index.order if time_index is not None else None
+    return column_stats_from_parquet(open_file(digest), column, order=order)
+
+
+@cache.cached
+def load_resampled_from_store(digest, column, interval, aggregation):
+    """One column aggregated per interval over the whole file, cached per interval and aggregation"""
+    time_index = load_time_index_from_store(digest)
+    # The range statistics already hold the column in time order
+    values = load_column_stats_from_store(digest, column).values
+    return resample_column(time_index, values, column, interval, aggregation)
+
+
+@cache.cached
+def load_rolling_from_store(digest, column, window):
+    """Rolling statistics of one column for a window length, filled in as the time window moves"""
+    return RollingStatistics(window)
+
+
+def rolling_window_from_store(digest, column, window, lo, hi):
+    """Rolling mean/std/min/max of rows [lo, hi) in time order, only computing rows not seen before"""
+    rolling = load_rolling_from_store(digest, column, window)
+    result = rolling.window_statistics(load_column_stats_from_store(digest, column).values, lo, hi)
+    # The kept results grow with every new edge
+    cache.resize(load_rolling_from_store.cache_key(digest, column, window))
+    return result
+
+
+@cache.cached
+def load_null_index_from_store(digest):
+    """Null index of every column in time order, built once per file"""
+    time_index = load_time_index_from_store(digest)
+    order = time_index.order if time_index is not None else None
+    columns = read_parquet_schema(open_file(digest))['columns']
+    return null_index_from_parquet(open_file(digest), columns, order=order)
+
+
+@cache.cached
+def load_correlation_from_store(digest, columns, time_range=None):
+    """Pairwise correlation sums of the given channels over a time window, streamed chunk by chunk"""
+    time_index = load_time_index_from_store(digest)
+    rows = None
+    if time_range is not None and time_index is not None and time_index.is_sorted:
+        rows = time_index.window_positions(*time_range)
+    return window_correlation(open_file(digest), columns, rows=rows, time_range=time_range)
+
+
+@cache.cached
+def load_fleet_info(batch_keys):
+    """Time column, channels and time span of many batches, from their footers"""
+    return fleet_info({name: file_location(key) for name, key in batch_keys})
+
+
+@cache.cached
+def load_fleet_query(batch_keys, columns, time_range):
+    """Channels of many batches in one DataFrame with a batch column"""
+    return query_batches({name: file_location(key) for name, key in batch_keys}, columns, time_range=time_range)
@@ -0,0 +1,142 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+from utils import open_parquet_file, read_parquet_schema
+
+
+BATCH_COLUMN = "batch"
+
+
+def fleet_dataset(sources):
+    """One pyarrow dataset over the parquet files of many batches.
+
+    sources maps batch name -> file path. Files are opened through memory
+    maps and their schemas unified, so a column missing from some batches
+    reads as nulls there.
+    """
+    paths = list(sources.values())
+    schemas = [open_parquet_file(path).schema_arrow for path in paths]
+    schema = pa.unify_schemas(schemas, promote_options="permissive")
+    # One fragment per batch in the order of sources, even if two batches share a file
+    return ds.FileSystemDataset.from_paths(
+        paths, schema=schema, format=ds.ParquetFileFormat(), filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
+
+
+def fleet_info(sources):
+    """Time column, numeric columns (of any batch) and overall time span, from the footers only.
+
+    The first batch with a time index sets the time column and its time
+    zone. Batches that can't be read, have no time index or another time
+    column or time zone (naive and aware times can't be compared or put in
+    one dataset) are listed under 'skipped', the others under 'batches'.
+    """
+    time_column = None
+    time_zone = None
+    numeric_columns = {}
+    start, end = None, None
+    batches, skipped = [], []
+    for name, path in sources.items():
+        try:
+            parquet_file = open_parquet_file(path)
+            schema_info = read_parquet_schema(parquet_file)
+        except (OSError, pa.ArrowException):
+            skipped.append(name)
+            continue
+        if schema_info['time_column'] is None:
+            skipped.append(name)
+            continue
+        column_index = parquet_file.schema_arrow.get_field_index(schema_info['time_column'])
+        tz = parquet_file.schema_arrow.field(column_index).type.tz
+        if batches and (schema_info['time_column'] != time_column or tz != time_zone):
+            skipped.append(name)
+            continue
+        time_column, time_zone = schema_info['time_column'], tz
+        batches.append(name)
+        numeric_columns.update(dict.fromkeys(schema_info['numeric_columns']))
+
+        # Overall span from the row group statistics of the time column
+        metadata = parquet_file.metadata
+        for rg in range(metadata.num_row_groups):
+            stats = metadata.row_group(rg).column(column_index).statistics
+            if stats is None or not stats.has_min_max:
+                continue
+            start = stats.min if start is None else min(start, stats.min)
+            end = stats.max if end is None else max(end, stats.max)
+    return {
+        'time_column': time_column,
+        'time_zone': time_zone,
+        'numeric_columns': list(numeric_columns),
+        'start': pd.Timestamp(start) if start is not None else None,
+        'end': pd.Timestamp(end) if end is not None else None,
+        'batches': batches,
+        'skipped': skipped,
+    }
+
+
+def _time_filter(dataset, time_column, time_range):
+    """Dataset expression for the inclusive time window, used to skip row groups by their statistics"""
+    if time_range is None:
+        return None
+    field_type = dataset.schema.field(time_column).type
+    bounds = []
+    for value in time_range:
+        timestamp = pd.Timestamp(value)
+        if field_type.tz is not None and timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize(field_type.tz, ambiguous=True, nonexistent="shift_forward")
+        elif field_type.tz is None and timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_localize(None)
+        bounds.append(pa.scalar(timestamp, type=field_type))
+    return (ds.field(time_column) >= bounds[0]) & (ds.field(time_column) <= bounds[1])
+
+
+def query_batches(sources, columns, time_range=None, max_workers=None):
+    """Selected columns of many batches in one DataFrame with a batch-id column.
+
+    Only the requested columns are decoded (projection), row groups outside
+    time_range are skipped using their statistics (filter pushdown) and the
+    files (dataset fragments) are scanned in parallel on a thread pool,
+    which runs on all cores since Arrow releases the GIL while decoding.
+    The result is indexed by time, holds the batch name as a categorical
+    column and is ordered by batch, then time. Batches skipped by fleet_info
+    are left out.
+    """
+    info = fleet_info(sources)
+    time_column = info['time_column']
+    if time_column is None:
+        raise ValueError("none of the batches has a time index")
+    sources = {name: sources[name] for name in info['batches']}
+    columns = list(columns)
+    names = list(sources)
+
+    dataset = fleet_dataset(sources)
+    projection = [time_column] + [c for c in columns if c != time_column]
+    time_filter = _time_filter(dataset, time_column, time_range)
+
+    def scan(batch_id, fragment):
+        table = fragment.to_table(schema=dataset.schema, columns=projection, filter=time_filter, use_threads=False)
+        batch = pa.DictionaryArray.from_arrays(
+            pa.array(np.full(table.num_rows, batch_id, dtype=np.int32)), pa.array(names)
+        )
+        return table.append_column(BATCH_COLUMN, batch)
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        tables = list(pool.map(scan, range(len(names)), dataset.get_fragments()))
+
+    if tables:
+        table = pa.concat_tables(tables)
+    else:
+        table = pa.table({name: pa.array([], type=dataset.schema.field(name).type) for name in projection})
+        table = table.append_column(BATCH_COLUMN, pa.DictionaryArray.from_arrays(pa.array([], pa.int32()), pa.array(names)))
+
+    # Without the pandas metadata of the first file the time stays a plain column
+    dataframe = table.replace_schema_metadata().to_pandas()
+    dataframe = dataframe.sort_values([BATCH_COLUMN, time_column], kind='stable')
+    dataframe = dataframe.set_index(time_column)
+    return dataframe[[BATCH_COLUMN] + [c for c in columns if c != time_column]]
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+import streamlit as st
+
+
+MAX_RECORDS = 5000
+_active = threading.local()
+
+
+def _rss_bytes():
+    """Resident memory of this process, or None where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _NullStage:
+    """Stage used while profiling is off, does nothing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_bytes(self, nbytes):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name, nbytes):
+        self.profiler = profiler
+        self.name = name
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self.depth = self.profiler.depth
+        self.profiler.depth += 1
+        self.rss_before = _rss_bytes()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        self.profiler.depth -= 1
+        rss_after = _rss_bytes()
+        rss_delta = rss_after - self.rss_before if rss_after is not None and self.rss_before is not None else None
+        self.profiler.records.append({
+            "run": self.profiler.run_id,
+            "page": self.profiler.page,
+            "stage": self.name,
+            "depth": self.depth,
+            "timestamp": time.time(),
+            "duration_ms": round(duration * 1000, 3),
+            "bytes": self.nbytes,
+            "rss_delta_bytes": rss_delta,
+            "error": exc_type.__name__ if exc_type else None,
+        })
+        return False
+
+    def add_bytes(self, nbytes):
+        self.nbytes = (self.nbytes or 0) + int(nbytes)
+
+
+class Profiler:
+    """Per-session record of how long each stage of a page run takes"""
+
+    def __init__(self):
+        self.enabled = False
+        self.run_id = 0
+        self.page = None
+        self.depth = 0
+        self.records = deque(maxlen=MAX_RECORDS)
+
+    def start_run(self, page):
+        """Start a new page run and make this profiler active for the current thread"""
+        self.run_id += 1
+        self.page = page
+        self.depth = 0
+        _active.profiler = self
+
+    def last_run(self):
+        return [r for r in self.records if r["run"] == self.run_id]
+
+    def to_jsonl(self):
+        return "\n".join(json.dumps(r) for r in self.records) + "\n"
+
+    def clear(self):
+        self.records.clear()
+
+
+def stage(name, nbytes=None):
+    """Context manager timing one stage on the active profiler.
+
+    Costs a thread-local lookup and returns a shared no-op stage while
+    profiling is disabled.
+    """
+    profiler = getattr(_active, "profiler", None)
+    if profiler is None or not profiler.enabled:
+        return _NULL_STAGE
+    return _Stage(profiler, name, nbytes)
+
+
+def get_profiler(page):
+    """Profiler of the current session, started for a run of the given page"""
+    if "profiler" not in st.session_state:
+        st.session_state.profiler = Profiler()
+    profiler = st.session_state.profiler
+    profiler.enabled = st.session_state.get("profiling_enabled", False)
+    profiler.start_run(page)
+    return profiler
+
+
+def render_profiler_panel(profiler):
+    """Collapsible sidebar panel with the timings of the previous run and a JSON lines export"""
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        st.checkbox("Record stage timings", key="profiling_enabled")
+        if not profiler.records:
+            st.caption("No timings recorded yet. Enable recording and interact with the app.")
+            return
+
+        last_run = profiler.last_run()
+        if last_run:
+            run_df = pd.DataFrame(last_run)
+            table = pd.DataFrame({
+                "Stage": ["· " * depth + name for depth, name in zip(run_df["depth"], run_df["stage"])],
+                "ms": run_df["duration_ms"],
+                "MB": run_df["bytes"].astype("float64") / 1024 / 1024,
+                "RSS Δ MB": run_df["rss_delta_bytes"].astype("float64") / 1024 / 1024,
+            })
+            st.dataframe(table.round(2), hide_index=True, use_container_width=True)
+            total_ms = run_df.loc[run_df["depth"] == 0, "duration_ms"].sum()
+            st.caption(f"Run {profiler.run_id} ({profiler.page}): {total_ms:.0f} ms in recorded stages")
+
+        st.download_button(
+            "Export timings (JSON lines)",
+            data=profiler.to_jsonl(),
+            file_name="dk258_timings.jsonl",
+            mime="application/x-ndjson",
+        )
+        if st.button("Clear timings"):
+            profiler.clear()
+            st.rerun()
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+
+
+LOCAL_KEY_PREFIX = "local:"
+# The File Path mode reads folders on the server, so it is only offered when
+# the deployment opts in with a data folder, and limited to that folder
+DATA_ROOT = os.environ.get("DK258_DATA_DIR") or None
+# Folders changed this recently are rescanned on the next listing, since a
+# second change within the same mtime tick would not be visible
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class DirectoryIndex:
+    """Cached folder listings, rescanned only when the folder mtime changes.
+
+    Adding, removing or renaming a file changes the mtime of its folder, so
+    as long as the mtime is unchanged the cached listing is exact and a
+    listing costs a single stat. A rescan reuses what is already known about
+    existing entries and only checks the new ones.
+    """
+
+    def __init__(self):
+        self._folders = {}
+        self._lock = threading.Lock()
+
+    def _scan(self, folder):
+        stat = os.stat(folder)
+        with self._lock:
+            cached = self._folders.get(folder)
+        if cached is not None and cached["mtime_ns"] == stat.st_mtime_ns and cached["trusted"]:
+            return cached
+
+        previous = cached["is_file"] if cached is not None else {}
+        is_file = {}
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                known = previous.get(entry.name)
+                # DirEntry.is_file() needs no extra stat on most platforms
+                is_file[entry.name] = known if known is not None else entry.is_file()
+        scanned = {
+            "mtime_ns": stat.st_mtime_ns,
+            "trusted": time.time_ns() - stat.st_mtime_ns > RACY_WINDOW_NS,
+            "is_file": is_file,
+            "by_suffix": {},
+        }
+        with self._lock:
+            self._folders[folder] = scanned
+        return scanned
+
+    def files(self, folder, suffix):
+        """Sorted names of the files in folder ending with suffix (case-insensitive)"""
+        if not folder or not os.path.isdir(folder):
+            return []
+        scanned = self._scan(os.path.abspath(folder))
+        suffix = suffix.lower()
+        names = scanned["by_suffix"].get(suffix)
+        if names is None:
+            names = sorted(
+                name for name, is_file in scanned["is_file"].items()
+                if is_file and name.lower().endswith(suffix)
+            )
+            scanned["by_suffix"][suffix] = names
+        return list(names)
+
+
+_index = None
+
+
+def get_directory_index():
+    """Process-wide index shared by all sessions"""
+    global _index
+    if _index is None:
+        _index = DirectoryIndex()
+    return _index
+
+
+def resolve_data_folder(path, root=DATA_ROOT):
+    """Real path of a folder inside root, relative paths start at root.
+
+    Returns None without a root or when the path (after following symlinks)
+    is outside of it.
+    """
+    if not root:
+        return None
+    root = os.path.realpath(root)
+    folder = os.path.realpath(os.path.join(root, os.path.expanduser(path)))
+    try:
+        inside = os.path.commonpath([root, folder]) == root
+    except ValueError:
+        # Paths on different drives
+        inside = False
+    return folder if inside else None
+
+
+def local_file_key(path):
+    """Cache key of a local file, changes when the file is modified"""
+    stat = os.stat(path)
+    return f"{LOCAL_KEY_PREFIX}{stat.st_mtime_ns}:{stat.st_size}:{os.path.abspath(path)}"
+
+
+def is_local_key(key):
+    return key.startswith(LOCAL_KEY_PREFIX)
+
+
+def local_key_path(key):
+    """Path of the local file a key from local_file_key refers to"""
+    return key[len(LOCAL_KEY_PREFIX):].split(":", 2)[2]
+
+
+def local_key_version(key):
+    """mtime and size part of a key from local_file_key, the version of the file it refers to"""
+    mtime_ns, size, _ = key[len(LOCAL_KEY_PREFIX):].split(":", 2)
+    return f"{mtime_ns}:{size}"
@@ -1,23 +1,615 @@
+import os
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 import plotly.graph_objects as go
-import io
+from batch_views import build_line_figure, column_info, plot_statistics
+from correlation import TOP_K, top_correlated
+from decimation import DECIMATION_METHODS, decimate
+from export import EXPORT_FORMATS, PARQUET_COMPRESSIONS, export_window
+from file_cache import (
+    load_compaction_plan_from_store,
+    load_correlation_from_store,
+    load_fleet_info,
+    load_fleet_query,
+    load_parquet_schema_from_store,
+    load_preview_page_from_store,
+    load_time_index_from_store,
+    open_file,
+    upload_store,
+)
+from fleet_query import BATCH_COLUMN
+from instrumentation import get_profiler, render_profiler_panel, stage
+from local_folder import local_file_key
+from plot_arrays import plot_x, plot_y, scatter_class
+from resample import RESAMPLE_AGGREGATIONS, RESAMPLE_INTERVALS
+from rolling import ROLLING_OVERLAYS, ROLLING_WINDOW_DEFAULT
+
+CORRELATION_DEFAULT_CHANNELS = 50
 
 st.title("Data Viewer")
 
-@st.cache_data
-def load_parquet_from_bytes(file_bytes, filename):
-    """Load parquet file from bytes data"""
+profiler = get_profiler("Viewer")
+
+# Active time window per file (content hash), kept across tabs and reruns
+if 'time_windows' not in st.session_state:
+    st.session_state.time_windows = {}
+# Last widget values per file, restored when switching back to a file
+if 'viewer_settings' not in st.session_state:
+    st.session_state.viewer_settings = {}
+# Channels of the last correlation per file
+if 'correlation_channels' not in st.session_state:
+    st.session_state.correlation_channels = {}
+
+def jump_to_preview_page(jump_key, page_key, time_index, window_lo, window_hi, page_size):
+    """Move the preview to the page holding a time or a row number (callback)"""
+    target = st.session_state[jump_key].strip()
+    if not target:
+        return
+    try:
+        if target.isdigit():
+            # Row numbers are 1-based, as in the caption below the preview
+            position = window_lo + int(target) - 1
+        elif time_index is not None:
+            position, _ = time_index.window_positions(pd.Timestamp(target), pd.Timestamp(target))
+        else:
+            raise ValueError
+    except ValueError:
+        st.session_state[f"{jump_key}_error"] = target
+        return
+    st.session_state.pop(f"{jump_key}_error", None)
+    position = min(max(position, window_lo), max(window_hi - 1, window_lo))
+    st.session_state[page_key] = (position - window_lo) // page_size + 1
+
+def file_widget_key(file_digest, name, default):
+    """Key of a per-file widget, initialised from its last value for that file.
+
+    Streamlit drops the state of widgets that are not rendered in a run, so
+    the value is also kept in viewer_settings and restored from there.
+    """
+    key = f"{name}_{file_digest}"
+    settings = st.session_state.viewer_settings.setdefault(file_digest, {})
+    if key not in st.session_state:
+        st.session_state[key] = settings.get(name, default)
+    settings[name] = st.session_state[key]
+    return key
+
+# The figure is cached per file, columns, window and plot settings
+cached_line_figure = st.cache_data(max_entries=32)(build_line_figure)
+
+def render_export(filename, file_digest, schema_info, time_index, time_range, default_columns):
+    """Download of the current time window and chosen columns as parquet or CSV"""
+    with st.expander("💾 Export Window", expanded=False):
+        export_columns = st.multiselect(
+            "Columns to export:",
+            options=schema_info['columns'],
+            key=file_widget_key(file_digest, "export_columns", list(default_columns) or schema_info['columns'])
+        )
+        exp_col1, exp_col2 = st.columns(2)
+        with exp_col1:
+            file_format = st.radio("Format:", EXPORT_FORMATS, horizontal=True, key=f"export_format_{file_digest}")
+        with exp_col2:
+            compression = st.selectbox(
+                "Compression:",
+                options=PARQUET_COMPRESSIONS,
+                disabled=file_format != "Parquet",
+                key=f"export_compression_{file_digest}"
+            )
+        
+        # Time-sorted files export a contiguous row range, others filter by time
+        rows = None
+        if time_range is not None and time_index.is_sorted:
+            rows = time_index.window_positions(*time_range)
+            st.caption(f"{rows[1] - rows[0]:,} rows in the current time window")
+        elif time_range is not None:
+            st.caption(f"{time_index.count(*time_range):,} rows in the current time window")
+        else:
+            st.caption(f"All {schema_info['num_rows']:,} rows")
+        
+        # The file is only written when the button is clicked, in batches straight from the
+        # parquet file to a temporary file on disk. Only the finished file is read for the download
+        def export_data():
+            with export_window(
+                open_file(file_digest), export_columns, rows=rows, time_range=time_range,
+                file_format=file_format, compression=compression
+            ) as exported:
+                return exported.read()
+        
+        stem = filename.rsplit('.', 1)[0]
+        suffix = "parquet" if file_format == "Parquet" else "csv"
+        st.download_button(
+            f"⬇️ Download {suffix.upper()}",
+            data=export_data,
+            file_name=f"{stem}_window.{suffix}" if time_range is not None else f"{stem}.{suffix}",
+            mime="application/octet-stream" if file_format == "Parquet" else "text/csv",
+            on_click="ignore",
+            disabled=not export_columns,
+            key=f"export_download_{file_digest}"
+        )
+
+def render_correlation(file_digest, numeric_columns, time_range):
+    """Correlation or covariance of the chosen channels over the current window, with a top-k lookup"""
+    st.subheader("🔗 Channel Correlation")
+    if len(numeric_columns) < 2:
+        st.info("At least two numeric columns are needed for a correlation.")
+        return
+    
+    # The scan only runs when the form is submitted, later windows reuse the channels
+    with st.form(f"correlation_form_{file_digest}"):
+        columns = st.multiselect(
+            "Channels:",
+            options=numeric_columns,
+            default=numeric_columns[:CORRELATION_DEFAULT_CHANNELS]
+        )
+        submitted = st.form_submit_button("Compute correlation")
+    if submitted:
+        st.session_state.correlation_channels[file_digest] = tuple(columns)
+    columns = st.session_state.correlation_channels.get(file_digest)
+    if not columns or len(columns) < 2:
+        st.caption("Choose at least two channels, then compute the correlation.")
+        return
+    
+    with stage("correlation"):
+        with st.spinner("Scanning the window..."):
+            accumulator = load_correlation_from_store(file_digest, columns, time_range)
+    matrix_kind = st.radio("Matrix:", ["Correlation", "Covariance"], horizontal=True, key=f"correlation_kind_{file_digest}")
+    correlation = accumulator.correlation()
+    matrix = correlation if matrix_kind == "Correlation" else accumulator.covariance()
+    fig = go.Figure(go.Heatmap(
+        z=matrix.to_numpy(),
+        x=list(matrix.columns),
+        y=list(matrix.index),
+        colorscale='RdBu',
+        zmid=0,
+        zmin=-1 if matrix_kind == "Correlation" else None,
+        zmax=1 if matrix_kind == "Correlation" else None
+    ))
+    fig.update_layout(
+        title=f"{matrix_kind} of {len(columns)} channels over {accumulator.rows:,} rows",
+        height=max(400, 20 * len(columns)),
+        yaxis=dict(autorange='reversed')
+    )
+    st.plotly_chart(fig, use_container_width=True, key=f"correlation_{file_digest}")
+    
+    top_col1, top_col2 = st.columns(2)
+    with top_col1:
+        channel = st.selectbox("Most correlated with:", options=columns, key=f"correlation_channel_{file_digest}")
+    with top_col2:
+        k = st.number_input("Top:", min_value=1, max_value=len(columns) - 1, value=min(TOP_K, len(columns) - 1),
+                            key=f"correlation_top_{file_digest}")
+    st.dataframe(top_correlated(correlation, channel, k), hide_index=True, use_container_width=True)
+
+def render_batch(filename, file_digest):
+    """Line graph, statistics, column info and preview of one file"""
+    st.write(f"**Dataset:** `{filename}`")
+    
     try:
-        return pd.read_parquet(io.BytesIO(file_bytes))
+        # Read only the schema up front, data columns are loaded on demand
+        with stage("schema"):
+            schema_info = load_parquet_schema_from_store(file_digest, filename)
+        
+        if schema_info is None:
+            return
+        
+        # Sorted timestamps alone drive the time filter, no data columns needed
+        with stage("time index"):
+            time_index = load_time_index_from_store(file_digest)
+        total_rows = schema_info['num_rows']
+        
+        # LINE GRAPH SECTION
+        st.subheader("📈 Line Graph")
+        
+        # The slider state is keyed by file, so the window follows the file across tabs
+        time_filter_key = f"time_range_{file_digest}"
+        has_datetime_index = time_index is not None and len(time_index) > 0
+        time_range = None
+        
+        # Apply time filtering if a window is active and we have a datetime index
+        if has_datetime_index:
+            if time_filter_key in st.session_state:
+                slider_start, slider_end = st.session_state[time_filter_key]
+                st.session_state.time_windows[file_digest] = (
+                    time_index.from_slider_value(slider_start),
+                    time_index.from_slider_value(slider_end, earliest=False),
+                )
+            saved_range = st.session_state.time_windows.get(file_digest)
+            if saved_range is not None and time_index.count(*saved_range) != len(time_index):
+                time_range = saved_range
+        
+        # Row positions of the window (in time order) for the range statistics
+        with stage("time filter"):
+            if time_range is not None:
+                window_lo, window_hi = time_index.window_positions(*time_range)
+            else:
+                window_lo, window_hi = 0, total_rows
+        
+        # Get numeric columns for plotting from the parquet schema
+        numeric_columns = schema_info['numeric_columns']
+        datetime_columns = schema_info['datetime_columns']
+        
+        # Check if index is datetime
+        index_is_datetime = has_datetime_index
+        
+        if numeric_columns:
+            # Create two columns for plot controls
+            plot_col1, plot_col2 = st.columns(2)
+            
+            with plot_col1:
+                # Y-axis selection (numeric columns)
+                selected_y_columns = st.multiselect(
+                    "Select columns to plot (Y-axis):",
+                    options=numeric_columns,
+                    key=file_widget_key(file_digest, "y_columns", numeric_columns[:3])
+                )
+            
+            with plot_col2:
+                # X-axis selection
+                x_axis_options = []
+                x_axis_labels = []
+                
+                if index_is_datetime:
+                    x_axis_options.append("index")
+                    x_axis_labels.append("Index (datetime)")
+                
+                for col in datetime_columns:
+                    x_axis_options.append(col)
+                    x_axis_labels.append(f"{col} (datetime)")
+                
+                # Add numeric columns as potential x-axis
+                for col in numeric_columns:
+                    x_axis_options.append(col)
+                    x_axis_labels.append(f"{col} (numeric)")
+                
+                if x_axis_options:
+                    selected_x = st.selectbox(
+                        "Select X-axis:",
+                        options=x_axis_options,
+                        format_func=lambda x: dict(zip(x_axis_options, x_axis_labels)).get(x, x),
+                        key=file_widget_key(file_digest, "x_axis", x_axis_options[0])
+                    )
+                else:
+                    selected_x = None
+                    st.warning("No suitable columns found for X-axis")
+            
+            # Decimation controls - traces are downsampled to a pixel budget
+            # for the current time window before the figure is built
+            dec_col1, dec_col2 = st.columns(2)
+            with dec_col1:
+                decimation_method = st.selectbox(
+                    "Downsampling method:",
+                    options=DECIMATION_METHODS,
+                    help="LTTB keeps the visual shape of the line, Min/Max keeps every spike. None plots every row.",
+                    key=file_widget_key(file_digest, "decimation_method", DECIMATION_METHODS[0])
+                )
+            with dec_col2:
+                max_points = st.number_input(
+                    "Max points per trace:",
+                    min_value=100,
+                    max_value=100_000,
+                    step=500,
+                    help="Roughly twice the chart width in pixels is enough for a visually lossless line.",
+                    key=file_widget_key(file_digest, "max_points", 2_000)
+                )
+            
+            # Resampling - aggregates every interval of the time index
+            if index_is_datetime:
+                res_col1, res_col2 = st.columns(2)
+                with res_col1:
+                    resample_interval = st.selectbox(
+                        "Resample interval:",
+                        options=list(RESAMPLE_INTERVALS),
+                        help="Aggregate the rows of every interval before plotting. Only applies with the datetime index on the X-axis.",
+                        key=file_widget_key(file_digest, "resample_interval", "Raw")
+                    )
+                with res_col2:
+                    aggregation = st.selectbox(
+                        "Aggregation:",
+                        options=RESAMPLE_AGGREGATIONS,
+                        disabled=resample_interval == "Raw",
+                        key=file_widget_key(file_digest, "aggregation", RESAMPLE_AGGREGATIONS[0])
+                    )
+            else:
+                resample_interval, aggregation = "Raw", RESAMPLE_AGGREGATIONS[0]
+            
+            # Rolling overlays - computed over the raw rows in time order
+            if index_is_datetime:
+                roll_col1, roll_col2 = st.columns(2)
+                with roll_col1:
+                    overlays = st.multiselect(
+                        "Overlays:",
+                        options=ROLLING_OVERLAYS,
+                        help="Rolling statistics over the last rows of every point. Only shown with the datetime index on the X-axis.",
+                        key=file_widget_key(file_digest, "overlays", [])
+                    )
+                with roll_col2:
+                    rolling_window = st.number_input(
+                        "Rolling window (rows):",
+                        min_value=2,
+                        max_value=1_000_000,
+                        step=50,
+                        disabled=not overlays,
+                        key=file_widget_key(file_digest, "rolling_window", ROLLING_WINDOW_DEFAULT)
+                    )
+            else:
+                overlays, rolling_window = [], ROLLING_WINDOW_DEFAULT
+        
+        window_size = window_hi - window_lo
+        
+        if numeric_columns:
+            # Create and display the graph
+            if selected_y_columns and selected_x is not None:
+                try:
+                    # The figure is cached per file, columns and window
+                    with stage("figure build"):
+                        fig = cached_line_figure(
+                            file_digest, filename, tuple(selected_y_columns), selected_x,
+                            time_range, decimation_method, max_points, resample_interval, aggregation,
+                            tuple(overlays), rolling_window
+                        )
+                    
+                    # Display the graph
+                    with stage("figure serialize"):
+                        st.plotly_chart(fig, use_container_width=True, key=f"plot_{file_digest}")
+                    
+                    # TIME RANGE SLIDER - NOW BELOW THE GRAPH
+                    if has_datetime_index:
+                        st.markdown("---")
+                        st.write("**📅 Filter by Time Range:**")
+                        
+                        # Show current filter status
+                        if window_size != total_rows:
+                            st.info(f"🔍 Time filter active: Showing {window_size:,} of {total_rows:,} total rows ({window_size/total_rows*100:.1f}%)")
+                        else:
+                            st.success("📊 Showing full time range")
+                        
+                        # Time range slider - only the endpoints are sent to the browser
+                        if time_index.start < time_index.end:
+                            if time_filter_key not in st.session_state:
+                                saved_range = st.session_state.time_windows.get(file_digest, (time_index.start, time_index.end))
+                                st.session_state[time_filter_key] = tuple(time_index.to_slider_value(v) for v in saved_range)
+                            st.slider(
+                                "Adjust the time range and the graph will update:",
+                                min_value=time_index.to_slider_value(time_index.start),
+                                max_value=time_index.to_slider_value(time_index.end),
+                                step=time_index.slider_step(),
+                                format="YYYY-MM-DD HH:mm:ss",
+                                key=time_filter_key
+                            )
+                    
+                    # Show some stats about the plotted data
+                    with st.expander(f"Plot Statistics", expanded=False):
+                        # Count, mean, std, min and max are O(1) per window, the
+                        # quartiles need a pass over it and are only computed on request
+                        show_quartiles = st.toggle("Show quartiles", key=f"quartiles_{file_digest}")
+                        with stage("statistics"):
+                            stats_df = plot_statistics(
+                                file_digest, selected_y_columns, window_lo, window_hi, quantiles=show_quartiles
+                            )
+                        st.dataframe(stats_df, use_container_width=True)
+                        
+                except Exception as plot_error:
+                    st.error(f"❌ Could not create plot: {plot_error}")
+                    st.info("This might be due to data format issues or missing values.")
+            
+            elif not selected_y_columns:
+                st.info("Please select at least one column to plot on the Y-axis.")
+                
+        else:
+            st.warning("⚠️ No numeric columns found for plotting.")
+            st.info("The dataset needs numeric columns to create line graphs.")
+        
+        render_export(
+            filename, file_digest, schema_info, time_index, time_range,
+            selected_y_columns if numeric_columns else []
+        )
+        
+        st.markdown("---")
+        
+        render_correlation(file_digest, numeric_columns, time_range)
+        
+        st.markdown("---")
+        
+        # DATASET INFORMATION (uses filtered data)
+        st.subheader("📊 Dataset Information")
+        
+        # Show basic info about the dataset
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if window_size != total_rows:
+                st.metric("Rows (filtered)", window_size)
+                st.caption(f"Total: {total_rows:,}")
+            else:
+                st.metric("Rows", window_size)
+        with col2:
+            st.metric("Columns", len(schema_info['columns']))
+        with col3:
+            if has_datetime_index:
+                original_range = f"{time_index.start.strftime('%Y-%m-%d')} to {time_index.end.strftime('%Y-%m-%d')}"
+                if time_range is not None and window_size > 0:
+                    window_start = time_index.to_timestamp(time_index.values[window_lo])
+                    window_end = time_index.to_timestamp(time_index.values[window_hi - 1])
+                    date_range = f"{window_start.strftime('%Y-%m-%d')} to {window_end.strftime('%Y-%m-%d')}"
+                    st.write(f"**Date Range (filtered):** {date_range}")
+                    st.caption(f"Full range: {original_range}")
+                else:
+                    st.write(f"**Date Range:** {original_range}")
+            else:
+                st.write("**Index Type:** Non-datetime")
+        
+        # Memory of the file when loaded by pandas, before and after
+        # narrowing every column to its smallest safe dtype. This decodes
+        # every column, so it only runs on request
+        if st.toggle("Show memory report", key=f"memory_report_{file_digest}"):
+            with stage("memory report"):
+                with st.spinner("Decoding every column..."):
+                    _, memory_report = load_compaction_plan_from_store(file_digest)
+            bytes_before = memory_report['Bytes before'].sum()
+            bytes_after = memory_report['Bytes after'].sum()
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Memory (as loaded)", f"{bytes_before / 1024 / 1024:,.1f} MB")
+            with col2:
+                saved = 1 - bytes_after / bytes_before if bytes_before else 0
+                st.metric("Memory (compacted)", f"{bytes_after / 1024 / 1024:,.1f} MB", f"-{saved:.0%}", delta_color="inverse")
+            with st.expander("Memory per column"):
+                st.dataframe(memory_report, hide_index=True, use_container_width=True)
+        
+        st.markdown("---")
+        
+        # Display column info. The full file is covered by the parquet footer
+        # statistics, a time window by the precomputed null index
+        all_columns = schema_info['columns']
+        with st.expander(f"Column Information ({len(all_columns)} columns)", expanded=False):
+            with stage("column info"):
+                col_info = column_info(file_digest, schema_info, time_range, window_lo, window_hi)
+            st.dataframe(col_info, use_container_width=True)
+        
+        # Display the dataframe
+        # Only the visible page is read and sent to the browser
+        st.subheader("Data Preview")
+        page_key = f"preview_page_{file_digest}"
+        jump_key = f"preview_jump_{file_digest}"
+        
+        prev_col1, prev_col2, prev_col3 = st.columns(3)
+        with prev_col1:
+            page_size = st.selectbox(
+                "Rows per page:",
+                options=[50, 100, 500, 1000],
+                key=file_widget_key(file_digest, "preview_page_size", 100)
+            )
+        page_count = max(1, -(-window_size // page_size))
+        file_widget_key(file_digest, "preview_page", 1)
+        if st.session_state.get(page_key, 1) > page_count:
+            st.session_state[page_key] = page_count
+        with prev_col2:
+            st.text_input(
+                "Jump to time or row:",
+                placeholder="e.g. 2024-01-31 12:00 or 15000",
+                key=jump_key,
+                on_change=jump_to_preview_page,
+                args=(jump_key, page_key, time_index if has_datetime_index else None, window_lo, window_hi, page_size)
+            )
+        with prev_col3:
+            page = st.number_input(
+                f"Page (of {page_count:,}):",
+                min_value=1,
+                max_value=page_count,
+                step=1,
+                key=page_key
+            )
+        if st.session_state.get(f"{jump_key}_error"):
+            st.warning(f"Could not find '{st.session_state[f'{jump_key}_error']}', enter a row number or a time.")
+        
+        page_start = window_lo + (page - 1) * page_size
+        page_stop = min(page_start + page_size, window_hi)
+        if window_size != total_rows:
+            st.caption(f"Showing rows {page_start - window_lo + 1:,}-{page_stop - window_lo:,} of the filtered data ({window_size:,} of {total_rows:,} rows)")
+        else:
+            st.caption(f"Showing rows {page_start + 1:,}-{page_stop:,} of {total_rows:,}")
+        with stage("preview decode") as decode_stage:
+            page_table = load_preview_page_from_store(file_digest, page_start, page_stop)
+            decode_stage.add_bytes(page_table.nbytes)
+        with stage("preview serialize"):
+            st.dataframe(page_table, use_container_width=True)
+        
     except Exception as e:
-        st.error(f"Error loading {filename}: {e}")
-        return None
+        st.error(f'❌ Could not process {filename}: {e}')
+        st.info("Please check if the file is a valid parquet file.")
+
+def render_fleet_query(selected_batches, files_data, local_mode):
+    """Channels across many batches as one dataset, plotted with one line per batch"""
+    st.subheader("🔎 Fleet Query")
+    all_label = f"All {len(files_data):,} {'files in the folder' if local_mode else 'uploaded files'}"
+    scope = st.radio("Batches:", ["Selected files", all_label], horizontal=True, key="fleet_scope")
+    names = selected_batches if scope == "Selected files" else sorted(files_data)
+    
+    # Local files are keyed by mtime and size too, so changed files are queried again
+    with stage("fleet info"):
+        if local_mode:
+            batch_keys = tuple((name, local_file_key(files_data[name])) for name in names)
+        else:
+            batch_keys = tuple((name, files_data[name]) for name in names)
+        info = load_fleet_info(batch_keys)
+    if info['time_column'] is None or info['start'] is None or not info['numeric_columns']:
+        st.info("None of these files has a datetime index with numeric channels to query.")
+        return
+    if info['skipped']:
+        st.warning(
+            f"⚠️ Skipped {len(info['skipped'])} files without a readable datetime index, or whose time column "
+            f"or time zone differs from {info['time_column']} ({info['time_zone'] or 'no time zone'}): "
+            + ', '.join(info['skipped'][:5]) + (" ..." if len(info['skipped']) > 5 else "")
+        )
+    
+    # The query only runs when the form is submitted
+    step = max(pd.Timedelta(seconds=1), ((info['end'] - info['start']) / 1000).floor('s'))
+    with st.form("fleet_query_form"):
+        columns = st.multiselect("Channels:", options=info['numeric_columns'], default=info['numeric_columns'][:1])
+        window = st.slider(
+            "Time range:",
+            min_value=info['start'].to_pydatetime(),
+            max_value=info['end'].to_pydatetime(),
+            value=(info['start'].to_pydatetime(), info['end'].to_pydatetime()),
+            step=step.to_pytimedelta(),
+            format="YYYY-MM-DD HH:mm:ss"
+        )
+        submitted = st.form_submit_button("Run query")
+    if submitted:
+        st.session_state.fleet_query = (batch_keys, tuple(columns), tuple(pd.Timestamp(v) for v in window))
+    
+    query = st.session_state.get('fleet_query')
+    if query is None or query[0] != batch_keys or not query[1]:
+        st.caption("Choose channels and a time range, then run the query.")
+        return
+    batch_keys, columns, time_range = query
+    try:
+        with stage("fleet query"):
+            df = load_fleet_query(batch_keys, columns, time_range)
+    except (pa.ArrowException, ValueError) as e:
+        st.error(f"Could not query these files: {str(e)}")
+        return
+    rows_per_batch = df[BATCH_COLUMN].value_counts(sort=False)
+    st.caption(f"{len(df):,} rows from {int((rows_per_batch > 0).sum())} of {len(batch_keys) - len(info['skipped'])} batches")
+    
+    # One decimated line per batch and channel
+    with stage("fleet figure"):
+        max_points = 2_000
+        traces = []
+        for batch, batch_df in df.groupby(BATCH_COLUMN, observed=True, sort=False):
+            for column in columns:
+                keep = decimate(batch_df.index, batch_df[column], max_points, method="Min/Max")
+                traces.append((f"{batch} · {column}", batch_df.index[keep], batch_df[column].iloc[keep]))
+        fig = go.Figure()
+        scatter = scatter_class(sum(len(trace_y) for _, _, trace_y in traces))
+        for name, trace_x, trace_y in traces:
+            fig.add_trace(scatter(x=plot_x(trace_x)[0], y=plot_y(trace_y), mode='lines', name=name, line=dict(width=1)))
+        fig.update_xaxes(type='date')
+        fig.update_layout(
+            title=f"{', '.join(columns)} across {len(traces) // max(len(columns), 1)} batches",
+            xaxis_title="Time",
+            yaxis_title="Values",
+            hovermode='closest',
+            showlegend=True,
+            height=500
+        )
+    st.plotly_chart(fig, use_container_width=True, key="fleet_plot")
+    with st.expander("Rows per batch", expanded=False):
+        st.dataframe(rows_per_batch.rename("Rows"), use_container_width=True)
+
+# Files come from the upload store or, in File Path mode, straight from a local folder
+local_mode = st.session_state.get('data_source_method') == "File Path"
+if local_mode:
+    files_data = st.session_state.get('local_files_data', {})
+else:
+    files_data = st.session_state.get('uploaded_files_data', {})
 
 # Check if we have uploaded files and selected files
-if 'uploaded_files_data' not in st.session_state or not st.session_state.uploaded_files_data:
-    st.warning("⚠️ No files uploaded!")
-    st.info("Please go to the **Homepage** first and upload some parquet files.")
+if not files_data:
+    if local_mode:
+        st.warning("⚠️ No folder selected!")
+        st.info("Please go to the **Homepage** first and enter a folder with parquet files.")
+    else:
+        st.warning("⚠️ No files uploaded!")
+        st.info("Please go to the **Homepage** first and upload some parquet files.")
     st.stop()
 
 if 'selected_batches' not in st.session_state or not st.session_state.selected_batches:
@@ -27,233 +619,58 @@ if 'selected_batches' not in st.session_state or not st.session_state.selected_b
 
 # Get the selected files from session state
 selected_batches = st.session_state.selected_batches
-uploaded_files_data = st.session_state.uploaded_files_data
+
+# Location of every selected file on disk
+if local_mode:
+    file_paths = {f: files_data[f] for f in selected_batches if f in files_data}
+else:
+    file_paths = {f: upload_store.path(files_data[f]) for f in selected_batches if f in files_data}
 
 # Verify all selected files are still available
-missing_files = [f for f in selected_batches if f not in uploaded_files_data.keys()]
+missing_files = [f for f in selected_batches if f not in file_paths or not os.path.isfile(file_paths[f])]
 if missing_files:
     st.error(f"❌ Some selected files are no longer available: {missing_files}")
-    st.info("Please go back to the **Homepage** and re-upload your files.")
+    if local_mode:
+        st.info("Please go back to the **Homepage** and check the folder.")
+    else:
+        st.info("Please go back to the **Homepage** and re-upload your files.")
     st.stop()
 
-st.success(f"📁 Viewing {len(selected_batches)} uploaded files")
+st.success(f"📁 Viewing {len(selected_batches)} {'local' if local_mode else 'uploaded'} files")
 
 # Display current selections with option to modify
 with st.expander("Current Selection", expanded=False):
     st.write("**Selected files:**")
     for f in selected_batches:
-        file_size = len(uploaded_files_data[f]) / 1024 / 1024  # MB
+        file_size = os.path.getsize(file_paths[f]) / 1024 / 1024  # MB
         st.write(f"-- {f} ({file_size:.1f} MB)")
     st.info("💡 Go back to **Homepage** to change your selection")
 
 st.markdown("---")
 
-# Create tabs based on selected files
-tab_names = [f.replace('.parquet', '') for f in selected_batches]
-tabs = st.tabs(tab_names)
+# Only the active file is processed on a rerun, the other selected files cost nothing
+if st.session_state.get('active_batch') not in selected_batches:
+    st.session_state.active_batch = selected_batches[0]
+if st.session_state.get('active_batch_selector') not in selected_batches:
+    st.session_state.active_batch_selector = st.session_state.active_batch
 
-# Create content for each tab
-for i, (tab, filename) in enumerate(zip(tabs, selected_batches)):
-    with tab:
-        st.write(f"**Dataset:** `{filename}`")
-        
-        try:
-            # Load data from uploaded bytes
-            original_df = load_parquet_from_bytes(uploaded_files_data[filename], filename)
-            
-            if original_df is None:
-                continue
-            
-            # LINE GRAPH SECTION
-            st.subheader("📈 Line Graph")
-            
-            # Start with full dataset, but check if time filtering should be applied
-            df = original_df.copy()
-            
-            # Check if we have a time range selection in session state for this tab
-            time_filter_key = f"time_range_{i}"
-            has_datetime_index = isinstance(original_df.index, pd.DatetimeIndex)
-            
-            # Apply time filtering if it exists and we have datetime index
-            if has_datetime_index and time_filter_key in st.session_state:
-                time_range = st.session_state[time_filter_key]
-                if time_range != (original_df.index.min(), original_df.index.max()):
-                    df = original_df.loc[time_range[0]:time_range[1]]
-            
-            # Get numeric columns for plotting (from potentially filtered data)
-            numeric_columns = df.select_dtypes(include=['number']).columns.tolist()
-            datetime_columns = df.select_dtypes(include=['datetime64']).columns.tolist()
-            
-            # Check if index is datetime
-            index_is_datetime = pd.api.types.is_datetime64_any_dtype(df.index)
-            
-            if numeric_columns:
-                # Create two columns for plot controls
-                plot_col1, plot_col2 = st.columns(2)
-                
-                with plot_col1:
-                    # Y-axis selection (numeric columns)
-                    selected_y_columns = st.multiselect(
-                        "Select columns to plot (Y-axis):",
-                        options=numeric_columns,
-                        default=numeric_columns[:3] if len(numeric_columns) >= 3 else numeric_columns,
-                        key=f"y_columns_{i}"
-                    )
-                
-                with plot_col2:
-                    # X-axis selection
-                    x_axis_options = []
-                    x_axis_labels = []
-                    
-                    if index_is_datetime:
-                        x_axis_options.append("index")
-                        x_axis_labels.append("Index (datetime)")
-                    
-                    for col in datetime_columns:
-                        x_axis_options.append(col)
-                        x_axis_labels.append(f"{col} (datetime)")
-                    
-                    # Add numeric columns as potential x-axis
-                    for col in numeric_columns:
-                        x_axis_options.append(col)
-                        x_axis_labels.append(f"{col} (numeric)")
-                    
-                    if x_axis_options:
-                        selected_x = st.selectbox(
-                            "Select X-axis:",
-                            options=x_axis_options,
-                            format_func=lambda x: dict(zip(x_axis_options, x_axis_labels)).get(x, x),
-                            index=0,
-                            key=f"x_axis_{i}"
-                        )
-                    else:
-                        selected_x = None
-                        st.warning("No suitable columns found for X-axis")
-                
-                # Create and display the graph
-                if selected_y_columns and selected_x is not None:
-                    try:
-                        # Handle x-axis data
-                        if selected_x == "index":
-                            x_data = df.index
-                            x_title = "Index"
-                        else:
-                            x_data = df[selected_x]
-                            x_title = selected_x
-                        
-                        # Create the plot
-                        fig = go.Figure()
-                        
-                        # Add a line for each selected y column
-                        for y_col in selected_y_columns:
-                            fig.add_trace(go.Scatter(
-                                x=x_data,
-                                y=df[y_col],
-                                mode='lines',
-                                name=y_col,
-                                line=dict(width=2)
-                            ))
-                        
-                        # Update layout with dynamic title
-                        filter_status = f" - Filtered ({len(df):,} points)" if len(df) != len(original_df) else f" ({len(df):,} points)"
-                        
-                        fig.update_layout(
-                            title=f"Line Graph for {filename}{filter_status}",
-                            xaxis_title=x_title,
-                            yaxis_title="Values",
-                            hovermode='x unified',
-                            showlegend=True,
-                            height=500
-                        )
-                        
-                        # Display the graph
-                        st.plotly_chart(fig, use_container_width=True, key=f"plot_{i}")
-                        
-                        # TIME RANGE SLIDER - NOW BELOW THE GRAPH
-                        if has_datetime_index:
-                            st.markdown("---")
-                            st.write("**📅 Filter by Time Range:**")
-                            
-                            # Show current filter status
-                            if len(df) != len(original_df):
-                                st.info(f"🔍 Time filter active: Showing {len(df):,} of {len(original_df):,} total rows ({len(df)/len(original_df)*100:.1f}%)")
-                            else:
-                                st.success("📊 Showing full time range")
-                            
-                            # Time range slider
-                            time_range = st.select_slider(
-                                "Adjust the time range and the graph will update:",
-                                options=original_df.index,
-                                value=(original_df.index.min(), original_df.index.max()),
-                                format_func=lambda x: x.strftime('%Y-%m-%d %H:%M') if hasattr(x, 'strftime') else str(x),
-                                key=time_filter_key
-                            )
-                        
-                        # Show some stats about the plotted data
-                        with st.expander(f"Plot Statistics", expanded=False):
-                            stats_df = df[selected_y_columns].describe()
-                            st.dataframe(stats_df, use_container_width=True)
-                            
-                    except Exception as plot_error:
-                        st.error(f"❌ Could not create plot: {plot_error}")
-                        st.info("This might be due to data format issues or missing values.")
-                
-                elif not selected_y_columns:
-                    st.info("Please select at least one column to plot on the Y-axis.")
-                    
-            else:
-                st.warning("⚠️ No numeric columns found for plotting.")
-                st.info("The dataset needs numeric columns to create line graphs.")
-            
-            st.markdown("---")
-            
-            # DATASET INFORMATION (uses filtered data)
-            st.subheader("📊 Dataset Information")
-            
-            # Show basic info about the dataset
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                if len(df) != len(original_df):
-                    st.metric("Rows (filtered)", len(df))
-                    st.caption(f"Total: {len(original_df):,}")
-                else:
-                    st.metric("Rows", len(df))
-            with col2:
-                st.metric("Columns", len(df.columns))
-            with col3:
-                if hasattr(df.index, 'min') and hasattr(df.index, 'max'):
-                    try:
-                        if len(df) != len(original_df):
-                            date_range = f"{df.index.min().strftime('%Y-%m-%d')} to {df.index.max().strftime('%Y-%m-%d')}"
-                            st.write(f"**Date Range (filtered):** {date_range}")
-                            original_range = f"{original_df.index.min().strftime('%Y-%m-%d')} to {original_df.index.max().strftime('%Y-%m-%d')}"
-                            st.caption(f"Full range: {original_range}")
-                        else:
-                            date_range = f"{df.index.min().strftime('%Y-%m-%d')} to {df.index.max().strftime('%Y-%m-%d')}"
-                            st.write(f"**Date Range:** {date_range}")
-                    except:
-                        st.write("**Index Type:** Non-datetime")
-                else:
-                    st.write("**Index Type:** Non-datetime")
-            
-            st.markdown("---")
-            
-            # Display column info
-            with st.expander(f"Column Information ({len(df.columns)} columns)", expanded=False):
-                col_info = pd.DataFrame({
-                    'Column': df.columns,
-                    'Type': df.dtypes,
-                    'Non-null Count': df.count(),
-                    'Null Count': df.isnull().sum()
-                })
-                st.dataframe(col_info, use_container_width=True)
-            
-            # Display the dataframe
-            st.subheader("Data Preview")
-            if len(df) != len(original_df):
-                st.caption(f"Showing filtered data ({len(df):,} of {len(original_df):,} rows)")
-            st.dataframe(df, use_container_width=True)
-            
-        except Exception as e:
-            st.error(f'❌ Could not process {filename}: {e}')
-            st.info("Please check if the file is a valid parquet file.")
+active_batch = st.radio(
+    "Select a file to view:",
+    options=selected_batches,
+    format_func=lambda f: f.replace('.parquet', ''),
+    horizontal=True,
+    key="active_batch_selector"
+)
+st.session_state.active_batch = active_batch
+
+# Local files are keyed by path, mtime and size, so a rewritten file is reloaded
+if local_mode:
+    active_key = local_file_key(file_paths[active_batch])
+else:
+    active_key = files_data[active_batch]
+render_batch(active_batch, active_key)
+
+st.markdown("---")
+render_fleet_query(selected_batches, files_data, local_mode)
+
+render_profiler_panel(profiler)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils import float32_is_safe
+
+
+# Figures with more points than this (over all traces) are drawn with WebGL
+WEBGL_POINT_THRESHOLD = 10_000
+# float32 is used for y values when the rounding error stays below this share of their range.
+# Looser than utils.FLOAT32_TOLERANCE, which guards decoded data: on screen 1e-5 of the
+# y range is a hundredth of a pixel even on a 1000 pixel tall chart
+PLOT_FLOAT32_TOLERANCE = 1e-5
+
+
+def plot_x(values):
+    """x data as a contiguous numeric array plotly can send as a binary typed array.
+
+    Datetimes become float64 milliseconds since the epoch of their wall-clock
+    time (exact for any realistic date), which a date axis reads directly.
+    Returns (array, is_datetime). Non-numeric data is returned unchanged.
+    """
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        values = values.tz_localize(None) if isinstance(values, pd.Index) else values.dt.tz_localize(None)
+    array = values.to_numpy() if isinstance(values, (pd.Series, pd.Index)) else np.asarray(values)
+
+    if np.issubdtype(array.dtype, np.datetime64):
+        nanoseconds = array.astype("datetime64[ns]").view(np.int64)
+        milliseconds = nanoseconds / 1_000_000
+        milliseconds[nanoseconds == np.iinfo(np.int64).min] = np.nan
+        return milliseconds, True
+    if np.issubdtype(array.dtype, np.number):
+        return np.ascontiguousarray(array), False
+    return values, False
+
+
+def plot_y(values):
+    """y data as a contiguous float32 array, or float64 when float32 would visibly round"""
+    array = values.to_numpy() if isinstance(values, (pd.Series, pd.Index)) else np.asarray(values)
+    if not np.issubdtype(array.dtype, np.number):
+        return values
+    if float32_is_safe(array, tolerance=PLOT_FLOAT32_TOLERANCE):
+        return np.ascontiguousarray(array, dtype=np.float32)
+    return np.ascontiguousarray(array, dtype=np.float64)
+
+
+def scatter_class(total_points):
+    """go.Scattergl for dense figures, SVG go.Scatter otherwise"""
+    return go.Scattergl if total_points > WEBGL_POINT_THRESHOLD else go.Scatter
@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from file_cache import (
+    cache,
+    load_column_stats_from_store,
+    load_null_counts_from_store,
+    load_null_index_from_store,
+    load_parquet_from_store,
+    load_parquet_schema_from_store,
+    load_preview_page_from_store,
+    load_pyramid_from_store,
+    load_time_index_from_store,
+)
+from pyramid import choose_level
+
+
+PREFETCH_WORKERS = 2
+THREAD_PREFIX = "dk258-prefetch"
+# Defaults of the Viewer, so the first view of a file hits the warm entries
+PLOT_COLUMNS = 3
+MAX_POINTS = 2_000
+PREVIEW_PAGE_SIZE = 100
+
+
+class _PrefetchThreadFilter(logging.Filter):
+    """Drops the missing ScriptRunContext warning of the cache calls on prefetch threads"""
+
+    def filter(self, record):
+        return not threading.current_thread().name.startswith(THREAD_PREFIX)
+
+
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(_PrefetchThreadFilter())
+
+
+class PrefetchJob:
+    """Progress of warming the caches of one file"""
+
+    def __init__(self, filename, key):
+        self.filename = filename
+        self.key = key
+        self.step = "queued"
+        self.done = 0
+        self.total = None
+        self.error = None
+        self.finished = False
+        self.seconds = None
+        # Cache keys of the warmed entries, to notice when they are evicted
+        self.cache_keys = []
+
+    @property
+    def fraction(self):
+        if self.finished:
+            return 1.0
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def is_warm(self):
+        return self.finished and self.error is None and all(key in cache for key in self.cache_keys)
+
+
+def _warm_steps(key, filename, schema_info):
+    """(label, loader, args) for every cached loader the Viewer needs on its first run.
+
+    The dtype plan of the plotted columns is warmed with the line graph
+    data. The memory report of every column is only built on request.
+    """
+    numeric_columns = schema_info['numeric_columns']
+    steps = [
+        ("time index", load_time_index_from_store, (key,)),
+        ("pyramid", load_pyramid_from_store, (key,)),
+        ("line graph data", _warm_line_graph, (key, filename, numeric_columns[:PLOT_COLUMNS])),
+        ("null counts", load_null_counts_from_store, (key,)),
+        ("null index", load_null_index_from_store, (key,)),
+        ("preview", load_preview_page_from_store, (key, 0, min(PREVIEW_PAGE_SIZE, schema_info['num_rows']))),
+    ]
+    for column in numeric_columns[:PLOT_COLUMNS]:
+        steps.append((f"statistics {column}", load_column_stats_from_store, (key, column)))
+    return steps
+
+
+def _warm_line_graph(key, filename, columns):
+    """Load the raw rows of the default line graph when the pyramid doesn't cover it"""
+    if not columns:
+        return
+    time_index = load_time_index_from_store(key)
+    level = None
+    if time_index is not None and len(time_index) > 0:
+        level = choose_level(load_pyramid_from_store(key), time_index.start, time_index.end, MAX_POINTS, len(time_index))
+    if level is None:
+        load_parquet_from_store(key, filename, columns=tuple(columns), time_range=None)
+
+
+class Prefetcher:
+    """Warms the shared file caches of selected batches on a bounded thread pool.
+
+    A file is not warmed twice while its job runs or its entries are still
+    cached. Finished jobs are dropped once the cache evicted what they
+    warmed, so such a file is warmed again when it is selected next.
+    """
+
+    def __init__(self, max_workers=PREFETCH_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=THREAD_PREFIX)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, filename, key):
+        """Queue a file unless it is already warm or being warmed, returns its job"""
+        with self._lock:
+            self._jobs = {
+                job_key: job for job_key, job in self._jobs.items()
+                if not job.finished or job.is_warm
+            }
+            job = self._jobs.get(key)
+            if job is not None:
+                return job
+            job = PrefetchJob(filename, key)
+            self._jobs[key] = job
+        self._pool.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        started = time.perf_counter()
+        try:
+            job.step = "schema"
+            schema_info = load_parquet_schema_from_store(job.key, job.filename)
+            if schema_info is None:
+                raise ValueError("not a readable parquet file")
+            steps = _warm_steps(job.key, job.filename, schema_info)
+            job.total = len(steps) + 1
+            job.done = 1
+            job.cache_keys = [load_parquet_schema_from_store.cache_key(job.key, job.filename)]
+            for label, loader, args in steps:
+                job.step = label
+                loader(*args)
+                # Loaders returning None are not cached, there is nothing to keep warm
+                cache_key = loader.cache_key(*args) if hasattr(loader, "cache_key") else None
+                if cache_key in cache:
+                    job.cache_keys.append(cache_key)
+                job.done += 1
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            job.finished = True
+            job.seconds = time.perf_counter() - started
+
+    def jobs(self, keys):
+        """Jobs of the given file keys, in that order (files never submitted are left out)"""
+        with self._lock:
+            return [self._jobs[key] for key in keys if key in self._jobs]
+
+
+_prefetcher = None
+
+
+def get_prefetcher():
+    """Process-wide prefetcher shared by all sessions"""
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = Prefetcher()
+    return _prefetcher
+
+
+def render_prefetch_panel(prefetcher, files):
+    """Sidebar progress of the background decoding of the given (filename, key) pairs.
+
+    While files are still being warmed the panel refreshes itself every
+    second, without rerunning the rest of the page.
+    """
+    keys = [key for _, key in files]
+    if not prefetcher.jobs(keys):
+        return
+    pending = any(not job.finished for job in prefetcher.jobs(keys))
+
+    @st.fragment(run_every=1 if pending else None)
+    def panel():
+        jobs = prefetcher.jobs(keys)
+        st.markdown("**⚡ Preparing selected files:**")
+        for job in jobs:
+            if job.error is not None:
+                st.caption(f"⚠️ {job.filename}: {job.error}")
+            elif job.finished:
+                st.caption(f"✅ {job.filename} ready ({job.seconds:.1f}s)")
+            else:
+                st.progress(job.fraction, text=f"{job.filename}: {job.step}")
+        # Stop polling once everything is warm
+        if pending and all(job.finished for job in jobs):
+            st.rerun()
+
+    with st.sidebar:
+        st.markdown("---")
+        panel()
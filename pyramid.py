@@ -0,0 +1,269 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from utils import open_parquet_file, read_parquet_schema
+
+
+# Bucket widths in nanoseconds, from fine to coarse
+PYRAMID_LEVELS = {
+    "1s": 1_000_000_000,
+    "10s": 10_000_000_000,
+    "1min": 60_000_000_000,
+    "10min": 600_000_000_000,
+    "1h": 3_600_000_000_000,
+}
+# A level is only kept if it has at least this many times fewer rows than the file
+MIN_REDUCTION = 10
+SIDECAR_SUFFIX = ".pyramid"
+
+
+def sidecar_path(parquet_path):
+    """Location of the pyramid sidecar for a parquet file"""
+    return f"{parquet_path}{SIDECAR_SUFFIX}"
+
+
+def _reduce_buckets(keys, counts, sums, mins, maxs):
+    """Merge partial aggregates that share a bucket key (keys may be unsorted)"""
+    if len(keys) and not np.all(keys[1:] > keys[:-1]):
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        counts, sums, mins, maxs = counts[order], sums[order], mins[order], maxs[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+    if len(starts) == len(keys):
+        return keys, counts, sums, mins, maxs
+    return (
+        keys[starts],
+        np.add.reduceat(counts, starts, axis=0),
+        np.add.reduceat(sums, starts, axis=0),
+        np.minimum.reduceat(mins, starts, axis=0),
+        np.maximum.reduceat(maxs, starts, axis=0),
+    )
+
+
+def _aggregate_batch(timestamps, values, width):
+    """Partial count/sum/min/max per bucket for one batch of rows.
+
+    timestamps is an int64 nanosecond array, values a 2D float array with one
+    column per channel. NaN values are not counted.
+    """
+    keys = timestamps // width
+    valid = ~np.isnan(values)
+    return _reduce_buckets(
+        keys,
+        valid.astype(np.int64),
+        np.where(valid, values, 0.0),
+        np.where(valid, values, np.inf),
+        np.where(valid, values, -np.inf),
+    )
+
+
+def _time_span(parquet_file, time_column):
+    """(first, last) nanosecond timestamp of the file, or None if it has no times.
+
+    Taken from the row group statistics of the footer. Row groups without
+    statistics read only their time column.
+    """
+    column_index = parquet_file.schema_arrow.get_field_index(time_column)
+    first, last = None, None
+    for rg in range(parquet_file.metadata.num_row_groups):
+        stats = parquet_file.metadata.row_group(rg).column(column_index).statistics
+        if stats is not None and stats.has_min_max:
+            # The statistics are whole microseconds, which never cross a bucket boundary
+            lo, hi = pd.Timestamp(stats.min).value, pd.Timestamp(stats.max).value + 999
+        else:
+            column = parquet_file.read_row_group(rg, columns=[time_column]).column(time_column)
+            times = pc.min_max(column.cast(pa.timestamp("ns")).cast(pa.int64()))
+            if not times["min"].is_valid:
+                continue
+            lo, hi = times["min"].as_py(), times["max"].as_py()
+        first = lo if first is None else min(first, lo)
+        last = hi if last is None else max(last, hi)
+    return None if first is None else (first, last)
+
+
+def _candidate_levels(parquet_file, time_column, num_rows):
+    """Levels whose bucket count over the time span of the file can reach MIN_REDUCTION"""
+    span = _time_span(parquet_file, time_column)
+    if span is None:
+        return {}
+    first, last = span
+    return {
+        name: width for name, width in PYRAMID_LEVELS.items()
+        if (last // width - first // width + 1) * MIN_REDUCTION <= num_rows
+    }
+
+
+def build_pyramid(source, columns=None):
+    """Compute min/max/mean/count aggregates at every pyramid level.
+
+    Which levels can reach MIN_REDUCTION is decided up front from the time
+    span in the footer, the others are never aggregated. The file is then
+    scanned one row group at a time, so memory stays bounded by the row
+    group size plus the size of the kept aggregates. Returns a dict of
+    level name -> DataFrame indexed by bucket start, with (column, aggregate)
+    MultiIndex columns. Returns an empty dict if the file has no time index.
+    """
+    parquet_file = open_parquet_file(source)
+    schema_info = read_parquet_schema(parquet_file)
+    time_column = schema_info["time_column"]
+    if time_column is None:
+        return {}
+    columns = list(columns) if columns is not None else schema_info["numeric_columns"]
+    num_rows = schema_info["num_rows"]
+    time_zone = parquet_file.schema_arrow.field(time_column).type.tz
+    candidates = _candidate_levels(parquet_file, time_column, num_rows)
+    if not candidates:
+        return {}
+
+    partials = {name: [] for name in candidates}
+    for rg in range(parquet_file.metadata.num_row_groups):
+        table = parquet_file.read_row_group(rg, columns=columns + [time_column])
+        timestamps = table.column(time_column).cast(pa.timestamp("ns")).to_numpy().view(np.int64)
+        values = np.column_stack([
+            table.column(c).to_numpy(zero_copy_only=False).astype(np.float64) for c in columns
+        ]) if columns else np.empty((len(timestamps), 0))
+
+        # Rows without a time can't be placed in a bucket
+        has_time = timestamps != np.iinfo(np.int64).min
+        if not has_time.all():
+            timestamps, values = timestamps[has_time], values[has_time]
+
+        for name, width in candidates.items():
+            partials[name].append(_aggregate_batch(timestamps, values, width))
+
+    levels = {}
+    for name, width in candidates.items():
+        parts = partials.pop(name)
+        if not parts:
+            continue
+        keys, counts, sums, mins, maxs = _reduce_buckets(*(np.concatenate(p) for p in zip(*parts)))
+        if not len(keys) or len(keys) * MIN_REDUCTION > num_rows:
+            continue
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+        mins = np.where(counts > 0, mins, np.nan)
+        maxs = np.where(counts > 0, maxs, np.nan)
+
+        data = {}
+        for j, column in enumerate(columns):
+            data[(column, "min")] = mins[:, j]
+            data[(column, "max")] = maxs[:, j]
+            data[(column, "mean")] = np.where(counts[:, j] > 0, means[:, j], np.nan)
+            data[(column, "count")] = counts[:, j]
+        index = pd.DatetimeIndex(keys * width, name=time_column)
+        if time_zone is not None:
+            index = index.tz_localize("UTC").tz_convert(time_zone)
+        levels[name] = pd.DataFrame(data, index=index, columns=pd.MultiIndex.from_tuples(data.keys()))
+    return levels
+
+
+def write_pyramid(levels, path, source_rows, source_version=None):
+    """Persist all levels in one sidecar parquet, one row group per level.
+
+    source_version identifies the exact source file (e.g. its content hash
+    or mtime and size) and is checked by read_pyramid.
+    """
+    tmp_path = f"{path}.tmp"
+    writer = None
+    try:
+        for name, level in levels.items():
+            flat = level.copy()
+            flat.columns = [f"{column}|{aggregate}" for column, aggregate in level.columns]
+            flat.insert(0, "level", name)
+            table = pa.Table.from_pandas(flat, preserve_index=True)
+            if writer is None:
+                metadata = dict(table.schema.metadata or {})
+                metadata[b"dk258_source_rows"] = str(source_rows).encode()
+                if source_version is not None:
+                    metadata[b"dk258_source_version"] = str(source_version).encode()
+                writer = pq.ParquetWriter(tmp_path, table.schema.with_metadata(metadata))
+            writer.write_table(table.replace_schema_metadata(writer.schema.metadata))
+        if writer is None:
+            return
+        writer.close()
+        writer = None
+        os.replace(tmp_path, path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_pyramid(path, source_rows=None, source_version=None):
+    """Read a sidecar written by write_pyramid, or None if missing or stale.
+
+    A sidecar is stale when it was written for another row count or, if
+    source_version is given, another version of the source file.
+    """
+    if not os.path.isfile(path):
+        return None
+    parquet_file = pq.ParquetFile(path)
+    metadata = parquet_file.schema_arrow.metadata or {}
+    if source_rows is not None and metadata.get(b"dk258_source_rows") != str(source_rows).encode():
+        return None
+    if source_version is not None and metadata.get(b"dk258_source_version") != str(source_version).encode():
+        return None
+
+    flat = parquet_file.read(use_pandas_metadata=True).to_pandas()
+    levels = {}
+    for name in PYRAMID_LEVELS:
+        level = flat[flat["level"] == name].drop(columns="level")
+        if level.empty:
+            continue
+        level.columns = pd.MultiIndex.from_tuples([tuple(c.rsplit("|", 1)) for c in level.columns])
+        levels[name] = level
+    return levels
+
+
+def load_or_build_pyramid(source, path, source_version=None):
+    """Read the sidecar at path, building and writing it first if missing or stale"""
+    parquet_file = open_parquet_file(source)
+    num_rows = parquet_file.metadata.num_rows
+    levels = read_pyramid(path, source_rows=num_rows, source_version=source_version)
+    if levels is None:
+        levels = build_pyramid(parquet_file)
+        if levels:
+            write_pyramid(levels, path, num_rows, source_version=source_version)
+    return levels
+
+
+def choose_level(levels, start, end, budget, window_rows):
+    """Coarsest level with at least budget buckets in [start, end].
+
+    Returns (name, slice of that level) or None when the raw rows should be
+    used, i.e. the window already fits the budget or every level is too
+    coarse for it. Bucket counts come from binary searches, so the cost does
+    not depend on the size of the file.
+    """
+    if not levels or window_rows <= budget:
+        return None
+    for name in reversed(list(PYRAMID_LEVELS)):
+        level = levels.get(name)
+        if level is None:
+            continue
+        lo = level.index.searchsorted(start, side="left")
+        hi = level.index.searchsorted(end, side="right")
+        if hi - lo >= budget:
+            return name, level.iloc[lo:hi]
+    return None
+
+
+def level_trace(level, column, method):
+    """x/y data for one column of a pyramid level.
+
+    Min/Max interleaves the bucket minimum and maximum so spikes stay
+    visible, any other method plots the bucket mean.
+    """
+    aggregates = level[column]
+    if method == "Min/Max":
+        x = np.repeat(level.index.to_numpy(), 2)
+        y = np.column_stack([aggregates["min"].to_numpy(), aggregates["max"].to_numpy()]).ravel()
+        return pd.DatetimeIndex(x), y
+    return level.index, aggregates["mean"].to_numpy()
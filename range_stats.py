@@ -0,0 +1,215 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils import open_parquet_file
+
+
+BLOCK_SIZE = 1024
+QUANTILE_CACHE_SIZE = 32
+
+
+def _sparse_table(values, reduce):
+    """Levels of a sparse table: level k holds reduce over 2**k consecutive values"""
+    table = [values]
+    width = 1
+    while 2 * width <= len(values):
+        previous = table[-1]
+        table.append(reduce(previous[:-width], previous[width:]))
+        width *= 2
+    return table
+
+
+def _sparse_query(table, lo, hi, reduce):
+    """reduce over values[lo:hi] (hi > lo) with two overlapping lookups"""
+    level = int(np.log2(hi - lo))
+    width = 1 << level
+    return reduce(table[level][lo], table[level][hi - width])
+
+
+class ColumnRangeStats:
+    """Count, mean, std, min and max of one numeric column for any row window.
+
+    Rows are split in blocks of block_size. Per block the non-null count,
+    sum and sum of squares are stored as prefix sums, and the block minima and
+    maxima in a sparse table, so a window costs O(1) for the whole blocks plus
+    at most two partial blocks scanned directly. Quantiles need a pass over
+    the window, they are only computed on request and cached per window.
+    Instances are shared between sessions, the quantile cache is locked.
+    """
+
+    def __init__(self, values, block_size=BLOCK_SIZE):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.block_size = block_size
+        n = len(self.values)
+        n_blocks = n // block_size
+        blocks = self.values[:n_blocks * block_size].reshape(n_blocks, block_size)
+        valid = ~np.isnan(blocks)
+
+        # Sums are taken around the column mean to keep the variance stable
+        self.shift = float(np.nanmean(self.values)) if np.any(~np.isnan(self.values)) else 0.0
+        centered = np.where(valid, blocks - self.shift, 0.0)
+        self.prefix_count = np.concatenate([[0], np.cumsum(valid.sum(axis=1))])
+        self.prefix_sum = np.concatenate([[0.0], np.cumsum(centered.sum(axis=1))])
+        self.prefix_sumsq = np.concatenate([[0.0], np.cumsum((centered ** 2).sum(axis=1))])
+
+        self.min_table = _sparse_table(np.where(valid, blocks, np.inf).min(axis=1), np.minimum)
+        self.max_table = _sparse_table(np.where(valid, blocks, -np.inf).max(axis=1), np.maximum)
+        self._quantiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.values)
+
+    def _split(self, lo, hi):
+        """Whole blocks [first, last) inside [lo, hi) and the partial edge rows"""
+        first = -(-lo // self.block_size)
+        last = hi // self.block_size
+        if first >= last:
+            return 0, 0, self.values[lo:hi]
+        edges = np.concatenate([
+            self.values[lo:first * self.block_size],
+            self.values[last * self.block_size:hi],
+        ])
+        return first, last, edges
+
+    def _sums(self, lo, hi):
+        first, last, edges = self._split(lo, hi)
+        edges = edges[~np.isnan(edges)] - self.shift
+        count = int(self.prefix_count[last] - self.prefix_count[first]) + len(edges)
+        total = self.prefix_sum[last] - self.prefix_sum[first] + edges.sum()
+        total_sq = self.prefix_sumsq[last] - self.prefix_sumsq[first] + (edges ** 2).sum()
+        return count, total, total_sq
+
+    def count(self, lo, hi):
+        return self._sums(lo, hi)[0]
+
+    def null_count(self, lo, hi):
+        return (hi - lo) - self.count(lo, hi)
+
+    def mean(self, lo, hi):
+        count, total, _ = self._sums(lo, hi)
+        return self.shift + total / count if count else np.nan
+
+    def std(self, lo, hi):
+        """Sample standard deviation (ddof=1), as in DataFrame.describe"""
+        count, total, total_sq = self._sums(lo, hi)
+        if count < 2:
+            return np.nan
+        variance = (total_sq - total * total / count) / (count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def _extreme(self, lo, hi, table, reduce, empty):
+        first, last, edges = self._split(lo, hi)
+        result = empty
+        if last > first:
+            result = _sparse_query(table, first, last, reduce)
+        edges = edges[~np.isnan(edges)]
+        if len(edges):
+            result = reduce(result, reduce.reduce(edges))
+        return float(result) if np.isfinite(result) else np.nan
+
+    def min(self, lo, hi):
+        return self._extreme(lo, hi, self.min_table, np.minimum, np.inf)
+
+    def max(self, lo, hi):
+        return self._extreme(lo, hi, self.max_table, np.maximum, -np.inf)
+
+    def quantiles(self, lo, hi, qs=(0.25, 0.5, 0.75)):
+        """Exact quantiles of the window, cached for the most recent windows"""
+        key = (lo, hi, tuple(qs))
+        with self._lock:
+            if key in self._quantiles:
+                self._quantiles.move_to_end(key)
+                return self._quantiles[key]
+        window = self.values[lo:hi]
+        window = window[~np.isnan(window)]
+        result = np.quantile(window, qs) if len(window) else np.full(len(qs), np.nan)
+        with self._lock:
+            self._quantiles[key] = result
+            if len(self._quantiles) > QUANTILE_CACHE_SIZE:
+                self._quantiles.popitem(last=False)
+        return result
+
+    def describe(self, lo, hi, quantiles=False):
+        """Rows of DataFrame.describe() for the window [lo, hi).
+
+        Without quantiles only the O(1) rows (count, mean, std, min, max)
+        are computed.
+        """
+        stats = {
+            'count': float(self.count(lo, hi)),
+            'mean': self.mean(lo, hi),
+            'std': self.std(lo, hi),
+            'min': self.min(lo, hi),
+        }
+        if quantiles:
+            stats['25%'], stats['50%'], stats['75%'] = self.quantiles(lo, hi)
+        stats['max'] = self.max(lo, hi)
+        return pd.Series(stats)
+
+
+class NullIndex:
+    """Null counts of every column for any row window.
+
+    Validity is kept as packed bits (one bit per row) with a prefix count per
+    block, so a window costs O(1) plus two partial blocks per column.
+    """
+
+    def __init__(self, validity, block_size=BLOCK_SIZE):
+        # Block boundaries must fall on whole bytes of the packed bits
+        self.block_size = block_size - block_size % 8 or 8
+        self.packed = {}
+        self.prefix_valid = {}
+        for column, valid in validity.items():
+            valid = np.asarray(valid, dtype=bool)
+            n_blocks = len(valid) // self.block_size
+            block_valid = valid[:n_blocks * self.block_size].reshape(n_blocks, self.block_size).sum(axis=1)
+            self.packed[column] = np.packbits(valid)
+            self.prefix_valid[column] = np.concatenate([[0], np.cumsum(block_valid)])
+
+    def _valid_rows(self, packed, lo, hi):
+        """Number of set bits in positions [lo, hi) of a packed bit array"""
+        if hi <= lo:
+            return 0
+        bits = np.unpackbits(packed[lo // 8:-(-hi // 8)])
+        offset = lo - (lo // 8) * 8
+        return int(bits[offset:offset + hi - lo].sum())
+
+    def null_counts(self, lo, hi):
+        counts = {}
+        for column, packed in self.packed.items():
+            prefix = self.prefix_valid[column]
+            first = min(-(-lo // self.block_size), len(prefix) - 1)
+            last = max(min(hi // self.block_size, len(prefix) - 1), first)
+            valid = int(prefix[last] - prefix[first])
+            valid += self._valid_rows(packed, lo, min(hi, first * self.block_size))
+            valid += self._valid_rows(packed, max(lo, last * self.block_size), hi)
+            counts[column] = (hi - lo) - valid
+        return counts
+
+
+def column_stats_from_parquet(source, column, order=None):
+    """Build the range statistics of one column, in time order if order is given"""
+    values = open_parquet_file(source).read(columns=[column]).column(column)
+    values = values.to_numpy().astype(np.float64)
+    if order is not None:
+        values = values[order]
+    return ColumnRangeStats(values)
+
+
+def null_index_from_parquet(source, columns, order=None):
+    """Build the null index of the given columns, reading one column at a time"""
+    parquet_file = open_parquet_file(source)
+    validity = {}
+    for column in columns:
+        values = parquet_file.read(columns=[column]).column(column)
+        valid = values.is_valid().to_numpy(zero_copy_only=False)
+        # Float NaN counts as missing, like DataFrame.isnull()
+        if pa.types.is_floating(values.type):
+            valid &= ~np.isnan(values.to_numpy(zero_copy_only=False))
+        validity[column] = valid[order] if order is not None else valid
+    return NullIndex(validity)
@@ -0,0 +1,214 @@
+"""Render a static HTML report of every parquet file in a folder, in parallel.
+
+Usage:
+    python report.py <parquet_folder> <output_folder> [--workers N] [--columns C ...]
+                     [--max-points N] [--memory-mb MB] [--sidecar-dir DIR]
+
+Every batch gets <name>.html with the Viewer line graph, the plot statistics
+and the column information, built by the same code as the Viewer, and
+index.html links them all. Each worker process keeps its decoded data within
+its own memory budget and drops it after every batch. Aggregate pyramid
+sidecars are written next to the batches, or in --sidecar-dir.
+"""
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from plotly.offline import get_plotlyjs
+
+import file_cache
+from batch_views import build_line_figure, column_info, plot_statistics
+from cache_manager import get_cache_manager
+from file_cache import load_parquet_schema_from_store, load_time_index_from_store
+from local_folder import local_file_key
+from utils import get_parquet_files
+
+
+PLOTLY_JS_NAME = "plotly.min.js"
+# Viewer defaults
+PLOT_COLUMNS = 3
+MAX_POINTS = 2_000
+DECIMATION_METHOD = "LTTB"
+DEFAULT_MEMORY_MB = 1024
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotly_js}"></script>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; font-size: 0.9em; }}
+th, td {{ border: 1px solid #ddd; padding: 4px 8px; text-align: right; }}
+th {{ background: #f4f4f4; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def report_name(parquet_name):
+    return os.path.splitext(parquet_name)[0] + ".html"
+
+
+def _init_worker(memory_mb, sidecar_dir=None):
+    """Give the decoded data cache of a worker process its share of the memory"""
+    get_cache_manager().budget_bytes = int(memory_mb * 1024 * 1024)
+    if sidecar_dir is not None:
+        file_cache.SIDECAR_DIR = sidecar_dir
+
+
+def _x_column(schema_info, time_index):
+    """Default X-axis of the Viewer: the datetime index, else the first datetime or numeric column"""
+    if time_index is not None and len(time_index) > 0:
+        return "index"
+    candidates = schema_info['datetime_columns'] + schema_info['numeric_columns']
+    return candidates[0] if candidates else None
+
+
+def render_report(path, name, columns=None, max_points=MAX_POINTS):
+    """HTML body (without the page around it) and the row count of one batch"""
+    key = local_file_key(path)
+    schema_info = load_parquet_schema_from_store(key, name)
+    if schema_info is None:
+        raise ValueError("not a readable parquet file")
+    time_index = load_time_index_from_store(key)
+    total_rows = schema_info['num_rows']
+
+    numeric_columns = schema_info['numeric_columns']
+    if columns:
+        y_columns = [c for c in columns if c in numeric_columns]
+    else:
+        y_columns = numeric_columns[:PLOT_COLUMNS]
+    x_column = _x_column(schema_info, time_index)
+
+    parts = [f"<h1>{html.escape(name)}</h1>"]
+    if time_index is not None and len(time_index) > 0:
+        parts.append(f"<p>{total_rows:,} rows from {time_index.start} to {time_index.end}</p>")
+    else:
+        parts.append(f"<p>{total_rows:,} rows</p>")
+
+    if y_columns and x_column is not None:
+        fig = build_line_figure(key, name, tuple(y_columns), x_column, None, DECIMATION_METHOD, max_points)
+        parts.append(fig.to_html(full_html=False, include_plotlyjs=False))
+        parts.append("<h2>Plot Statistics</h2>")
+        parts.append(plot_statistics(key, y_columns, 0, total_rows, quantiles=True).to_html(float_format=lambda v: f"{v:,.4g}"))
+    else:
+        parts.append("<p>No numeric columns found for plotting.</p>")
+
+    parts.append(f"<h2>Column Information ({len(schema_info['columns'])} columns)</h2>")
+    parts.append(column_info(key, schema_info, None, 0, total_rows).to_html(index=False))
+    return "\n".join(parts), total_rows
+
+
+def report_one(input_folder, output_folder, name, columns=None, max_points=MAX_POINTS):
+    """Worker: write the report of a single batch and return its summary"""
+    started = time.perf_counter()
+    try:
+        body, rows = render_report(os.path.join(input_folder, name), name, columns=columns, max_points=max_points)
+        page = PAGE_TEMPLATE.format(title=html.escape(name), plotly_js=PLOTLY_JS_NAME, body=body)
+        tmp_path = os.path.join(output_folder, f"{report_name(name)}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(page)
+        os.replace(tmp_path, os.path.join(output_folder, report_name(name)))
+    finally:
+        # Nothing is reused between batches, keep the worker small
+        get_cache_manager().clear()
+    return {"output": report_name(name), "rows": rows, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def write_index(output_folder, results, failed):
+    """index.html with a link to every batch report"""
+    rows = [
+        f"<tr><td style=\"text-align:left\"><a href=\"{html.escape(entry['output'])}\">{html.escape(name)}</a></td>"
+        f"<td>{entry['rows']:,}</td><td>{entry['seconds']:.2f}s</td></tr>"
+        for name, entry in sorted(results.items())
+    ]
+    body = [
+        "<h1>DK258 Batch Report</h1>",
+        f"<p>{len(results)} batches, generated {time.strftime('%Y-%m-%d %H:%M')}</p>",
+        "<table><tr><th>Batch</th><th>Rows</th><th>Render time</th></tr>",
+        *rows,
+        "</table>",
+    ]
+    if failed:
+        body.append(f"<p>Failed: {html.escape(', '.join(sorted(failed)))}</p>")
+    with open(os.path.join(output_folder, "index.html"), "w", encoding="utf-8") as f:
+        f.write(PAGE_TEMPLATE.format(title="DK258 Batch Report", plotly_js=PLOTLY_JS_NAME, body="\n".join(body)))
+
+
+def report_folder(input_folder, output_folder, workers=None, columns=None, max_points=MAX_POINTS,
+                  memory_mb=DEFAULT_MEMORY_MB, sidecar_dir=None):
+    """Write the report of every parquet file in input_folder, returns a summary dict"""
+    os.makedirs(output_folder, exist_ok=True)
+    names = get_parquet_files(input_folder)
+    print(f"{len(names)} batch(es) to report")
+    # plotly.js is shared by all pages instead of being embedded in each
+    with open(os.path.join(output_folder, PLOTLY_JS_NAME), "w", encoding="utf-8") as f:
+        f.write(get_plotlyjs())
+
+    results = {}
+    failed = []
+    started = time.perf_counter()
+    if names:
+        with ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(), initializer=_init_worker, initargs=(memory_mb, sidecar_dir)
+        ) as pool:
+            futures = {
+                pool.submit(report_one, input_folder, output_folder, name, columns, max_points): name
+                for name in names
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    failed.append(name)
+                    print(f"FAILED {name}: {e}")
+                    continue
+                results[name] = entry
+                print(f"reported {name}: {entry['rows']:,} rows in {entry['seconds']:.2f}s")
+
+    write_index(output_folder, results, failed)
+    elapsed = time.perf_counter() - started
+    print(f"Reported {len(results)} batch(es) in {elapsed:.1f}s, index at {os.path.join(output_folder, 'index.html')}")
+    return {
+        "reported": len(results),
+        "failed": failed,
+        "rows": sum(entry["rows"] for entry in results.values()),
+        "seconds": elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a static HTML report of every DK258 parquet batch in a folder.")
+    parser.add_argument("input_folder", help="Folder containing the .parquet files")
+    parser.add_argument("output_folder", help="Folder to write the .html reports to")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    parser.add_argument("--columns", nargs="+", default=None, help="Columns to plot (default: the first three numeric columns)")
+    parser.add_argument("--max-points", type=int, default=MAX_POINTS, help="Max points per trace (default: %(default)s)")
+    parser.add_argument(
+        "--memory-mb", type=float, default=DEFAULT_MEMORY_MB,
+        help="Decoded data budget per worker process in MB (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--sidecar-dir", default=None,
+        help="Folder for the aggregate pyramid sidecars, instead of next to the batches"
+    )
+    args = parser.parse_args(argv)
+
+    summary = report_folder(
+        args.input_folder, args.output_folder, workers=args.workers, columns=args.columns,
+        max_points=args.max_points, memory_mb=args.memory_mb, sidecar_dir=args.sidecar_dir
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from pyramid import PYRAMID_LEVELS
+
+
+# Resample intervals in nanoseconds, None plots the raw rows
+RESAMPLE_INTERVALS = {"Raw": None, **PYRAMID_LEVELS}
+RESAMPLE_AGGREGATIONS = ["mean", "min", "max", "last"]
+
+
+def resample(timestamps, values, width, aggregation):
+    """Aggregate values per time bucket of width nanoseconds.
+
+    timestamps must be sorted int64 nanoseconds without NaT, so every bucket
+    is a contiguous run of rows and each aggregation is a single reduceat
+    over the bucket starts. NaN values are ignored; buckets without any rows
+    are left out and buckets with only NaN values give NaN. Returns
+    (bucket start in nanoseconds, aggregated values).
+    """
+    if aggregation not in RESAMPLE_AGGREGATIONS:
+        raise ValueError(f"unknown aggregation {aggregation!r}")
+    values = np.asarray(values, dtype=np.float64)
+    if not len(timestamps):
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+    keys = timestamps // width
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if aggregation == "mean":
+            result = np.add.reduceat(np.where(valid, values, 0.0), starts) / counts
+        elif aggregation == "min":
+            result = np.minimum.reduceat(np.where(valid, values, np.inf), starts)
+        elif aggregation == "max":
+            result = np.maximum.reduceat(np.where(valid, values, -np.inf), starts)
+        else:
+            # Position of the last valid value of every bucket
+            positions = np.maximum.reduceat(np.where(valid, np.arange(len(values)), -1), starts)
+            result = values[np.maximum(positions, 0)]
+    result = np.where(counts > 0, result, np.nan)
+    return keys[starts] * width, result
+
+
+def resample_column(time_index, values, name, interval, aggregation):
+    """Series of one column aggregated per interval over the whole file.
+
+    values holds the column in time order, aligned with the sorted
+    timestamps of time_index (as kept by ColumnRangeStats). The result is
+    indexed by bucket start in the time zone of the file.
+    """
+    first_valid = time_index.first_valid
+    bucket_starts, result = resample(
+        time_index.values[first_valid:], values[first_valid:], RESAMPLE_INTERVALS[interval], aggregation
+    )
+    index = pd.DatetimeIndex(bucket_starts.astype("datetime64[ns]"))
+    if time_index.tz is not None:
+        index = index.tz_localize("UTC").tz_convert(time_index.tz)
+    return pd.Series(result, index=index, name=name)
+
+
+def resampled_window(series, interval, start, end):
+    """Buckets of a resampled series overlapping the inclusive window [start, end]"""
+    width = RESAMPLE_INTERVALS[interval]
+    bucket_starts = series.index.asi8
+    lo = np.searchsorted(bucket_starts, pd.Timestamp(start).value // width * width, side="left")
+    hi = np.searchsorted(bucket_starts, pd.Timestamp(end).value, side="right")
+    return series.iloc[lo:hi]
@@ -0,0 +1,108 @@
+import threading
+
+import numpy as np
+
+
+ROLLING_STATISTICS = ["mean", "std", "min", "max"]
+ROLLING_OVERLAYS = ["Moving average", "±σ band", "Rolling min/max"]
+ROLLING_WINDOW_DEFAULT = 100
+
+
+def _rolling_sum(values, window):
+    """Sum over every run of window consecutive values, from a cumulative sum"""
+    cumulative = np.concatenate([[0], np.cumsum(values)])
+    return cumulative[window:] - cumulative[:-window]
+
+
+def _sliding_extreme(values, window, reduce, fill):
+    """reduce over every run of window consecutive values in O(n).
+
+    Van Herk/Gil-Werman: the values are cut in blocks of window length with
+    a running reduce from the start and from the end of every block. Any
+    window spans at most two blocks, so it is the suffix of the first
+    combined with the prefix of the second.
+    """
+    n = len(values)
+    n_blocks = -(-n // window)
+    padded = np.full(n_blocks * window, fill)
+    padded[:n] = values
+    blocks = padded.reshape(n_blocks, window)
+    prefix = reduce.accumulate(blocks, axis=1).ravel()
+    suffix = reduce.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return reduce(suffix[:n - window + 1], prefix[window - 1:n])
+
+
+def rolling_statistics(values, lo, hi, window, shift=0.0):
+    """Rolling mean, std (ddof=1), min and max of the rows [lo, hi) of values.
+
+    Every row aggregates itself and the window - 1 rows before it, ignoring
+    NaN values (rows near the start use the rows there are). Only the rows
+    [lo - window + 1, hi) are read. Sums are taken around shift to keep the
+    variance stable.
+    """
+    start = lo - window + 1
+    segment = np.asarray(values[max(start, 0):hi], dtype=np.float64)
+    if start < 0:
+        segment = np.concatenate([np.full(-start, np.nan), segment])
+    valid = ~np.isnan(segment)
+    centered = np.where(valid, segment - shift, 0.0)
+    count = _rolling_sum(valid.astype(np.int64), window)
+    total = _rolling_sum(centered, window)
+    total_sq = _rolling_sum(centered * centered, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count > 0, shift + total / count, np.nan)
+        variance = (total_sq - total * total / count) / (count - 1)
+        std = np.where(count > 1, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+    minimum = _sliding_extreme(np.where(valid, segment, np.inf), window, np.minimum, np.inf)
+    maximum = _sliding_extreme(np.where(valid, segment, -np.inf), window, np.maximum, -np.inf)
+    return {
+        "mean": mean,
+        "std": std,
+        "min": np.where(count > 0, minimum, np.nan),
+        "max": np.where(count > 0, maximum, np.nan),
+    }
+
+
+class RollingStatistics:
+    """Rolling statistics of one column for a fixed window length, kept per row range.
+
+    The results of the rows asked for so far are kept as one contiguous
+    range. When the time window slides, only the newly exposed rows at
+    either edge are computed and joined on; a window that doesn't touch the
+    kept range replaces it.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.lo = self.hi = 0
+        self.shift = None
+        self.results = {name: np.empty(0) for name in ROLLING_STATISTICS}
+        self._lock = threading.Lock()
+
+    def _compute(self, values, lo, hi):
+        return rolling_statistics(values, lo, hi, self.window, shift=self.shift)
+
+    def window_statistics(self, values, lo, hi):
+        """Rolling statistics of the rows [lo, hi) of values (the column in time order)"""
+        with self._lock:
+            if self.shift is None:
+                self.shift = float(np.nanmean(values)) if np.any(~np.isnan(values)) else 0.0
+            if hi <= lo:
+                return {name: np.empty(0) for name in ROLLING_STATISTICS}
+            if self.hi <= self.lo or hi < self.lo or lo > self.hi:
+                self.results = self._compute(values, lo, hi)
+                self.lo, self.hi = lo, hi
+            else:
+                left = self._compute(values, lo, self.lo) if lo < self.lo else None
+                right = self._compute(values, self.hi, hi) if hi > self.hi else None
+                if left is not None or right is not None:
+                    self.results = {
+                        name: np.concatenate([
+                            part[name] for part in (left, self.results, right) if part is not None
+                        ])
+                        for name in ROLLING_STATISTICS
+                    }
+                    self.lo, self.hi = min(lo, self.lo), max(hi, self.hi)
+            offset = lo - self.lo
+            return {name: result[offset:offset + hi - lo] for name, result in self.results.items()}
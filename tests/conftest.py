@@ -0,0 +1,38 @@
+import os
+import sys
+
+# The modules live at the top of the repository, next to Homepage.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+
+def _batch_frame(n=5_000, columns=("T0", "T1", "P0"), start="2024-03-01", freq="s", tz=None, seed=0):
+    """Logger-like channels indexed by time, with a few missing values"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n, freq=freq, tz=tz, name="Time")
+    frame = pd.DataFrame({
+        column: np.cumsum(rng.normal(size=n)) + 10 * i for i, column in enumerate(columns)
+    }, index=index)
+    frame.iloc[rng.integers(0, n, size=n // 100), 0] = np.nan
+    return frame
+
+
+@pytest.fixture
+def batch_frame():
+    return _batch_frame
+
+
+@pytest.fixture
+def write_batch(tmp_path):
+    """Write a frame (default: a batch_frame) as parquet in tmp_path, returns the path"""
+    def write(name="batch.parquet", frame=None, row_group_size=1_000, **kwargs):
+        frame = _batch_frame(**kwargs) if frame is None else frame
+        path = tmp_path / name
+        pq.write_table(pa.Table.from_pandas(frame), path, row_group_size=row_group_size)
+        return str(path)
+    return write
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import numpy as np
+
+from cache_manager import CacheManager, estimate_size
+
+
+def test_least_recently_used_entries_are_evicted_over_budget():
+    cache = CacheManager(budget_bytes=300)
+    for key in "abc":
+        cache.put(key, key, nbytes=100)
+    cache.get("a")
+    cache.put("d", "d", nbytes=100)
+
+    assert "b" not in cache
+    assert all(key in cache for key in "acd")
+    assert cache.used_bytes == 300
+    assert cache.evictions == 1
+
+
+def test_values_over_the_whole_budget_are_not_cached():
+    cache = CacheManager(budget_bytes=1_000)
+    assert cache.get_or_load("big", lambda: np.zeros(1_000)).shape == (1_000,)
+    assert "big" not in cache
+    assert cache.used_bytes == 0
+
+
+def test_concurrent_callers_load_once_and_failed_loads_are_retried():
+    cache = CacheManager(budget_bytes=10 ** 6)
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.05)
+        return np.arange(10)
+
+    threads = [threading.Thread(target=cache.get_or_load, args=("key", load)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (7, 1)
+
+    assert cache.get_or_load("missing", lambda: None) is None
+    assert "missing" not in cache
+
+
+def test_cached_functions_are_keyed_by_their_arguments():
+    cache = CacheManager(budget_bytes=10 ** 6)
+    calls = []
+
+    @cache.cached
+    def load(digest, columns=None):
+        calls.append((digest, columns))
+        return np.zeros(4)
+
+    load("a", columns=["x", "y"])
+    load("a", ["x", "y"])
+    load("b")
+    assert calls == [("a", ["x", "y"]), ("b", None)]
+    assert load.cache_key("a", ("x", "y")) in cache
+
+
+def test_estimate_size_counts_shared_buffers_once():
+    values = np.zeros(1_000)
+    assert estimate_size(values) == 8_000
+    assert 16_000 <= estimate_size({"a": values, "b": np.ones(1_000), "c": values}) < 17_000
@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+
+from catalog import Catalog
+
+
+def test_search_by_name_channel_and_time(write_batch, tmp_path):
+    write_batch("march.parquet", n=1_000, start="2024-03-01")
+    write_batch("april.parquet", n=1_000, start="2024-04-01", columns=("T0", "Flow"), tz="Europe/Amsterdam")
+    (tmp_path / "broken_100%.parquet").write_bytes(b"not parquet")
+    catalog = Catalog(str(tmp_path / "catalog" / "catalog.sqlite"))
+
+    assert catalog.update_folder(str(tmp_path)) == {"indexed": 3, "removed": 0, "hashed": 2}
+
+    everything = catalog.search(str(tmp_path))
+    assert everything["File"].tolist() == ["april.parquet", "broken_100%.parquet", "march.parquet"]
+    assert everything["Hash"].notna().tolist() == [True, False, True]
+    assert everything["Error"].notna().tolist() == [False, True, False]
+    assert catalog.search(str(tmp_path), name="100%")["File"].tolist() == ["broken_100%.parquet"]
+    assert catalog.search(str(tmp_path), name="_")["File"].tolist() == ["broken_100%.parquet"]
+    assert catalog.search(str(tmp_path), channel="flow")["File"].tolist() == ["april.parquet"]
+
+    # Times are compared as wall-clock times, also for time zone aware batches
+    april = catalog.search(str(tmp_path), start="2024-04-01 00:10", end="2024-05-01")
+    assert april["File"].tolist() == ["april.parquet"]
+    assert april["Start"].iloc[0] == pd.Timestamp("2024-04-01")
+    assert april["Rows"].iloc[0] == 1_000
+    assert catalog.channels(str(tmp_path / "april.parquet"))["Column"].tolist() == ["T0", "Flow"]
+
+
+def test_only_changed_files_are_indexed_again(write_batch, tmp_path):
+    path = write_batch("batch.parquet", n=1_000)
+    write_batch("other.parquet", n=1_000)
+    catalog = Catalog(str(tmp_path / "catalog.sqlite"))
+    catalog.update_folder(str(tmp_path))
+    first_hash = catalog.search(str(tmp_path), name="batch")["Hash"].iloc[0]
+
+    assert catalog.update_folder(str(tmp_path)) == {"indexed": 0, "removed": 0, "hashed": 0}
+
+    write_batch("batch.parquet", n=2_000)
+    os.remove(tmp_path / "other.parquet")
+    assert catalog.update_folder(str(tmp_path)) == {"indexed": 1, "removed": 1, "hashed": 1}
+    batch = catalog.search(str(tmp_path))
+    assert batch["File"].tolist() == ["batch.parquet"]
+    assert batch["Rows"].iloc[0] == 2_000
+    assert batch["Hash"].iloc[0] != first_hash
@@ -0,0 +1,57 @@
+import json
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+import convert
+import report
+from pyramid import read_pyramid, sidecar_path
+
+
+def _write_logs(folder, names, n=2_000):
+    os.makedirs(folder)
+    for i, name in enumerate(names):
+        times = pd.date_range("2024-03-01", periods=n, freq="s") + pd.Timedelta(days=i)
+        frame = pd.DataFrame({"Time": times.strftime("%Y-%m-%d %H:%M:%S"), "T0": range(n), "T1": 0.5})
+        frame.to_csv(os.path.join(folder, name), index=False)
+
+
+def test_convert_only_converts_new_or_changed_files(tmp_path):
+    csv_folder, parquet_folder = str(tmp_path / "csv"), str(tmp_path / "parquet")
+    _write_logs(csv_folder, ["a.csv", "b.csv"])
+
+    assert convert.main([csv_folder, parquet_folder, "--workers", "1"]) == 0
+    table = pq.read_table(os.path.join(parquet_folder, "a.parquet"))
+    assert table.num_rows == 2_000
+    with open(os.path.join(parquet_folder, convert.MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    assert sorted(manifest) == ["a.csv", "b.csv"]
+    assert manifest["a.csv"]["output"] == "a.parquet" and manifest["a.csv"]["rows"] == 2_000
+    assert read_pyramid(sidecar_path(os.path.join(parquet_folder, "a.parquet")), source_rows=2_000)
+
+    # Touched without changes, then changed: only the changed file is converted again
+    os.utime(os.path.join(csv_folder, "a.csv"))
+    with open(os.path.join(csv_folder, "b.csv"), "a") as f:
+        f.write("2024-03-03 00:00:00,1,1\n")
+    summary = convert.convert_folder(csv_folder, parquet_folder, workers=1)
+    assert (summary["converted"], summary["skipped"], summary["failed"]) == (1, 1, [])
+    assert pq.read_metadata(os.path.join(parquet_folder, "b.parquet")).num_rows == 2_001
+
+
+def test_report_writes_a_page_per_batch_and_an_index(tmp_path):
+    csv_folder, parquet_folder = str(tmp_path / "csv"), str(tmp_path / "parquet")
+    _write_logs(csv_folder, ["a.csv", "b.csv"])
+    convert.convert_folder(csv_folder, parquet_folder, workers=1)
+    (tmp_path / "parquet" / "broken.parquet").write_bytes(b"not parquet")
+    output = str(tmp_path / "report")
+
+    assert report.main([parquet_folder, output, "--workers", "1", "--columns", "T0"]) == 1
+
+    assert sorted(os.listdir(output)) == ["a.html", "b.html", "index.html", report.PLOTLY_JS_NAME]
+    with open(os.path.join(output, "a.html"), encoding="utf-8") as f:
+        page = f.read()
+    assert "2,000 rows" in page and "Plot Statistics" in page and "50%" in page
+    with open(os.path.join(output, "index.html"), encoding="utf-8") as f:
+        index = f.read()
+    assert 'href="a.html"' in index and 'href="b.html"' in index and "Failed: broken.parquet" in index
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from correlation import CorrelationAccumulator, top_correlated, window_correlation
+
+
+def _channels(n=10_000):
+    rng = np.random.default_rng(0)
+    base = np.cumsum(rng.normal(size=n))
+    frame = pd.DataFrame({
+        "a": 1e5 + base,
+        "b": 2 * base + rng.normal(size=n),
+        "c": -base + 5 * rng.normal(size=n),
+        "d": rng.normal(size=n),
+    })
+    frame.iloc[rng.integers(0, n, size=300), 1] = np.nan
+    frame.iloc[2_000:4_000, 2] = np.nan
+    return frame
+
+
+def test_chunked_accumulation_matches_pandas():
+    frame = _channels()
+    accumulator = CorrelationAccumulator(frame.columns)
+    for start in range(0, len(frame), 1_500):
+        accumulator.update(frame.iloc[start:start + 1_500].to_numpy())
+
+    assert accumulator.rows == len(frame)
+    pd.testing.assert_frame_equal(accumulator.correlation(), frame.corr(), rtol=1e-9)
+    pd.testing.assert_frame_equal(accumulator.covariance(), frame.cov(), rtol=1e-9)
+
+
+def test_window_correlation_and_top_channels(write_batch):
+    frame = _channels()
+    frame.index = pd.date_range("2024-03-01", periods=len(frame), freq="s", name="Time")
+    path = write_batch(frame=frame)
+
+    window = window_correlation(path, frame.columns, rows=(1_000, 6_000)).correlation()
+    pd.testing.assert_frame_equal(window, frame.iloc[1_000:6_000].corr(), rtol=1e-9)
+
+    top = top_correlated(window, "a", k=2)
+    assert top["Channel"].tolist() == ["b", "c"]
+    assert top["Correlation"].iloc[1] < 0
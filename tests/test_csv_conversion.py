@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import utils
+from utils import convert_csv_to_parquet
+
+
+def _write_log(path, times, time_format):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'Time': times.strftime(time_format), 'T0': rng.normal(size=len(times)).round(3)})
+    frame.to_csv(path, index=False)
+    return frame
+
+
+def test_day_first_beyond_the_twelfth(tmp_path):
+    # 40 days at one row per minute. The first block only holds 1 November,
+    # which reads both day first and month first, and the first rows after
+    # the 12th only fit day first
+    times = pd.date_range('2024-11-01', periods=57_600, freq='min')
+    _write_log(tmp_path / 'log.csv', times, '%d/%m/%Y %H:%M:%S')
+
+    result = convert_csv_to_parquet(tmp_path / 'log.csv', tmp_path / 'log.parquet', block_size=32 * 1024)
+
+    assert result['rows'] == len(times)
+    assert result['dropped_rows'] == 0
+    assert result['time_format'] == '%d/%m/%Y %H:%M:%S'
+    converted = pq.read_table(tmp_path / 'log.parquet').to_pandas()
+    assert converted.index.min() == times[0]
+    assert converted.index.max() == times[-1]
+
+
+def test_ambiguous_sample_prefers_the_shortest_span(tmp_path):
+    # 1-3 February reads as 2 days day first, but as 2 January to 2 March month first
+    times = pd.date_range('2024-02-01', periods=2 * 24 * 60 + 1, freq='min')
+    _write_log(tmp_path / 'log.csv', times, '%d-%m-%Y %H:%M')
+
+    result = convert_csv_to_parquet(tmp_path / 'log.csv', tmp_path / 'log.parquet')
+
+    assert result['time_format'] == '%d-%m-%Y %H:%M'
+    assert pq.read_table(tmp_path / 'log.parquet').to_pandas().index.max() == times[-1]
+
+
+def test_unreadable_times_are_dropped_and_counted(tmp_path):
+    times = pd.date_range('2024-03-01', periods=1_000, freq='s')
+    frame = _write_log(tmp_path / 'log.csv', times, '%Y-%m-%d %H:%M:%S')
+    frame.loc[[10, 500], 'Time'] = ['Bad', None]
+    frame.to_csv(tmp_path / 'log.csv', index=False)
+
+    result = convert_csv_to_parquet(tmp_path / 'log.csv', tmp_path / 'log.parquet')
+
+    assert result['rows'] == 998
+    assert result['dropped_rows'] == 2
+
+
+def test_changing_time_format_raises(tmp_path):
+    times = pd.date_range('2024-03-01', periods=20_000, freq='s')
+    frame = _write_log(tmp_path / 'log.csv', times, '%Y-%m-%d %H:%M:%S')
+    frame.loc[15_000:, 'Time'] = times[15_000:].strftime('%H:%M:%S %Y/%m/%d')
+    frame.to_csv(tmp_path / 'log.csv', index=False)
+
+    with pytest.raises(ValueError, match="does not match the time format"):
+        convert_csv_to_parquet(tmp_path / 'log.csv', tmp_path / 'log.parquet', block_size=64 * 1024)
+    assert not (tmp_path / 'log.parquet').exists()
+
+
+def test_blocks_out_of_time_order_are_merged(tmp_path, monkeypatch):
+    # 20 time-sorted pieces in reverse order, merged two runs at a time
+    monkeypatch.setattr(utils, 'MERGE_FAN_IN', 2)
+    times = pd.date_range('2024-03-01', periods=100_000, freq='s')
+    frame = _write_log(tmp_path / 'log.csv', times, '%Y-%m-%d %H:%M:%S')
+    pieces = np.array_split(np.arange(len(frame)), 20)[::-1]
+    frame.iloc[np.concatenate(pieces)].to_csv(tmp_path / 'log.csv', index=False)
+
+    result = convert_csv_to_parquet(
+        tmp_path / 'log.csv', tmp_path / 'log.parquet', block_size=64 * 1024, row_group_size=7_000
+    )
+
+    assert result['rows'] == len(times)
+    converted = pq.read_table(tmp_path / 'log.parquet').to_pandas()
+    assert (converted.index == times).all()
+    np.testing.assert_array_equal(converted['T0'].to_numpy(), frame['T0'].to_numpy())
+    assert result['row_groups'] == pq.ParquetFile(tmp_path / 'log.parquet').metadata.num_row_groups
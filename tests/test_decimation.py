@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from decimation import decimate
+
+
+def _trace(n=10_000, tz=None):
+    index = pd.date_range("2024-03-30", periods=n, freq="s", tz=tz)
+    values = pd.Series(np.sin(np.arange(n) / 50.0) + np.random.default_rng(0).normal(0, 0.1, n), index=index)
+    return index, values
+
+
+def test_lttb_keeps_first_and_last_point():
+    index, values = _trace()
+    positions = decimate(index, values, 500, method="LTTB")
+    assert len(positions) == 500
+    assert positions[0] == 0 and positions[-1] == len(values) - 1
+    assert np.all(np.diff(positions) > 0)
+
+
+def test_lttb_time_zone_aware_index():
+    # Spans the DST change of Europe/Amsterdam on 2024-03-31
+    index, values = _trace(n=200_000, tz="Europe/Amsterdam")
+    positions = decimate(index, values, 1_000, method="LTTB")
+    naive = decimate(index.tz_convert(None), values, 1_000, method="LTTB")
+    np.testing.assert_array_equal(positions, naive)
+    np.testing.assert_array_equal(decimate(index.to_series(), values, 1_000, method="LTTB"), naive)
+
+
+def test_lttb_skips_nan_and_keeps_gaps():
+    index, values = _trace()
+    values = values + 10.0
+    values.iloc[3000:4000] = np.nan
+    values.iloc[[5000, 5003, 7001]] = np.nan
+    positions = decimate(index, values, 500, method="LTTB")
+    kept = values.iloc[positions]
+    # No gap turns into a zero spike, and the long gap still breaks the line
+    assert kept.min() > 8.0
+    assert kept.iloc[1:-1].isna().any()
+    assert not {5000, 5003, 7001} & set(positions.tolist())
+
+
+def test_lttb_clamps_tiny_budgets():
+    index, values = _trace(n=100)
+    assert decimate(index, values, 2, method="LTTB").tolist() == [0, 99]
+    assert decimate(index, values, 1, method="LTTB").tolist() == [0]
+    assert len(decimate(index, values, 0, method="LTTB")) == 0
+
+
+def test_minmax_keeps_spikes():
+    index, values = _trace()
+    values.iloc[1234] = 100.0
+    values.iloc[4321] = -100.0
+    positions = decimate(index, values, 200, method="Min/Max")
+    assert len(positions) <= 200
+    assert {1234, 4321} <= set(positions.tolist())
@@ -0,0 +1,31 @@
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from export import export_window
+
+
+def test_parquet_round_trip_of_a_row_window(write_batch, batch_frame):
+    frame = batch_frame(n=5_000, tz="Europe/Amsterdam")
+    path = write_batch(frame=frame)
+
+    with export_window(path, ["T1", "T0"], rows=(1_234, 4_321)) as exported:
+        restored = pq.read_table(exported).to_pandas()
+    pd.testing.assert_frame_equal(restored, frame.iloc[1_234:4_321][["T1", "T0"]], check_freq=False)
+
+
+def test_csv_export_of_a_time_range(write_batch, batch_frame):
+    frame = batch_frame(n=5_000)
+    path = write_batch(frame=frame)
+    start, end = frame.index[700], frame.index[3_100]
+
+    with export_window(path, ["P0"], time_range=(start, end), file_format="CSV") as exported:
+        restored = pd.read_csv(io.BytesIO(exported.read()), parse_dates=["Time"], index_col="Time")
+    pd.testing.assert_frame_equal(restored, frame.loc[start:end, ["P0"]], check_freq=False)
+
+
+def test_unknown_format(write_batch):
+    with pytest.raises(ValueError):
+        export_window(write_batch(n=10), ["T0"], file_format="XLSX")
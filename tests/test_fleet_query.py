@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from fleet_query import BATCH_COLUMN, fleet_info, query_batches
+
+
+def test_footers_give_the_span_and_skip_other_time_zones(write_batch, tmp_path):
+    sources = {
+        "b1": write_batch("b1.parquet", n=1_000, start="2024-03-01"),
+        "b2": write_batch("b2.parquet", n=1_000, start="2024-03-02", columns=("T0", "X9")),
+        "aware": write_batch("aware.parquet", n=1_000, tz="UTC"),
+    }
+    (tmp_path / "broken.parquet").write_bytes(b"not parquet")
+    sources["broken"] = str(tmp_path / "broken.parquet")
+
+    info = fleet_info(sources)
+    assert info["batches"] == ["b1", "b2"]
+    assert info["skipped"] == ["aware", "broken"]
+    assert info["time_column"] == "Time" and info["time_zone"] is None
+    assert info["numeric_columns"] == ["T0", "T1", "P0", "X9"]
+    assert info["start"] == pd.Timestamp("2024-03-01")
+    assert info["end"] == pd.Timestamp("2024-03-02") + pd.Timedelta(seconds=999)
+
+
+def test_query_across_batches_with_a_time_window(write_batch, batch_frame):
+    frames = {
+        "b1": batch_frame(n=1_000, start="2024-03-01 00:00"),
+        "b2": batch_frame(n=1_000, start="2024-03-01 00:10", columns=("T0", "X9"), seed=1),
+    }
+    sources = {name: write_batch(f"{name}.parquet", frame=frame, row_group_size=100) for name, frame in frames.items()}
+    start, end = pd.Timestamp("2024-03-01 00:12"), pd.Timestamp("2024-03-01 00:14")
+
+    result = query_batches(sources, ["T0", "T1"], time_range=(start, end))
+
+    assert list(result.columns) == [BATCH_COLUMN, "T0", "T1"]
+    for name, frame in frames.items():
+        rows = result[result[BATCH_COLUMN] == name]
+        expected = frame.loc[start:end, "T0"]
+        np.testing.assert_array_equal(rows["T0"].to_numpy(), expected.to_numpy())
+        assert rows.index.min() == expected.index.min() and rows.index.max() == expected.index.max()
+    # A column missing from a batch reads as nulls there
+    assert result.loc[result[BATCH_COLUMN] == "b2", "T1"].isna().all()
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from pyramid import build_pyramid, choose_level, load_or_build_pyramid, read_pyramid, sidecar_path, write_pyramid
+
+
+def test_levels_match_pandas_resample(write_batch, batch_frame):
+    frame = batch_frame(n=20_000, tz="Europe/Amsterdam")
+    levels = build_pyramid(write_batch(frame=frame))
+
+    for name, rule in [("10s", "10s"), ("1min", "1min"), ("10min", "10min")]:
+        resampled = frame["T0"].resample(rule)
+        level = levels[name]["T0"]
+        expected = pd.DataFrame({
+            "min": resampled.min(), "max": resampled.max(), "mean": resampled.mean(), "count": resampled.count()
+        })
+        assert level.index.equals(expected.index)
+        np.testing.assert_allclose(level.to_numpy(dtype=float), expected[level.columns].to_numpy(dtype=float))
+
+
+def test_levels_without_enough_reduction_are_skipped(write_batch):
+    # 1 Hz data: 1s buckets hold one row each, 600 rows fill 60 buckets of 10s
+    assert set(build_pyramid(write_batch(n=20_000))) == {"10s", "1min", "10min", "1h"}
+    assert set(build_pyramid(write_batch(n=600))) == {"10s", "1min", "10min", "1h"}
+    assert set(build_pyramid(write_batch(n=599))) == {"1min", "10min", "1h"}
+    assert build_pyramid(write_batch(n=9)) == {}
+
+
+def test_sidecar_round_trip_and_staleness(write_batch, tmp_path):
+    path = write_batch(n=5_000)
+    levels = build_pyramid(path)
+    sidecar = sidecar_path(path)
+    write_pyramid(levels, sidecar, 5_000, source_version="v1")
+
+    restored = read_pyramid(sidecar, source_rows=5_000, source_version="v1")
+    assert set(restored) == set(levels)
+    for name, level in levels.items():
+        pd.testing.assert_frame_equal(restored[name], level, check_freq=False)
+    assert read_pyramid(sidecar, source_rows=4_999) is None
+    assert read_pyramid(sidecar, source_version="v2") is None
+    assert read_pyramid(str(tmp_path / "missing.pyramid")) is None
+
+    # A stale sidecar is rebuilt and written again
+    assert set(load_or_build_pyramid(path, sidecar, source_version="v2")) == set(levels)
+    assert read_pyramid(sidecar, source_version="v2") is not None
+
+
+def test_choose_level_takes_the_coarsest_level_within_budget(write_batch):
+    levels = build_pyramid(write_batch(n=20_000))
+    start, end = pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-01") + pd.Timedelta(seconds=19_999)
+
+    name, level = choose_level(levels, start, end, budget=300, window_rows=20_000)
+    assert name == "1min" and len(level) == 334
+    assert choose_level(levels, start, end, budget=30_000, window_rows=20_000) is None
+    assert choose_level(levels, start, end, budget=300, window_rows=300) is None
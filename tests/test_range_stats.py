@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from range_stats import ColumnRangeStats, NullIndex
+
+
+def _values(n=20_000):
+    rng = np.random.default_rng(0)
+    values = 1e6 + np.cumsum(rng.normal(size=n))
+    values[rng.integers(0, n, size=500)] = np.nan
+    values[5_000:7_500] = np.nan
+    return values
+
+
+def test_describe_matches_pandas():
+    values = _values()
+    stats = ColumnRangeStats(values, block_size=256)
+    for lo, hi in [(0, len(values)), (3, 259), (100, 130), (4_900, 7_600), (5_100, 7_000), (19_999, 20_000)]:
+        expected = pd.Series(values[lo:hi]).describe()
+        described = stats.describe(lo, hi, quantiles=True)
+        assert list(described.index) == list(expected.index)
+        np.testing.assert_allclose(described.to_numpy(), expected.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+def test_quantiles_are_only_computed_on_request():
+    values = _values()
+    stats = ColumnRangeStats(values)
+    described = stats.describe(10, 15_000)
+    assert list(described.index) == ['count', 'mean', 'std', 'min', 'max']
+    expected = pd.Series(values[10:15_000]).describe()
+    np.testing.assert_allclose(described.to_numpy(), expected[described.index].to_numpy(), rtol=1e-9)
+
+
+def test_null_counts_match_pandas():
+    values = _values()
+    frame = pd.DataFrame({'a': values, 'b': np.roll(values, 3_333)})
+    index = NullIndex({column: frame[column].notna().to_numpy() for column in frame}, block_size=100)
+    assert index.block_size == 96
+    for lo, hi in [(0, len(frame)), (1, 97), (95, 193), (5_001, 12_345), (7, 7)]:
+        assert index.null_counts(lo, hi) == frame.iloc[lo:hi].isnull().sum().to_dict()
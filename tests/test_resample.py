@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from resample import RESAMPLE_AGGREGATIONS, resample
+
+
+@pytest.mark.parametrize("aggregation", RESAMPLE_AGGREGATIONS)
+def test_resample_matches_pandas(batch_frame, aggregation):
+    series = batch_frame(n=10_000, freq="700ms")["T0"]
+    # Drop a stretch so some buckets have no rows at all, and make one bucket all NaN
+    series = series.drop(series.index[3_000:4_000])
+    series.iloc[100:200] = np.nan
+
+    bucket_starts, result = resample(series.index.as_unit("ns").asi8, series.to_numpy(), 60_000_000_000, aggregation)
+
+    resampled = series.resample("1min")
+    # pandas also ignores NaN (last is the last valid value) but keeps the buckets without rows
+    expected = getattr(resampled, aggregation)()[resampled.size() > 0]
+    np.testing.assert_array_equal(bucket_starts, expected.index.as_unit("ns").asi8)
+    np.testing.assert_allclose(result, expected.to_numpy(), equal_nan=True)
+
+
+def test_unknown_aggregation():
+    with pytest.raises(ValueError):
+        resample(np.arange(3), np.arange(3.0), 2, "median")
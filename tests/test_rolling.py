@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from rolling import ROLLING_STATISTICS, RollingStatistics, rolling_statistics
+
+
+def _values(n=5_000):
+    rng = np.random.default_rng(0)
+    values = 500.0 + np.cumsum(rng.normal(size=n))
+    values[rng.integers(0, n, size=200)] = np.nan
+    values[1_000:1_100] = np.nan
+    return values
+
+
+def _expected(values, window, lo, hi):
+    rolling = pd.Series(values).rolling(window, min_periods=1)
+    expected = {
+        "mean": rolling.mean(), "std": rolling.std(), "min": rolling.min(), "max": rolling.max()
+    }
+    return {name: series.to_numpy()[lo:hi] for name, series in expected.items()}
+
+
+def test_rolling_statistics_match_pandas():
+    values = _values()
+    for window, lo, hi in [(1, 0, 100), (7, 0, 5_000), (50, 990, 1_200), (333, 4_000, 4_321)]:
+        result = rolling_statistics(values, lo, hi, window, shift=500.0)
+        expected = _expected(values, window, lo, hi)
+        for name in ROLLING_STATISTICS:
+            np.testing.assert_allclose(result[name], expected[name], rtol=1e-6, equal_nan=True)
+
+
+def test_sliding_windows_reuse_the_kept_rows():
+    values = _values()
+    rolling = RollingStatistics(window=64)
+    for lo, hi in [(2_000, 2_500), (1_800, 2_300), (2_200, 2_900), (100, 400), (0, 5_000), (10, 20)]:
+        result = rolling.window_statistics(values, lo, hi)
+        expected = _expected(values, 64, lo, hi)
+        for name in ROLLING_STATISTICS:
+            np.testing.assert_allclose(result[name], expected[name], rtol=1e-6, equal_nan=True)
+    assert (rolling.lo, rolling.hi) == (0, 5_000)
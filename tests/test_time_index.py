@@ -0,0 +1,25 @@
+import datetime
+
+import pandas as pd
+
+from time_index import TimeIndex
+
+
+def _time_index(start, hours=6):
+    index = pd.date_range(start, periods=hours * 60, freq="min", tz="Europe/Amsterdam").as_unit("ns")
+    return TimeIndex(index.asi8, tz="Europe/Amsterdam")
+
+
+def test_slider_value_in_dst_gap_moves_forward():
+    time_index = _time_index("2024-03-31")
+    start = time_index.from_slider_value(datetime.datetime(2024, 3, 31, 2, 30))
+    end = time_index.from_slider_value(datetime.datetime(2024, 3, 31, 3, 10), earliest=False)
+    assert start == pd.Timestamp("2024-03-31 03:00", tz="Europe/Amsterdam")
+    assert time_index.count(start, end) == 11
+
+
+def test_repeated_hour_spans_both_occurrences():
+    time_index = _time_index("2024-10-27")
+    start = time_index.from_slider_value(datetime.datetime(2024, 10, 27, 2, 0))
+    end = time_index.from_slider_value(datetime.datetime(2024, 10, 27, 2, 59), earliest=False)
+    assert time_index.count(start, end) == 120
@@ -0,0 +1,50 @@
+import io
+import os
+import time
+
+from upload_store import UploadStore
+
+
+def _age(store, digest, hours):
+    past = time.time() - hours * 3600
+    os.utime(store.path(digest), (past, past))
+
+
+def test_identical_uploads_are_stored_once(tmp_path):
+    store = UploadStore(root=str(tmp_path), budget_bytes=None, ttl_hours=None)
+    digest = store.put(b"parquet bytes")
+    assert store.put(io.BytesIO(b"parquet bytes")) == digest
+    assert store.usage() == (len(b"parquet bytes"), 1)
+    with store.open(digest) as source:
+        assert source.read() == b"parquet bytes"
+
+
+def test_unused_uploads_expire(tmp_path):
+    store = UploadStore(root=str(tmp_path), budget_bytes=None, ttl_hours=24)
+    old, recent = store.put(b"old"), store.put(b"recent")
+    _age(store, old, 25)
+
+    assert store.evict() == [old]
+    assert not store.contains(old) and store.contains(recent)
+    assert store.size(old) == 0
+
+
+def test_least_recently_used_uploads_go_over_budget(tmp_path):
+    store = UploadStore(root=str(tmp_path), budget_bytes=250, ttl_hours=None)
+    first, second = store.put(b"1" * 100), store.put(b"2" * 100)
+    _age(store, second, 2)
+    _age(store, first, 1)
+    # Sidecars count towards the budget and are removed with their file
+    with open(f"{store.path(second)}.pyramid", "wb") as f:
+        f.write(b"s" * 10)
+
+    third = store.put(b"3" * 100)
+    assert not store.contains(second)
+    assert not os.path.exists(f"{store.path(second)}.pyramid")
+    assert store.contains(first) and store.contains(third)
+
+
+def test_the_file_just_stored_is_kept_over_budget(tmp_path):
+    store = UploadStore(root=str(tmp_path), budget_bytes=10, ttl_hours=None)
+    digest = store.put(b"x" * 100)
+    assert store.contains(digest)
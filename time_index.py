@@ -0,0 +1,102 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils import open_parquet_file, read_parquet_schema
+
+
+NAT = np.iinfo(np.int64).min
+
+
+class TimeIndex:
+    """Sorted int64 (nanosecond) timestamps of a file with binary-search lookups.
+
+    Resolving a time window costs two binary searches. When the file itself
+    is stored in time order, the window is also a contiguous range of row
+    positions, so it can be loaded as a zero-copy slice of the row groups.
+    """
+
+    def __init__(self, values, tz=None):
+        values = np.asarray(values, dtype=np.int64)
+        self.tz = tz
+        self.is_sorted = bool(np.all(values[1:] >= values[:-1]))
+        # Row positions in time order, only needed when the file isn't sorted
+        self.order = None if self.is_sorted else np.argsort(values, kind="stable")
+        self.values = values if self.is_sorted else values[self.order]
+        # NaT sorts first, the valid timestamps start after it
+        self.first_valid = int(np.searchsorted(self.values, NAT, side="right"))
+
+    @classmethod
+    def from_parquet(cls, source):
+        """Read only the time column of a parquet file, or None if it has none"""
+        parquet_file = open_parquet_file(source)
+        time_column = read_parquet_schema(parquet_file)["time_column"]
+        if time_column is None:
+            return None
+        column = parquet_file.read(columns=[time_column]).column(time_column)
+        tz = column.type.tz
+        values = column.cast(pa.timestamp("ns", tz=tz)).to_numpy().view(np.int64)
+        return cls(values, tz=tz)
+
+    def __len__(self):
+        return len(self.values) - self.first_valid
+
+    @property
+    def start(self):
+        return self.to_timestamp(self.values[self.first_valid])
+
+    @property
+    def end(self):
+        return self.to_timestamp(self.values[-1])
+
+    def to_timestamp(self, value):
+        return pd.Timestamp(int(value), tz="UTC").tz_convert(self.tz) if self.tz else pd.Timestamp(int(value))
+
+    def localize(self, timestamp, earliest=True):
+        """Timestamp in the time zone of the file for a naive wall-clock time.
+
+        Times skipped by a DST change move forward to the end of the gap,
+        times that occur twice take the first occurrence (or the second when
+        earliest is False, for the end of a window).
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if not self.tz or timestamp.tzinfo is not None:
+            return timestamp
+        return timestamp.tz_localize(self.tz, ambiguous=earliest, nonexistent="shift_forward")
+
+    def to_int(self, timestamp, earliest=True):
+        """Nanoseconds since the epoch for a Timestamp or datetime"""
+        return self.localize(timestamp, earliest=earliest).value
+
+    def window_positions(self, start, end):
+        """(lo, hi) positions of the inclusive window [start, end] in the sorted timestamps"""
+        lo = np.searchsorted(self.values, self.to_int(start), side="left")
+        hi = np.searchsorted(self.values, self.to_int(end, earliest=False), side="right")
+        return max(int(lo), self.first_valid), max(int(hi), self.first_valid)
+
+    def timestamps(self, positions):
+        """DatetimeIndex of the sorted timestamps at the given positions"""
+        index = pd.DatetimeIndex(self.values[positions].astype("datetime64[ns]"))
+        return index.tz_localize("UTC").tz_convert(self.tz) if self.tz else index
+
+    def count(self, start, end):
+        lo, hi = self.window_positions(start, end)
+        return hi - lo
+
+    def slider_step(self, steps=1000):
+        """Slider step giving roughly `steps` positions over the full range, at least one second"""
+        span = (self.end - self.start).total_seconds()
+        return datetime.timedelta(seconds=max(1, int(span // steps)))
+
+    def to_slider_value(self, timestamp):
+        """Naive wall-clock datetime, as used by st.slider"""
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_localize(None)
+        return timestamp.to_pydatetime()
+
+    def from_slider_value(self, value, earliest=True):
+        """Timestamp in the time zone of the file for a slider value, see localize"""
+        return self.localize(value, earliest=earliest)
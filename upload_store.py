@@ -0,0 +1,158 @@
+import hashlib
+import os
+import tempfile
+import time
+
+import pyarrow as pa
+
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "DK258_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "dk258_uploads")
+)
+CHUNK_SIZE = 8 * 1024 * 1024
+# Disk budget of the store, and how long a file is kept after its last use
+DEFAULT_BUDGET = int(float(os.environ.get("DK258_UPLOAD_BUDGET_MB", 4096)) * 1024 * 1024)
+DEFAULT_TTL_HOURS = float(os.environ.get("DK258_UPLOAD_TTL_HOURS", 24))
+
+
+class UploadStore:
+    """Content-addressed store for uploaded files on local disk.
+
+    Files are written once under their content hash, so identical uploads
+    from different sessions share a single copy. Reads go through memory
+    maps instead of Python bytes objects. Files (and their sidecars) not
+    opened for ttl_hours are removed, and the least recently opened ones
+    once the store outgrows its budget. Either limit is off when None.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, budget_bytes=DEFAULT_BUDGET, ttl_hours=DEFAULT_TTL_HOURS):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self.ttl_hours = ttl_hours
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, digest):
+        """Location of the file with the given content hash"""
+        return os.path.join(self.root, digest[:2], digest)
+
+    def contains(self, digest):
+        return os.path.isfile(self.path(digest))
+
+    def size(self, digest):
+        """Size of the stored file in bytes, 0 if it was removed meanwhile"""
+        try:
+            return os.path.getsize(self.path(digest))
+        except FileNotFoundError:
+            return 0
+
+    def put(self, data):
+        """Store bytes or a binary file object and return its content hash"""
+        hasher = hashlib.blake2b(digest_size=20)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    hasher.update(data)
+                    tmp_file.write(data)
+                else:
+                    data.seek(0)
+                    for chunk in iter(lambda: data.read(CHUNK_SIZE), b""):
+                        hasher.update(chunk)
+                        tmp_file.write(chunk)
+            digest = hasher.hexdigest()
+
+            # Identical content is already stored, keep the existing copy
+            if self.contains(digest):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(self.path(digest)), exist_ok=True)
+                os.replace(tmp_path, self.path(digest))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._touch(digest)
+        self.evict(keep=digest)
+        return digest
+
+    def _touch(self, digest):
+        """Mark a stored file as recently used (its mtime orders the eviction)"""
+        try:
+            os.utime(self.path(digest))
+        except OSError:
+            pass
+
+    def open(self, digest):
+        """Zero-copy, read-only memory map of the stored file"""
+        self._touch(digest)
+        return pa.memory_map(self.path(digest), "r")
+
+    def remove(self, digest):
+        """Remove a stored file and its sidecars, returns False if a file is still in use"""
+        folder = os.path.dirname(self.path(digest))
+        if not os.path.isdir(folder):
+            return True
+        removed = True
+        for name in os.listdir(folder):
+            if name == digest or name.startswith(f"{digest}."):
+                try:
+                    os.remove(os.path.join(folder, name))
+                except OSError:
+                    # Windows can't remove a file that is memory mapped
+                    removed = False
+        return removed
+
+    def _entries(self):
+        """(last use, bytes including sidecars, digest) of every stored file"""
+        entries = {}
+        for folder in os.scandir(self.root):
+            if not folder.is_dir() or len(folder.name) != 2:
+                continue
+            for entry in os.scandir(folder.path):
+                digest = entry.name.split(".", 1)[0]
+                stat = entry.stat()
+                used, nbytes = entries.get(digest, (0, 0))
+                if entry.name == digest:
+                    used = stat.st_mtime_ns
+                entries[digest] = (used, nbytes + stat.st_size)
+        return [(used, nbytes, digest) for digest, (used, nbytes) in entries.items()]
+
+    def usage(self):
+        """(bytes on disk including sidecars, number of stored files)"""
+        entries = self._entries()
+        return sum(nbytes for _, nbytes, _ in entries), len(entries)
+
+    def evict(self, keep=None):
+        """Remove expired files, then the least recently used ones until the store fits its budget.
+
+        keep (the file just stored) is never removed. Returns the hashes of
+        the removed files.
+        """
+        if self.budget_bytes is None and self.ttl_hours is None:
+            return []
+        entries = sorted(self._entries())
+        total = sum(nbytes for _, nbytes, _ in entries)
+        expired = time.time_ns() - int(self.ttl_hours * 3600e9) if self.ttl_hours is not None else None
+        removed = []
+        for used, nbytes, digest in entries:
+            over_budget = self.budget_bytes is not None and total > self.budget_bytes
+            if not over_budget and (expired is None or used >= expired):
+                break
+            if digest == keep or not self.remove(digest):
+                continue
+            total -= nbytes
+            removed.append(digest)
+        return removed
+
+
+_store = None
+
+
+def get_upload_store():
+    """Process-wide store shared by all sessions"""
+    global _store
+    if _store is None:
+        _store = UploadStore()
+        # Clean up what expired while the app was not running
+        _store.evict()
+    return _store
@@ -1,5 +1,24 @@
 import os
+import warnings
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from pandas.tseries.api import guess_datetime_format
+
+from local_folder import get_directory_index
+
+
+CSV_BLOCK_SIZE = 16 * 1024 * 1024
+PARQUET_ROW_GROUP_SIZE = 250_000
+# float32 is only used when its rounding error stays below this share of the column range
+FLOAT32_TOLERANCE = 1e-6
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+# Sorted runs merged at once when a converted CSV is not in time order
+MERGE_FAN_IN = 16
 
 
 # Functie voor het laden van de .csv files waarin alle data zich bevindt
@@ -7,8 +26,297 @@ def load_csv_file(file_path):
     return pd.read_csv(file_path)
 
 # Functie voor het laden van de .parquet files waarin alle data zich bevindt
-def load_parquet_file(file_path):
-    return pd.read_parquet(file_path)
+def load_parquet_file(file_path, columns=None, time_range=None):
+    """Load a parquet file, optionally only some columns and only a time range"""
+    return load_parquet_columns(file_path, columns=columns, time_range=time_range)
+
+
+# Functie voor het openen van een parquet bron (pad, bytes of file-object)
+def open_parquet_file(source):
+    """Open a parquet source without decoding any data"""
+    if isinstance(source, pq.ParquetFile):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = pa.BufferReader(source)
+    return pq.ParquetFile(source)
+
+
+# Functie voor het uitlezen van het schema uit de parquet footer
+def read_parquet_schema(source):
+    """Read column names, types and row counts from the parquet footer only"""
+    parquet_file = open_parquet_file(source)
+    schema = parquet_file.schema_arrow
+    pandas_metadata = schema.pandas_metadata or {}
+
+    # Index columns stored as real columns (a RangeIndex is only metadata)
+    index_columns = [c for c in pandas_metadata.get('index_columns', []) if isinstance(c, str)]
+    columns = [name for name in schema.names if name not in index_columns]
+
+    time_column = None
+    for name in index_columns:
+        if pa.types.is_timestamp(schema.field(name).type):
+            time_column = name
+            break
+
+    return {
+        'num_rows': parquet_file.metadata.num_rows,
+        'num_row_groups': parquet_file.metadata.num_row_groups,
+        'columns': columns,
+        'index_columns': index_columns,
+        'time_column': time_column,
+        'dtypes': {name: str(schema.field(name).type) for name in columns},
+        'numeric_columns': [
+            name for name in columns
+            if pa.types.is_integer(schema.field(name).type) or pa.types.is_floating(schema.field(name).type)
+        ],
+        'datetime_columns': [name for name in columns if pa.types.is_timestamp(schema.field(name).type)],
+    }
+
+
+# Functie voor het bepalen welke row groups binnen een tijdsbereik vallen
+def get_row_groups_in_range(parquet_file, time_column, time_range):
+    """Indices of the row groups whose min/max statistics overlap time_range"""
+    metadata = parquet_file.metadata
+    all_row_groups = list(range(metadata.num_row_groups))
+    if time_column is None or time_range is None:
+        return all_row_groups
+
+    start, end = pd.Timestamp(time_range[0]), pd.Timestamp(time_range[1])
+    column_index = parquet_file.schema_arrow.get_field_index(time_column)
+    row_groups = []
+    for rg in all_row_groups:
+        stats = metadata.row_group(rg).column(column_index).statistics
+        if stats is None or not stats.has_min_max:
+            row_groups.append(rg)
+            continue
+        try:
+            if pd.Timestamp(stats.max) < start or pd.Timestamp(stats.min) > end:
+                continue
+        except TypeError:
+            # Timezone mismatch between statistics and range, keep the group
+            pass
+        row_groups.append(rg)
+    return row_groups
+
+
+# Functie voor het tellen van lege waarden uit de parquet footer
+def read_parquet_null_counts(source, time_range=None):
+    """Row count and null count per column of the row groups overlapping time_range, from footer statistics only"""
+    parquet_file = open_parquet_file(source)
+    schema_info = read_parquet_schema(parquet_file)
+    metadata = parquet_file.metadata
+    row_groups = get_row_groups_in_range(parquet_file, schema_info['time_column'], time_range)
+
+    num_rows = sum(metadata.row_group(rg).num_rows for rg in row_groups)
+    null_counts = {}
+    for name in schema_info['columns']:
+        column_index = parquet_file.schema_arrow.get_field_index(name)
+        total = 0
+        for rg in row_groups:
+            stats = metadata.row_group(rg).column(column_index).statistics
+            if stats is None or not stats.has_null_count:
+                total = None
+                break
+            total += stats.null_count
+        null_counts[name] = total
+    return num_rows, null_counts
+
+
+# Functie voor het bepalen van de eerste rij van iedere row group
+def _row_group_offsets(parquet_file):
+    """Row position where every row group starts, plus the total row count"""
+    metadata = parquet_file.metadata
+    sizes = [metadata.row_group(rg).num_rows for rg in range(metadata.num_row_groups)]
+    return np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)])
+
+
+# Functie voor het lezen van een reeks rijen als Arrow tabel
+def read_parquet_rows(source, start, stop, columns=None):
+    """Rows [start, stop) of the given columns as an Arrow table, decoding only the row groups that hold them"""
+    parquet_file = open_parquet_file(source)
+    offsets = _row_group_offsets(parquet_file)
+    row_groups = [
+        rg for rg in range(len(offsets) - 1)
+        if offsets[rg] < stop and offsets[rg + 1] > start
+    ]
+    table = parquet_file.read_row_groups(
+        row_groups,
+        columns=list(columns) if columns is not None else None,
+        use_pandas_metadata=True,
+    )
+    # Zero-copy slice of the decoded row groups
+    first_offset = int(offsets[row_groups[0]]) if row_groups else 0
+    return table.slice(max(start - first_offset, 0), max(stop - start, 0))
+
+
+# Functie voor het lezen van losse rijen (in willekeurige volgorde) als Arrow tabel
+def read_parquet_take(source, rows, columns=None):
+    """The given row positions, in the given order, as an Arrow table"""
+    parquet_file = open_parquet_file(source)
+    offsets = _row_group_offsets(parquet_file)
+    rows = np.asarray(rows, dtype=np.int64)
+    row_groups = np.unique(np.searchsorted(offsets, rows, side='right') - 1)
+    table = parquet_file.read_row_groups(
+        row_groups.tolist(),
+        columns=list(columns) if columns is not None else None,
+        use_pandas_metadata=True,
+    )
+    # Map file positions to positions in the concatenated row groups
+    sizes = offsets[row_groups + 1] - offsets[row_groups]
+    local_offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    group_of_row = np.searchsorted(row_groups, np.searchsorted(offsets, rows, side='right') - 1)
+    positions = rows - offsets[row_groups][group_of_row] + local_offsets[group_of_row]
+    return table.take(pa.array(positions))
+
+
+# Functie voor het laden van een reeks rijen (op positie) uit een parquet file
+def load_parquet_rows(source, start, stop, columns=None, dtypes=None):
+    """Load rows [start, stop) of the given columns, decoding only the row groups that hold them"""
+    return apply_dtypes(read_parquet_rows(source, start, stop, columns=columns).to_pandas(), dtypes)
+
+
+# Functie voor het laden van alleen de benodigde kolommen en row groups
+def load_parquet_columns(source, columns=None, time_range=None, dtypes=None):
+    """Load only the given columns (plus the index) from the row groups overlapping time_range.
+
+    dtypes (e.g. from plan_compaction) narrows the loaded columns.
+    """
+    parquet_file = open_parquet_file(source)
+    time_column = read_parquet_schema(parquet_file)['time_column']
+    row_groups = get_row_groups_in_range(parquet_file, time_column, time_range)
+
+    table = parquet_file.read_row_groups(
+        row_groups,
+        columns=list(columns) if columns is not None else None,
+        use_pandas_metadata=True,
+    )
+    dataframe = table.to_pandas()
+
+    # Row groups are coarse, trim to the exact range
+    if time_range is not None and isinstance(dataframe.index, pd.DatetimeIndex):
+        start, end = time_range
+        if dataframe.index.is_monotonic_increasing:
+            dataframe = dataframe.loc[start:end]
+        else:
+            dataframe = dataframe[(dataframe.index >= start) & (dataframe.index <= end)]
+    return apply_dtypes(dataframe, dtypes)
+
+
+# Functie voor het bepalen of float32 een kolom nauwkeurig genoeg bewaart
+def float32_is_safe(values, tolerance=FLOAT32_TOLERANCE):
+    """True if float32 keeps every value of the column intact.
+
+    Values with at most six decimals (as logged) must round back to the same
+    decimals. Other values may move by at most tolerance times their range.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return True
+    if np.abs(values).max() > np.finfo(np.float32).max:
+        return False
+    error = np.abs(values.astype(np.float32) - values).max()
+    if error == 0:
+        return True
+    for decimals in range(7):
+        if np.isclose(np.round(values, decimals), values, rtol=1e-12, atol=0).all():
+            return bool(error < 0.5 * 10.0 ** -decimals)
+    return bool(error <= tolerance * (values.max() - values.min()))
+
+
+# Functie voor het kiezen van het kleinste integer type voor een waardebereik
+def _smallest_integer_dtype(minimum, maximum):
+    candidates = (np.uint8, np.uint16, np.uint32, np.uint64) if minimum >= 0 else (np.int8, np.int16, np.int32, np.int64)
+    for dtype in candidates:
+        if np.iinfo(dtype).min <= minimum and maximum <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+# Functie voor het bepalen van het kleinste veilige datatype van een kolom
+def narrowest_dtype(series):
+    """Narrowest dtype that holds every value of the series without changing it.
+
+    Whole-number floats without gaps become integers, other floats become
+    float32 when that rounds by at most FLOAT32_TOLERANCE of the column
+    range, integers are downcast to the smallest type holding their range,
+    True/False text becomes bool and repetitive text a categorical. Returns
+    the current dtype when nothing narrower is safe.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return dtype
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+        if not len(series):
+            return dtype
+        return _smallest_integer_dtype(int(series.min()), int(series.max()))
+    if pd.api.types.is_float_dtype(dtype) and isinstance(dtype, np.dtype):
+        values = series.to_numpy(dtype=np.float64)
+        if len(values) and not np.isnan(values).any() and np.all(np.isfinite(values)) \
+                and np.array_equal(values, np.round(values)):
+            return _smallest_integer_dtype(int(values.min()), int(values.max()))
+        return np.dtype(np.float32) if float32_is_safe(values) else dtype
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        non_null = series.dropna()
+        if not len(non_null):
+            return dtype
+        if len(non_null) == len(series) and non_null.map(type).eq(bool).all():
+            return np.dtype(bool)
+        if non_null.nunique() <= CATEGORY_MAX_RATIO * len(series):
+            return pd.CategoricalDtype()
+    return dtype
+
+
+# Functie voor het omzetten van kolommen naar de gekozen datatypes
+def apply_dtypes(dataframe, dtypes):
+    """Cast the columns of dataframe that appear in dtypes, leaving the others as they are"""
+    if not dtypes:
+        return dataframe
+    changes = {
+        column: dtype for column, dtype in dtypes.items()
+        if column in dataframe.columns and dataframe[column].dtype != dtype
+    }
+    return dataframe.astype(changes) if changes else dataframe
+
+
+# Functie voor het verkleinen van het geheugengebruik van een dataframe
+def compact_dataframe(dataframe):
+    """Cast every column to its narrowest safe dtype"""
+    return apply_dtypes(dataframe, {column: narrowest_dtype(dataframe[column]) for column in dataframe.columns})
+
+
+# Functie voor het plannen van de kleinste datatypes van een parquet file
+def plan_compaction(source, columns=None):
+    """Narrowest safe dtype per column of a parquet file, plus a memory report.
+
+    columns limits the plan to those columns, by default every column and
+    the index are planned. Columns are decoded one at a time, so memory
+    stays bounded by the largest column. The report has one row per column
+    (and the index) with the dtype and in-memory bytes as loaded by pandas
+    and after compaction.
+    """
+    parquet_file = open_parquet_file(source)
+    schema_info = read_parquet_schema(parquet_file)
+    dtypes = {}
+    rows = []
+    if columns is None:
+        for column in schema_info['index_columns']:
+            index = parquet_file.read(columns=[column]).column(column).to_pandas()
+            nbytes = int(index.memory_usage(index=False, deep=True))
+            rows.append((f"{column} (index)", str(index.dtype), str(index.dtype), nbytes, nbytes))
+        columns = schema_info['columns']
+    for column in columns:
+        if column not in schema_info['columns']:
+            continue
+        series = parquet_file.read(columns=[column]).column(column).to_pandas()
+        dtype = narrowest_dtype(series)
+        before = int(series.memory_usage(index=False, deep=True))
+        after = int(series.astype(dtype).memory_usage(index=False, deep=True)) if dtype != series.dtype else before
+        if dtype != series.dtype:
+            dtypes[column] = dtype
+        rows.append((column, str(series.dtype), str(dtype), before, after))
+    report = pd.DataFrame(rows, columns=['Column', 'Loaded as', 'Compacted to', 'Bytes before', 'Bytes after'])
+    return dtypes, report
 
 
 # Functie voor het opschonen van .csv data
@@ -19,34 +327,301 @@ def clean_date(dataframe):
     for column in columns_to_convert:
         dataframe[column] = pd.to_numeric(dataframe[column], errors = 'coerce')
         dataframe[column] = dataframe[column].ffill()
-        dataframe[column] = dataframe[column].astype('float16')
         
-    dataframe = dataframe.iloc[::50]
+    dataframe = dataframe.iloc[::50].copy()
     
     dataframe['Time'] = pd.to_datetime(dataframe['Time'], errors = 'coerce')
     dataframe.set_index('Time', inplace = True)
-    
+    # Narrowest type per column that keeps every value intact
+    return compact_dataframe(dataframe)
+
 
 # Functie voor het omzetten van opgeschoonde .csv file naar .parquet file
-def csv_to_parquet(dataframe):
-    dataframe.to_parquet(index = True)
+def csv_to_parquet(dataframe, parquet_path):
+    dataframe.to_parquet(parquet_path, index = True)
+
+
+# Functie voor het omzetten van een kolom naar getallen (ongeldige waarden worden leeg)
+def _to_float_array(array):
+    """Cast an Arrow column to float64, coercing invalid values to NaN"""
+    try:
+        return pc.cast(array, pa.float64()).to_numpy(zero_copy_only=False)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return pd.to_numeric(array.to_pandas(), errors = 'coerce').to_numpy(dtype = 'float64')
+
+
+# Functie voor het vinden van de tijdformaten die alle tijden in de Time kolom lezen
+def _time_formats(samples):
+    """Every strftime format (month first, then day first) that parses all samples, with the parsed times"""
+    formats = {}
+    for dayfirst in (False, True):
+        with warnings.catch_warnings():
+            # ISO times ignore dayfirst, with a warning
+            warnings.simplefilter('ignore', UserWarning)
+            time_format = guess_datetime_format(samples.iloc[0], dayfirst=dayfirst)
+        if time_format and time_format not in formats:
+            parsed = pd.to_datetime(samples, format=time_format, errors='coerce')
+            if parsed.notna().all():
+                formats[time_format] = parsed
+    return formats
+
+
+# Functie voor het herkennen van het tijdformaat in de Time kolom
+def _detect_time_format(samples):
+    """Guess the strftime format of the samples, returns it with the other formats that parse them too.
+
+    When month first and day first both parse every sample to different
+    times (no day above 12 yet), the format giving the shortest time span
+    is taken since logger samples lie close together. The other one is
+    returned as alternative, to fall back on when later rows don't fit.
+    """
+    samples = samples.dropna()
+    if samples.empty:
+        return None, []
+    formats = _time_formats(samples)
+    if not formats:
+        return None, []
+    ranked = sorted(formats, key=lambda time_format: formats[time_format].max() - formats[time_format].min())
+    # Formats that read every sample as the same time are not ambiguous
+    alternatives = [
+        time_format for time_format in ranked[1:]
+        if not formats[time_format].equals(formats[ranked[0]])
+    ]
+    return ranked[0], alternatives
+
+
+# Functie voor het wegschrijven van de volle row groups uit een buffer
+def _write_row_groups(writer, pending, row_group_size):
+    """Write the full row groups of the buffered tables, returns the rest and the number of rows written"""
+    buffered = pa.concat_tables(pending)
+    full_rows = (buffered.num_rows // row_group_size) * row_group_size
+    if full_rows:
+        writer.write_table(buffered.slice(0, full_rows), row_group_size=row_group_size)
+    return [buffered.slice(full_rows)], full_rows
+
+
+# Functie voor het lezen van een reeks rijen uit een parquet file in batches
+def _iter_rows(parquet_file, start, stop, batch_size):
+    """Record batches of the rows [start, stop), reading only the row groups that hold them"""
+    metadata = parquet_file.metadata
+    offsets = np.cumsum([0] + [metadata.row_group(rg).num_rows for rg in range(metadata.num_row_groups)])
+    first = int(np.searchsorted(offsets, start, side='right')) - 1
+    last = int(np.searchsorted(offsets, stop, side='left'))
+    position = int(offsets[first])
+    for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=range(first, last)):
+        lo, hi = max(start - position, 0), min(stop - position, batch.num_rows)
+        if hi > lo:
+            yield batch.slice(lo, hi - lo)
+        position += batch.num_rows
+        if position >= stop:
+            break
+
+
+# Functie voor het samenvoegen van op tijd gesorteerde reeksen rijen
+def _merge_runs(parquet_file, runs, writer, time_column, row_group_size):
+    """k-way merge of time-sorted row ranges of parquet_file into writer, returns the rows written.
+
+    Every run is read in batches of row_group_size / len(runs) rows. All
+    buffered rows up to the smallest last time of the buffers are sorted and
+    written, since no unread row can come before them.
+    """
+    batch_size = max(row_group_size // len(runs), 1024)
+    iterators = [_iter_rows(parquet_file, start, stop, batch_size) for start, stop in runs]
+    buffers = [next(iterator, None) for iterator in iterators]
+    pending = []
+    rows_written = 0
+    while any(buffer is not None for buffer in buffers):
+        times = [
+            buffer.column(time_column).to_numpy() if buffer is not None else None
+            for buffer in buffers
+        ]
+        cutoff = min(t[-1] for t in times if t is not None)
+        parts = []
+        for i, buffer in enumerate(buffers):
+            if buffer is None:
+                continue
+            n = int(np.searchsorted(times[i], cutoff, side='right'))
+            parts.append(buffer.slice(0, n))
+            buffers[i] = buffer.slice(n) if n < buffer.num_rows else next(iterators[i], None)
+        pending.append(pa.Table.from_batches(parts).sort_by(time_column))
+        pending, written = _write_row_groups(writer, pending, row_group_size)
+        rows_written += written
+    if pending and pending[0].num_rows:
+        writer.write_table(pending[0], row_group_size=row_group_size)
+        rows_written += pending[0].num_rows
+    return rows_written
+
+
+# Functie voor het extern sorteren van een parquet file die uit gesorteerde reeksen bestaat
+def _merge_sorted_runs(path, runs, time_column, row_group_size, compression):
+    """Sort a parquet file made of time-sorted row ranges in place, as an external merge sort.
+
+    At most MERGE_FAN_IN runs are merged in one pass over the file, more
+    runs take several passes. Memory holds about one row group spread over
+    the merged runs, never the whole file.
+    """
+    merged_path = f"{path}.merge"
+    try:
+        while len(runs) > 1:
+            merged_runs = []
+            with pq.ParquetFile(path) as parquet_file:
+                with pq.ParquetWriter(merged_path, parquet_file.schema_arrow, compression=compression) as writer:
+                    for i in range(0, len(runs), MERGE_FAN_IN):
+                        start = merged_runs[-1][1] if merged_runs else 0
+                        rows = _merge_runs(parquet_file, runs[i:i + MERGE_FAN_IN], writer, time_column, row_group_size)
+                        merged_runs.append((start, start + rows))
+            os.replace(merged_path, path)
+            runs = merged_runs
+    finally:
+        if os.path.exists(merged_path):
+            os.remove(merged_path)
+
+
+# Functie voor het streamend omzetten van een .csv file naar een .parquet file
+def convert_csv_to_parquet(csv_path, parquet_path, time_column='Time',
+                           block_size=CSV_BLOCK_SIZE, row_group_size=PARQUET_ROW_GROUP_SIZE,
+                           compression='snappy', time_format=None):
+    """Stream a raw logger CSV into a time-indexed parquet file in bounded memory.
+
+    The CSV is read in blocks of block_size bytes. Every block is converted
+    to numbers, forward filled (carrying the last valid value of each column
+    over block boundaries), sorted by time and buffered until a full row
+    group can be written, so peak memory depends on block_size and
+    row_group_size and not on the size of the file. Blocks overlapping in
+    time (e.g. local times repeating at a DST change) are sorted afterwards
+    by merging the sorted runs they form, also in bounded memory.
+
+    The time format is detected on the first block (unless given) and
+    checked on every block. If later times only fit the day first (or
+    month first) reading the first block also allowed, the conversion
+    starts over with that format, and times in yet another format raise a
+    ValueError. Rows without a readable time are dropped. Returns the
+    number of rows and row groups written, the number of dropped rows and
+    the time format.
+    """
+    read_options = pacsv.ReadOptions(block_size=block_size)
+    # Keep every column as text, numbers and times are parsed per block below
+    header = pacsv.open_csv(csv_path, read_options=read_options).schema.names
+    convert_options = pacsv.ConvertOptions(
+        column_types={name: pa.string() for name in header},
+        strings_can_be_null=True,
+    )
+    reader = pacsv.open_csv(csv_path, read_options=read_options, convert_options=convert_options)
+    data_columns = [name for name in header if name != time_column]
+
+    alternatives = []
+    restart_format = None
+    last_values = pd.Series(np.nan, index=data_columns)
+    last_time = None
+    # Start rows of the time-sorted runs in the written file
+    run_starts = [0]
+    rows_read = 0
+    rows_dropped = 0
+    rows_written = 0
+    row_groups_written = 0
+    writer = None
+    pending = []
+    pending_rows = 0
+    tmp_path = f"{parquet_path}.tmp"
+
+    try:
+        for batch in reader:
+            if batch.num_rows == 0:
+                continue
+            times = batch.column(time_column).to_pandas()
+
+            # Detect the time format once, on rows spread over the first block, and check it on every block
+            if time_format is None:
+                time_format, alternatives = _detect_time_format(times.iloc[::max(len(times) // 1000, 1)])
+            index = pd.to_datetime(times, format=time_format, errors='coerce')
+            unparsed = times[index.isna() & times.notna()]
+            if len(unparsed):
+                fitting = [f for f in alternatives if pd.to_datetime(unparsed, format=f, errors='coerce').notna().all()]
+                if fitting:
+                    restart_format = fitting[0]
+                    break
+                if _time_formats(unparsed):
+                    raise ValueError(
+                        f"time '{unparsed.iloc[0]}' in row {rows_read + int(unparsed.index[0]) + 1} "
+                        f"does not match the time format {time_format} of the rows before"
+                    )
+            rows_read += batch.num_rows
+
+            chunk = pd.DataFrame(
+                {name: _to_float_array(batch.column(name)) for name in data_columns},
+                index=pd.DatetimeIndex(index, name=time_column),
+            )
+
+            # Forward fill in file order, continuing from the previous block
+            chunk = chunk.ffill().fillna(last_values)
+            last_values = chunk.iloc[-1].combine_first(last_values)
+
+            rows_dropped += int(chunk.index.isna().sum())
+            chunk = chunk[chunk.index.notna()]
+            if chunk.empty:
+                continue
+            if not chunk.index.is_monotonic_increasing:
+                chunk = chunk.sort_index(kind='stable')
+            if last_time is not None and chunk.index[0] < last_time:
+                run_starts.append(rows_written + pending_rows)
+            last_time = chunk.index[-1]
+
+            table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=True)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema, compression=compression)
+            pending.append(table)
+            pending_rows += table.num_rows
+
+            # Write only full row groups, the remainder waits for the next block
+            if pending_rows >= row_group_size:
+                pending, full_rows = _write_row_groups(writer, pending, row_group_size)
+                rows_written += full_rows
+                row_groups_written += full_rows // row_group_size
+                pending_rows -= full_rows
+
+        if restart_format is None:
+            if pending_rows:
+                writer.write_table(pa.concat_tables(pending), row_group_size=row_group_size)
+                rows_written += pending_rows
+                row_groups_written += 1
+
+            if writer is None:
+                # Empty or time-less CSV, still write a valid (empty) file
+                empty = pd.DataFrame({name: pd.Series(dtype='float64') for name in data_columns},
+                                     index=pd.DatetimeIndex([], name=time_column))
+                pq.write_table(pa.Table.from_pandas(empty, preserve_index=True), tmp_path, compression=compression)
+            else:
+                writer.close()
+                writer = None
+
+            # Blocks overlapping in time form sorted runs, merged without loading the file
+            if len(run_starts) > 1:
+                runs = list(zip(run_starts, run_starts[1:] + [rows_written]))
+                _merge_sorted_runs(tmp_path, runs, time_column, row_group_size, compression)
+                row_groups_written = pq.ParquetFile(tmp_path).metadata.num_row_groups
+
+            os.replace(tmp_path, parquet_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    if restart_format is not None:
+        # The first block read both ways, later rows only fit the other format
+        return convert_csv_to_parquet(
+            csv_path, parquet_path, time_column=time_column, block_size=block_size,
+            row_group_size=row_group_size, compression=compression, time_format=restart_format
+        )
+    return {'rows': rows_written, 'row_groups': row_groups_written, 'dropped_rows': rows_dropped, 'time_format': time_format}
 
 
 # Functie voor het checken of de folder parquet files bevat
 def get_parquet_files(folder_path):
-    if not folder_path or not os.path.isdir(folder_path):
-        return []
-    return [
-        f for f in os.listdir(folder_path)
-        if f.lower().endswith(".parquet") and os.path.isfile(os.path.join(folder_path, f))
-    ]
+    """Get all parquet files from a folder, from the mtime-keyed directory index"""
+    return get_directory_index().files(folder_path, ".parquet")
 
 # Functie voor het checken of de folder csv files bevat
 def get_csv_files(folder_path):
     """Get all CSV files from a given folder path"""
-    if not folder_path or not os.path.isdir(folder_path):
-        return []
-    return [
-        f for f in os.listdir(folder_path)
-        if f.lower().endswith(".csv") and os.path.isfile(os.path.join(folder_path, f))
-    ]
\ No newline at end of file
+    return get_directory_index().files(folder_path, ".csv")
\ No newline at end of file